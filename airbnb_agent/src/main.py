@@ -1,10 +1,14 @@
 import asyncio
 import uvicorn
+from contextlib import asynccontextmanager
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill 
+from properties.config import AirbnbConfig
 from services.agent_executer import AirbnbAgentExecutor
+from common.metrics import MeteredAgentExecutor, MeteredQueueManager, instrument_app, metrics
+from common.tracing import tracer
+from services.execute_agent import create_admission_controller, create_mcp_pool, create_search_cache, create_task_store
 
 
 def create_airbnb_agent_card():
@@ -37,22 +41,39 @@ def create_airbnb_agent_card():
         defaultInputModes=["text"],
         defaultOutputModes=["text"],
         skills=[accommodation_search_skill],
-        capabilities=AgentCapabilities(),
+        capabilities=AgentCapabilities(streaming=True),
         version="1.0.0"
     )
     
     return agent_card
 
 
-def main():
-    """Main function to start the A2A Airbnb agent server"""
+def create_app():
+    """Build the A2A Airbnb agent Starlette app (also used as the uvicorn worker factory)"""
+    
+    tracer.configure(
+        service_name=AirbnbConfig.AGENT_NAME,
+        enabled=AirbnbConfig.TRACING_ENABLED,
+        path=AirbnbConfig.SPAN_EXPORT_FILE,
+        collector_url=AirbnbConfig.SPAN_COLLECTOR_URL,
+    )
     
-    airbnb_agent_executor = AirbnbAgentExecutor()  
+    search_cache = create_search_cache()
+    mcp_pool = create_mcp_pool(search_cache)
+    task_store = create_task_store()
+    admission = create_admission_controller()
+    airbnb_agent_executor = AirbnbAgentExecutor(
+        mcp_pool=mcp_pool,
+        search_cache=search_cache,
+        admission=admission,
+    )
     agent_card = create_airbnb_agent_card()
 
+    queue_manager = MeteredQueueManager()
     request_handler = DefaultRequestHandler(
-        agent_executor = airbnb_agent_executor,
-        task_store=InMemoryTaskStore(),
+        agent_executor = MeteredAgentExecutor(airbnb_agent_executor),
+        task_store=task_store,
+        queue_manager=queue_manager,
     )
     
     app = A2AStarletteApplication(
@@ -60,6 +81,39 @@ def main():
         http_handler=request_handler,
     )
 
+    @asynccontextmanager
+    async def lifespan(app):
+        # Spawn the MCP server processes once, before the first request arrives
+        await mcp_pool.start()
+        try:
+            yield
+        finally:
+            await mcp_pool.close()
+            await task_store.close()
+            await tracer.close()
+
+    starlette_app = app.build(lifespan=lifespan)
+    if AirbnbConfig.METRICS_ENABLED:
+        metrics.register_stats("admission", lambda: admission.stats, "Admission control",
+                               counters=("admitted", "queued", "rejected_queue_full", "rejected_timeout", "expired"))
+        metrics.register_stats("executions", lambda: airbnb_agent_executor.executions.stats, "Running executions", counters=("cancelled",))
+        metrics.register_stats("a2a_event_queue", lambda: queue_manager.stats, "A2A task event queues")
+        metrics.register_stats("task_store", lambda: task_store.stats, "A2A task store",
+                               counters=("saves", "writes", "flushes", "expired", "evicted"))
+        metrics.register_stats("mcp_pool", lambda: mcp_pool.stats, "Airbnb MCP server pool",
+                               counters=("spawned", "recycled", "spawn_failures"))
+        metrics.register_stats("airbnb_search_cache", lambda: search_cache.stats, "Airbnb search result cache",
+                               counters=("hits", "stale_hits", "misses", "refreshes", "refresh_failures", "evictions",
+                                         "search_hits", "search_misses"))
+        instrument_app(starlette_app, AirbnbConfig.METRICS_PATH)
+    return starlette_app
+
+
+def main():
+    """Main function to start the A2A Airbnb agent server"""
+    
+    agent_card = create_airbnb_agent_card()
+
     print("Starting Airbnb Agent A2A Server...")
     print(f"Agent Card: {agent_card.name}")
     print(f"Server URL: {agent_card.url}")
@@ -67,9 +121,13 @@ def main():
     for skill in agent_card.skills:
         print(f"  - {skill.name}: {skill.description}")
     
-    # Start the server
+    # Start the server; every worker builds its own app (and MCP pool) from the factory
+    if AirbnbConfig.WORKERS > 1:
+        uvicorn.run("main:create_app", factory=True, workers=AirbnbConfig.WORKERS, host="0.0.0.0", port=7002, log_level="info")
+        return
+    
     uvicorn.run(
-        app.build(),
+        create_app(),
         host="0.0.0.0",
         port=7002,
         log_level="info"
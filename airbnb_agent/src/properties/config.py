@@ -1,3 +1,7 @@
+import os
+import shlex
+
+
 class AirbnbConfig:
     """Configuration settings for the Airbnb agent"""
     
@@ -10,15 +14,73 @@ class AirbnbConfig:
     AGENT_VERSION = "1.0.0"
     
     # MCP Server settings
-    MCP_COMMAND = "npx"
+    MCP_COMMAND = os.getenv("AIRBNB_MCP_COMMAND", "npx")
     MCP_PACKAGE = "@openbnb/mcp-server-airbnb"
     MCP_FLAGS = ["--ignore-robots-txt"]
+    # Full argument list replacing the npx invocation (e.g. a fake server for benchmarks)
+    MCP_ARGS = os.getenv("AIRBNB_MCP_ARGS")
+
+    # MCP server pool settings
+    MCP_POOL_MIN_SIZE = 1
+    MCP_POOL_MAX_SIZE = 4
+    MCP_POOL_MAX_CALLS = 50
+    MCP_POOL_HEALTH_CHECK_INTERVAL = 30.0
+
+    # Search result cache settings (seconds)
+    SEARCH_CACHE_TTL = 300.0
+    SEARCH_CACHE_STALE_TTL = 1800.0
+    SEARCH_CACHE_MAX_ENTRIES = 256
+    
+    # Number of uvicorn worker processes. Each worker keeps its own admission limits, MCP server pool, search
+    # cache and running executions, so the limits apply per worker and a tasks/cancel only stops a task running
+    # in the worker that receives it. More than one worker needs the sqlite task store, so that task lookups
+    # reach tasks created by the other workers
+    WORKERS = 1
+    
+    # A2A task store: "memory" keeps tasks in-process, "sqlite" shares them between uvicorn workers through
+    # the TASK_STORE_PATH database. Both drop finished tasks after TASK_STORE_TTL seconds and the oldest ones
+    # beyond TASK_STORE_MAX_TASKS tasks or TASK_STORE_MAX_BYTES bytes
+    TASK_STORE_BACKEND = "sqlite" if WORKERS > 1 else "memory"
+    TASK_STORE_PATH = os.getenv("TASK_STORE_PATH", "airbnb_tasks.db")
+    TASK_STORE_BATCH_INTERVAL = 0.05
+    TASK_STORE_BATCH_SIZE = 100
+    TASK_STORE_MAX_TASKS = 1000
+    TASK_STORE_MAX_BYTES = 50_000_000
+    TASK_STORE_TTL = 600.0
+    
+    # Admission control: at most ADMISSION_MAX_CONCURRENT executions at once (None = no limit) and up to
+    # ADMISSION_MAX_QUEUE requests waiting at most ADMISSION_MAX_WAIT seconds; others are rejected as overloaded
+    ADMISSION_MAX_CONCURRENT = 8
+    ADMISSION_MAX_QUEUE = 32
+    ADMISSION_MAX_WAIT = 15.0
+    
+    # Time budget (seconds) of requests whose caller did not send one in the "timeout_ms" message
+    # metadata; admission, the agent run and its tool calls all stop when it runs out
+    DEFAULT_DEADLINE = 90.0
+    
+    # Record/replay of LLM and MCP interactions: AGENT_TRACE_MODE is "record", "replay" or unset,
+    # AGENT_REPLAY_LATENCY is "recorded" (reproduce the original timings) or "zero"
+    TRACE_MODE = os.getenv("AGENT_TRACE_MODE")
+    TRACE_FILE = os.getenv("AGENT_TRACE_FILE", "airbnb_trace.jsonl")
+    REPLAY_LATENCY = os.getenv("AGENT_REPLAY_LATENCY", "recorded")
+    
+    # Span tracing (AGENT_TRACING=1): spans go to SPAN_EXPORT_FILE and, if set, to an
+    # OTLP/HTTP JSON collector such as http://localhost:4318/v1/traces
+    TRACING_ENABLED = os.getenv("AGENT_TRACING", "0") == "1"
+    SPAN_EXPORT_FILE = os.getenv("SPAN_EXPORT_FILE", "airbnb_spans.jsonl")
+    SPAN_COLLECTOR_URL = os.getenv("SPAN_COLLECTOR_URL")
+    
+    # Prometheus-style metrics endpoint
+    METRICS_ENABLED = True
+    METRICS_PATH = "/metrics"
     
-    # LLM settings
-    LLM_MODEL = "litellm/gemini/gemini-2.0-flash"
+    # LLM settings (LLM_MODEL can be overridden from the environment, e.g. by the benchmark)
+    LLM_MODEL = os.getenv("LLM_MODEL", "litellm/gemini/gemini-2.0-flash")
     
     @classmethod
     def get_mcp_args(cls):
+        if cls.MCP_ARGS:
+            return shlex.split(cls.MCP_ARGS)
         return [
             "-y",
             cls.MCP_PACKAGE,
@@ -1,43 +1,112 @@
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
 from a2a.server.events.event_queue import EventQueue
-from a2a.utils import new_agent_text_message
+from a2a.types import TaskNotCancelableError
+from a2a.utils.errors import ServerError
+from agents.mcp import MCPServer
+from functools import partial
 from pydantic import BaseModel
+from typing import Optional
+from properties.config import AirbnbConfig
+from common.admission import AdmissionController, OverloadedError
+from common.cancellation import TERMINAL_STATES, ExecutionTracker
+from common.deadline import DeadlineExceededError, deadline_from_metadata, deadline_scope, remaining
 from services.execute_agent import agent_run
+from common.mcp_pool import MCPServerPool
+from services.search_cache import AccommodationSearchCache
+from services.streaming import ResponseStream, TextSink, response_text
+from common.tracing import tracer
 import asyncio
 
 
 class AirbnbAgent(BaseModel):
     query: str
     
-    async def invoke(self):
-        return await agent_run(self.query)
+    async def invoke(self, server: Optional[MCPServer] = None, on_delta: Optional[TextSink] = None):
+        return await agent_run(self.query, server, on_delta)
 
 
 class AirbnbAgentExecutor(AgentExecutor):
+
+    def __init__(
+        self,
+        mcp_pool: Optional[MCPServerPool] = None,
+        search_cache: Optional[AccommodationSearchCache] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        self.mcp_pool = mcp_pool
+        self.search_cache = search_cache
+        self.admission = admission or AdmissionController(max_concurrent=None)
+        self.executions = ExecutionTracker()
+
+    async def _run_agent(self, query: str, on_delta: Optional[TextSink] = None):
+        agent = AirbnbAgent(query=query)
+        if self.mcp_pool is not None:
+            async with self.mcp_pool.checkout() as server:
+                return await agent.invoke(server, on_delta)
+        return await agent.invoke(on_delta=on_delta)
+
+    async def _refresh_agent(self, query: str):
+        # Background refreshes of stale cache entries take an execution slot like requests do
+        async with self.admission.admit():
+            return await self._run_agent(query)
     
     async def execute(self, context: RequestContext, event_queue: EventQueue):
+        # The caller's remaining time budget (or the default one) bounds everything done for the request
+        deadline = deadline_from_metadata(context.message.metadata, AirbnbConfig.DEFAULT_DEADLINE)
+        with deadline_scope(deadline), self.executions.track(context.task_id):
+            await self._execute(context, event_queue, deadline)
+
+    async def _execute(self, context: RequestContext, event_queue: EventQueue, deadline: Optional[float]):
+        stream = ResponseStream(context, event_queue)
         try:
             # Extract query from the request context
             query = context.message.parts[0].root.text
             
             if not query:
                 error_msg = "No query provided in request"
-                await event_queue.enqueue_event(new_agent_text_message(error_msg))
+                await stream.finish(error_msg)
                 return
             
-            # Create and invoke the Airbnb agent
-            agent = AirbnbAgent(query=query)
-            result = await agent.invoke()
-            
-            # Send the result back through event queue
-            await event_queue.enqueue_event(new_agent_text_message(str(result)))
+            # Serve repeated queries from the cache, otherwise invoke the Airbnb agent
+            # and stream its answer as it is generated. Background refreshes never stream.
+            # Wait for an execution slot; over capacity the request is rejected with a retry-after hint
+            # Requests whose deadline already passed are dropped without running
+            async with self.admission.admit(max_wait=remaining(deadline)):
+                await stream.start()
+                # Continue the caller's trace when the orchestrator sent one
+                with tracer.span("airbnb.execute", parent=tracer.extract(context.message.metadata), query=query[:200]):
+                    run = partial(self._run_agent, on_delta=stream.send)
+                    if self.search_cache is not None:
+                        result = await self.search_cache.get_or_run(query, run, refresh=self._refresh_agent)
+                    else:
+                        result = await run(query)
+                
+                # Complete the task with the full answer
+                await stream.finish(response_text(result))
             
+        except OverloadedError as e:
+            print(f"Rejected Airbnb request: {e.reason} (retry after {e.retry_after}s)")
+            await stream.reject(f"{AirbnbConfig.AGENT_NAME} is overloaded ({e.reason}), retry after {e.retry_after}s", e.retry_after)
+        except asyncio.CancelledError:
+            # Interrupted by tasks/cancel: the agent run was stopped and its MCP server retired
+            print(f"Cancelled Airbnb task {context.task_id}")
+            await stream.cancel("Airbnb agent execution cancelled")
+        except DeadlineExceededError as e:
+            print(f"Dropped Airbnb request: {e}")
+            await stream.fail(f"{AirbnbConfig.AGENT_NAME} gave up: {e}")
         except Exception as e:
             error_msg = f"Error executing Airbnb agent: {str(e)}"
             print(f"AirbnbAgentExecutor error: {e}")
-            await event_queue.enqueue_event(new_agent_text_message(error_msg))
+            # The task fails, so callers do not take the error for an answer; the stream may be
+            # what failed, and the task cannot be ended twice
+            if not stream.ended:
+                await stream.fail(error_msg)
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue):
-        # Acknowledge cancellation
-        await event_queue.enqueue_event(new_agent_text_message("Airbnb agent execution cancelled"))
+        task = context.current_task
+        if task is not None and task.status.state in TERMINAL_STATES:
+            raise ServerError(error=TaskNotCancelableError())
+        # A running execution is interrupted and reports the cancellation itself
+        if not self.executions.cancel(context.task_id):
+            await ResponseStream(context, event_queue).cancel("Airbnb agent execution cancelled")
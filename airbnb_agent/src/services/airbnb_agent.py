@@ -1,12 +1,18 @@
-from agents import Agent, Runner
+from agents import Agent, ModelSettings, Runner
 from agents.mcp import MCPServer
+from agents.models.interface import Model
 from dotenv import load_dotenv
+from properties.config import AirbnbConfig
+from typing import Optional
+from common.deadline import within_deadline
+from services.streaming import TextSink, forward_text_deltas
+from common.tracing import traced_model, tracer
 
 load_dotenv()
 
-llm = "litellm/gemini/gemini-2.0-flash"
+llm = AirbnbConfig.LLM_MODEL
 
-async def run_agent(mcp_server: MCPServer, query: str):
+async def run_agent(mcp_server: MCPServer, query: str, on_delta: Optional[TextSink] = None, model: Optional[Model] = None):
     try:
         agent = Agent(
             name="AirbnbAgent",
@@ -28,16 +34,25 @@ async def run_agent(mcp_server: MCPServer, query: str):
             Format your responses clearly with bullet points or structured information when appropriate.
             """,
             mcp_servers=[mcp_server],
-            model=llm,
+            model=traced_model(model or llm),
+            # Ask for token usage in streamed responses too (reported in the LLM metrics)
+            model_settings=ModelSettings(include_usage=True),
         )
         
         print(f"Running Airbnb agent with query: {query}")
         
-        response = await Runner.run(agent, query)
+        # The run (LLM turns and tool calls) is cancelled when the caller's deadline runs out
+        with tracer.span("agent.run", agent="AirbnbAgent", streamed=on_delta is not None):
+            async with within_deadline("the Airbnb agent run"):
+                if on_delta is not None:
+                    response = Runner.run_streamed(agent, query)
+                    await forward_text_deltas(response, on_delta)
+                else:
+                    response = await Runner.run(agent, query)
         print(f"Airbnb agent response received: {len(str(response)) if response else 0} characters")
         return response
         
     except Exception as e:
         print(f"Error in run_agent: {e}")
-        return f"Error processing Airbnb request: {str(e)}"
+        raise
 
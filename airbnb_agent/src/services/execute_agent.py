@@ -1,27 +1,129 @@
-from agents.mcp import MCPServerStdio
+from a2a.server.tasks import TaskStore
+from agents.mcp import MCPServer, MCPServerStdio
+from agents.models.interface import Model
+from agents.models.multi_provider import MultiProvider
 import asyncio
+from functools import partial
+from typing import Optional
+from properties.config import AirbnbConfig
+from common.mcp_pool import MCPServerPool
+from common.recording import (
+    RecordingMCPServerStdio,
+    RecordingModel,
+    ReplayMCPServer,
+    ReplayModel,
+    TraceRecorder,
+    TraceReplayer,
+)
+from services.streaming import TextSink
+from common.admission import AdmissionController
+from common.sqlite_task_store import SQLiteTaskStore
+from common.task_store import BoundedTaskStore
+from common.tracing import traced_mcp_server
+from services.search_cache import AccommodationSearchCache, SearchCachingMCPServer
 from services.airbnb_agent import run_agent
 
 
-async def agent_run(query: str):   
-    try:
-        async with MCPServerStdio(
+trace_recorder = TraceRecorder(AirbnbConfig.TRACE_FILE) if AirbnbConfig.TRACE_MODE == "record" else None
+trace_replayer = TraceReplayer(AirbnbConfig.TRACE_FILE, latency=AirbnbConfig.REPLAY_LATENCY) if AirbnbConfig.TRACE_MODE == "replay" else None
+
+
+def create_model() -> Optional[Model]:
+    """Recording or replaying model for TRACE_MODE (None runs AirbnbConfig.LLM_MODEL directly)"""
+    if trace_replayer is not None:
+        print(f"Replaying LLM and MCP interactions from {AirbnbConfig.TRACE_FILE} ({AirbnbConfig.REPLAY_LATENCY} latency)")
+        return ReplayModel(trace_replayer)
+    if trace_recorder is not None:
+        print(f"Recording LLM and MCP interactions to {AirbnbConfig.TRACE_FILE}")
+        return RecordingModel(MultiProvider().get_model(AirbnbConfig.LLM_MODEL), trace_recorder)
+    return None
+
+
+trace_model = create_model()
+
+
+def create_mcp_server(search_cache: Optional[AccommodationSearchCache] = None) -> MCPServer:
+    """Create a (not yet connected) Airbnb MCP server, serving searches from `search_cache` when given"""
+    params = {
+        "command": AirbnbConfig.MCP_COMMAND,
+        "args": AirbnbConfig.get_mcp_args()
+    }
+    if trace_replayer is not None:
+        server = ReplayMCPServer(trace_replayer, name="Airbnb MCP Server")
+    elif trace_recorder is not None:
+        server = RecordingMCPServerStdio(trace_recorder, name="Airbnb MCP Server", params=params, cache_tools_list=True)
+    else:
+        server = MCPServerStdio(
             name="Airbnb MCP Server",
-            params={
-                "command": "npx",
-                "args": [
-                    "-y",
-                    "@openbnb/mcp-server-airbnb", 
-                    "--ignore-robots-txt"
-                ]
-            }, 
-        ) as server:
+            params=params,
+            cache_tools_list=True,
+        )
+    server = traced_mcp_server(server)
+    if search_cache is not None:
+        server = SearchCachingMCPServer(server, search_cache)
+    return server
+
+
+def create_mcp_pool(search_cache: Optional[AccommodationSearchCache] = None) -> MCPServerPool:
+    """Create the shared Airbnb MCP server pool"""
+    return MCPServerPool(
+        partial(create_mcp_server, search_cache),
+        min_size=AirbnbConfig.MCP_POOL_MIN_SIZE,
+        max_size=AirbnbConfig.MCP_POOL_MAX_SIZE,
+        max_calls=AirbnbConfig.MCP_POOL_MAX_CALLS,
+        health_check_interval=AirbnbConfig.MCP_POOL_HEALTH_CHECK_INTERVAL,
+    )
+
+
+def create_search_cache() -> AccommodationSearchCache:
+    """Create the Airbnb search result cache"""
+    return AccommodationSearchCache(
+        ttl=AirbnbConfig.SEARCH_CACHE_TTL,
+        stale_ttl=AirbnbConfig.SEARCH_CACHE_STALE_TTL,
+        max_entries=AirbnbConfig.SEARCH_CACHE_MAX_ENTRIES,
+    )
+
+
+def create_admission_controller() -> AdmissionController:
+    """Create the admission controller that bounds concurrent executions"""
+    return AdmissionController(
+        max_concurrent=AirbnbConfig.ADMISSION_MAX_CONCURRENT,
+        max_queue=AirbnbConfig.ADMISSION_MAX_QUEUE,
+        max_wait=AirbnbConfig.ADMISSION_MAX_WAIT,
+    )
+
+
+def create_task_store() -> TaskStore:
+    """Create the A2A task store selected by TASK_STORE_BACKEND"""
+    if AirbnbConfig.TASK_STORE_BACKEND == "sqlite":
+        return SQLiteTaskStore(
+            AirbnbConfig.TASK_STORE_PATH,
+            batch_interval=AirbnbConfig.TASK_STORE_BATCH_INTERVAL,
+            batch_size=AirbnbConfig.TASK_STORE_BATCH_SIZE,
+            ttl=AirbnbConfig.TASK_STORE_TTL,
+            max_tasks=AirbnbConfig.TASK_STORE_MAX_TASKS,
+            max_bytes=AirbnbConfig.TASK_STORE_MAX_BYTES,
+        )
+    return BoundedTaskStore(
+        max_tasks=AirbnbConfig.TASK_STORE_MAX_TASKS,
+        max_bytes=AirbnbConfig.TASK_STORE_MAX_BYTES,
+        ttl=AirbnbConfig.TASK_STORE_TTL,
+    )
+
+
+async def agent_run(query: str, server: Optional[MCPServer] = None, on_delta: Optional[TextSink] = None):   
+    try:
+        if server is not None:
+            print(f"Using pooled Airbnb MCP Server for query: {query}")
+            return await run_agent(server, query, on_delta, trace_model)
+
+        async with create_mcp_server() as server:
             print(f"Starting Airbnb MCP Server for query: {query}")
-            response = await run_agent(server, query)
+            response = await run_agent(server, query, on_delta, trace_model)
             return response
     except Exception as e:
         print(f"Error in agent_run: {e}")
-        return f"Sorry, I encountered an error while processing your Airbnb request: {str(e)}"
+        raise
 
 
 if __name__ == "__main__":
@@ -33,4 +135,3 @@ if __name__ == "__main__":
     Provide me a summary of the available rooms and their prices.
     """
     asyncio.run(agent_run(test_query))
-
@@ -0,0 +1,264 @@
+import asyncio
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+from agents.mcp import MCPServer
+from common.deadline import deadline_scope
+
+
+SEARCH_TOOL_NAME = "airbnb_search"
+
+# Arguments of the airbnb_search tool that change the result set, with the
+# defaults the MCP server assumes when the LLM leaves them out.
+SEARCH_PARAM_DEFAULTS = {
+    "location": None,
+    "placeId": None,
+    "checkin": None,
+    "checkout": None,
+    "adults": 1,
+    "children": 0,
+    "infants": 0,
+    "pets": 0,
+    "minPrice": None,
+    "maxPrice": None,
+    "cursor": None,
+}
+
+
+def normalize_query(query: str) -> str:
+    """Normalize free-text queries so trivially different phrasings share a key"""
+    return re.sub(r"\s+", " ", query.strip().lower()).strip(" .?!")
+
+
+def normalize_search_params(arguments: dict) -> dict:
+    """Reduce airbnb_search tool arguments to the fields that affect results"""
+    params = {}
+    for name, default in SEARCH_PARAM_DEFAULTS.items():
+        value = arguments.get(name, default)
+        if isinstance(value, str):
+            value = re.sub(r"\s+", " ", value.strip().lower())
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        params[name] = value
+    return params
+
+
+def search_key(arguments: Optional[dict]) -> str:
+    """Cache key of one airbnb_search call"""
+    return json.dumps(normalize_search_params(arguments or {}), sort_keys=True)
+
+
+def extract_search_key(result: Any) -> Optional[str]:
+    """Build a key from the airbnb_search calls made during an agent run"""
+    searches = []
+    for item in getattr(result, "new_items", []):
+        if getattr(item, "type", None) != "tool_call_item":
+            continue
+        raw_item = item.raw_item
+        if getattr(raw_item, "name", None) != SEARCH_TOOL_NAME:
+            continue
+        try:
+            arguments = json.loads(raw_item.arguments or "{}")
+        except (TypeError, ValueError):
+            continue
+        searches.append(normalize_search_params(arguments))
+
+    if not searches:
+        return None
+    searches.sort(key=lambda params: json.dumps(params, sort_keys=True))
+    return json.dumps(searches, sort_keys=True)
+
+
+class CacheEntry:
+    def __init__(self, value: Any, query: str):
+        self.value = value
+        self.query = query
+        self.stored_at = time.monotonic()
+
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+class AccommodationSearchCache:
+    """LRU caches of Airbnb agent answers and of airbnb_search results.
+
+    Answers are stored per normalized query text, so a repeated query is
+    answered without running the LLM at all. Below the LLM, the output of
+    the `airbnb_search` tool is stored under its normalized arguments (see
+    `SearchCachingMCPServer`): a differently worded query that resolves to
+    the same search still needs an LLM run, but reuses the search instead of
+    querying Airbnb again.
+
+    Answers younger than `ttl` are served as fresh. Answers younger than
+    `ttl + stale_ttl` are served immediately while a background run refreshes
+    them. Older answers are treated as misses. Search results are only
+    reused while fresh.
+    """
+
+    def __init__(self, ttl: float = 300.0, stale_ttl: float = 1800.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._searches: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+        self.search_hits = 0
+        self.search_misses = 0
+
+    async def get_or_run(
+        self,
+        query: str,
+        run: Callable[[str], Awaitable[Any]],
+        refresh: Optional[Callable[[str], Awaitable[Any]]] = None,
+    ) -> Any:
+        """Return a cached answer for `query` or run the agent and cache it.
+
+        `refresh` is used for background revalidation of stale entries and
+        defaults to `run`.
+        """
+        query_key = normalize_query(query)
+        entry = self._entries.get(query_key)
+
+        if entry is not None:
+            age = entry.age()
+            if age <= self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(query_key)
+                print(f"Search cache hit ({age:.0f}s old) for: {query_key[:80]}")
+                return entry.value
+            if age <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(query_key)
+                print(f"Search cache stale hit ({age:.0f}s old), refreshing in background")
+                self._schedule_refresh(query_key, entry.query, refresh or run)
+                return entry.value
+
+        self.misses += 1
+        result = await run(query)
+        self.store(query, result)
+        return result
+
+    def store(self, query: str, result: Any) -> Optional[str]:
+        """Cache a finished agent run for its query, if it searched Airbnb"""
+        if extract_search_key(result) is None:
+            return None
+
+        query_key = normalize_query(query)
+        self._entries[query_key] = CacheEntry(result, query)
+        self._entries.move_to_end(query_key)
+        self._trim(self._entries)
+        return query_key
+
+    async def search(self, arguments: Optional[dict], call: Callable[[], Awaitable[Any]]) -> Any:
+        """The result of an airbnb_search call with these arguments, reused while fresh"""
+        key = search_key(arguments)
+        entry = self._searches.get(key)
+        if entry is not None and entry.age() <= self.ttl:
+            self.search_hits += 1
+            self._searches.move_to_end(key)
+            print("Reusing a cached airbnb_search result")
+            return entry.value
+
+        self.search_misses += 1
+        result = await call()
+        if not result.isError:
+            self._searches[key] = CacheEntry(result, key)
+            self._searches.move_to_end(key)
+            self._trim(self._searches)
+        return result
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "evictions": self.evictions,
+            "searches": len(self._searches),
+            "search_hits": self.search_hits,
+            "search_misses": self.search_misses,
+        }
+
+    def _trim(self, entries: OrderedDict):
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def _schedule_refresh(self, query_key: str, query: str, run: Callable[[str], Awaitable[Any]]):
+        if query_key in self._refreshing:
+            return
+        # The refresh outlives the request that triggered it, so it does not inherit its deadline
+        with deadline_scope(None):
+            task = asyncio.create_task(self._refresh(query, run))
+        self._refreshing[query_key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(query_key, None))
+
+    async def _refresh(self, query: str, run: Callable[[str], Awaitable[Any]]):
+        try:
+            result = await run(query)
+            if self.store(query, result) is None:
+                self.refresh_failures += 1
+            else:
+                self.refreshes += 1
+        except Exception as e:
+            self.refresh_failures += 1
+            print(f"Search cache refresh failed: {e}")
+
+
+class SearchCachingMCPServer(MCPServer):
+    """Wraps the Airbnb MCP server so that airbnb_search results come from the cache when fresh"""
+
+    def __init__(self, server: MCPServer, cache: AccommodationSearchCache):
+        super().__init__(use_structured_content=server.use_structured_content)
+        self.server = server
+        self.cache = cache
+
+    @property
+    def name(self) -> str:
+        return self.server.name
+
+    @property
+    def session(self):
+        return getattr(self.server, "session", None)
+
+    async def connect(self):
+        await self.server.connect()
+
+    async def cleanup(self):
+        await self.server.cleanup()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.cleanup()
+
+    async def list_tools(self, run_context=None, agent=None):
+        return await self.server.list_tools(run_context, agent)
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict]):
+        if tool_name != SEARCH_TOOL_NAME:
+            return await self.server.call_tool(tool_name, arguments)
+        return await self.cache.search(arguments, lambda: self.server.call_tool(tool_name, arguments))
+
+    async def list_prompts(self):
+        return await self.server.list_prompts()
+
+    async def get_prompt(self, name: str, arguments: Optional[dict] = None):
+        return await self.server.get_prompt(name, arguments)
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from uuid import uuid4
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+HOTEL_WORDS = re.compile(r"\b(?:hotel|hotels|stay|accommodation|airbnb|room|rooms)\b", re.IGNORECASE)
+WEATHER_WORDS = re.compile(r"\b(?:weather|forecast|rain|rainy|temperature)\b", re.IGNORECASE)
+CITY_PATTERN = re.compile(r"\b(?:in|to|at)\s+([A-Z][a-z]+)")
+DAY_PATTERN = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\b")
+
+
+class ScriptedLLM:
+    """Stand-in for the LLM behind LiteLLM, speaking the OpenAI chat completions API.
+
+    The agent making the request is recognised from the tools it offers and
+    the reply is scripted: the first turn calls the agent's tool (the
+    orchestrator calls WeatherAgent, AirbnbAgent or both in parallel, the
+    weather and Airbnb agents call their MCP search tool), and the turn after a
+    tool result answers with text. `latency` is the time to the first token
+    and `token_delay` the time between streamed tokens. Every completion is
+    recorded per agent, so the benchmark can report the LLM hop.
+    """
+
+    def __init__(self, latency: float = 0.3, token_delay: float = 0.01, answer_tokens: int = 40):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.answer_tokens = answer_tokens
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[Route("/v1/chat/completions", self.chat_completions, methods=["POST"])])
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        started_at = time.perf_counter()
+        agent = self._agent_name(body.get("tools") or [])
+        tool_call = self._script(agent, body.get("messages") or [])
+        text = None if tool_call else self._answer(body.get("messages") or [])
+
+        if body.get("stream"):
+            return StreamingResponse(
+                self._stream(body.get("model", "bench"), agent, tool_call, text, started_at,
+                             include_usage=bool((body.get("stream_options") or {}).get("include_usage"))),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(self.latency + self.token_delay * self.answer_tokens)
+        message = {"role": "assistant", "content": text}
+        if tool_call:
+            message["tool_calls"] = [tool_call]
+        self.durations[agent].append(time.perf_counter() - started_at)
+        return JSONResponse({
+            "id": f"chatcmpl-{uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_call else "stop"}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": self.answer_tokens, "total_tokens": 100 + self.answer_tokens},
+        })
+
+    async def _stream(self, model: str, agent: str, tool_call: Optional[dict], text: Optional[str], started_at: float,
+                      include_usage: bool = False):
+        chunk_id = f"chatcmpl-{uuid4().hex}"
+
+        def chunk(delta: dict, finish_reason: Optional[str] = None, usage: Optional[dict] = None) -> str:
+            payload = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if usage is None else [],
+            }
+            if usage is not None:
+                payload["usage"] = usage
+            return f"data: {json.dumps(payload)}\n\n"
+
+        await asyncio.sleep(self.latency)
+        if tool_call:
+            yield chunk({"role": "assistant", "tool_calls": [{"index": 0, **tool_call}]})
+            yield chunk({}, "tool_calls")
+        else:
+            for i, word in enumerate(text.split(" ")):
+                if i:
+                    await asyncio.sleep(self.token_delay)
+                yield chunk({"role": "assistant", "content": word if i == 0 else f" {word}"})
+            yield chunk({}, "stop")
+        if include_usage:
+            # Like the OpenAI API: a final chunk without choices carries the usage
+            completion_tokens = 20 if tool_call else len(text.split(" "))
+            yield chunk({}, usage={"prompt_tokens": 100, "completion_tokens": completion_tokens,
+                                   "total_tokens": 100 + completion_tokens})
+        yield "data: [DONE]\n\n"
+        self.durations[agent].append(time.perf_counter() - started_at)
+
+    @staticmethod
+    def _agent_name(tools: list) -> str:
+        names = {tool.get("function", {}).get("name") for tool in tools}
+        if "call_agent" in names:
+            return "orchestrator"
+        if any(name and name.startswith("airbnb") for name in names):
+            return "airbnb"
+        if names:
+            return "weather"
+        return "unknown"
+
+    def _script(self, agent: str, messages: list) -> Optional[dict]:
+        if not messages or messages[-1].get("role") == "tool":
+            return None
+        # The latest user message is the request; earlier ones are conversation history
+        query = _message_text(next((m for m in reversed(messages) if m.get("role") == "user"), {}))
+
+        if agent == "orchestrator":
+            wants_weather = bool(WEATHER_WORDS.search(query))
+            wants_hotel = bool(HOTEL_WORDS.search(query)) or not wants_weather
+            if wants_weather and wants_hotel:
+                name, arguments = "call_agents_parallel", {"calls": [
+                    {"agent_name": "WeatherAgent", "message": f"What's the weather {self._where_when(query)}?"},
+                    {"agent_name": "AirbnbAgent", "message": f"Find accommodation {self._where_when(query)}"},
+                ]}
+            elif wants_weather:
+                name, arguments = "call_agent", {"agent_name": "WeatherAgent", "message": query}
+            else:
+                name, arguments = "call_agent", {"agent_name": "AirbnbAgent", "message": query}
+        elif agent == "weather":
+            days = [int(day) for day in DAY_PATTERN.findall(query) if 1 <= int(day) <= 30] or [10, 20]
+            name, arguments = "get_weather", {"start_day": f"{min(days):02d}", "end_day": f"{max(days):02d}"}
+        elif agent == "airbnb":
+            name, arguments = "airbnb_search", {"location": self._city(query), "adults": 2}
+        else:
+            return None
+
+        return {
+            "id": f"call_{uuid4().hex[:12]}",
+            "type": "function",
+            "function": {"name": name, "arguments": json.dumps(arguments)},
+        }
+
+    def _answer(self, messages: list) -> str:
+        tool_output = next((_message_text(m) for m in reversed(messages) if m.get("role") == "tool"), "")
+        words = ["Here", "is", "what", "I", "found:"] + tool_output.split()
+        filler = ["The", "conditions", "look", "fine", "for", "your", "travel", "dates."]
+        while len(words) < self.answer_tokens:
+            words += filler
+        return " ".join(words[:self.answer_tokens])
+
+    def _where_when(self, query: str) -> str:
+        days = DAY_PATTERN.findall(query)
+        when = f" from September {days[0]} to {days[-1]}, 2025" if days else ""
+        return f"in {self._city(query)}{when}"
+
+    @staticmethod
+    def _city(query: str) -> str:
+        match = CITY_PATTERN.search(query)
+        return match.group(1) if match else "Chennai"
+
+
+def _message_text(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
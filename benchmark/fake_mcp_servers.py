@@ -0,0 +1,88 @@
+"""Fake weather and Airbnb MCP servers (stdio) for the offline benchmark.
+
+Run as `python fake_mcp_servers.py weather|airbnb --latency SECONDS --log PATH`.
+Every tool call takes `--latency` seconds and is appended to the `--log` file
+as a JSON line, so the benchmark can report the MCP hop. (Options are passed
+on the command line because MCP stdio servers only inherit a few environment
+variables.)
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Optional
+from mcp.server.fastmcp import FastMCP
+
+
+LATENCY = 0.05
+LOG_PATH: Optional[str] = None
+
+CONDITIONS = ["Sunny", "Partly cloudy", "Light rain", "Thunderstorms", "Humid"]
+
+
+def record(tool: str, started_at: float):
+    if not LOG_PATH:
+        return
+    with open(LOG_PATH, "a") as f:
+        f.write(json.dumps({"tool": tool, "duration": time.perf_counter() - started_at}) + "\n")
+
+
+def create_weather_server() -> FastMCP:
+    mcp = FastMCP("fake-weather")
+
+    @mcp.tool()
+    async def get_weather(start_day: str, end_day: str) -> str:
+        """Get the weather for days of September 2025 (start_day and end_day in DD format)"""
+        started_at = time.perf_counter()
+        await asyncio.sleep(LATENCY)
+        lines = []
+        for day in range(int(start_day), int(end_day) + 1):
+            lines.append(f"2025-09-{day:02d}: {CONDITIONS[day % len(CONDITIONS)]}, {26 + day % 7}°C")
+        record("get_weather", started_at)
+        return "\n".join(lines)
+
+    return mcp
+
+
+def create_airbnb_server() -> FastMCP:
+    mcp = FastMCP("fake-airbnb")
+
+    @mcp.tool()
+    async def airbnb_search(location: str, checkin: str = "", checkout: str = "", adults: int = 1,
+                            children: int = 0) -> str:
+        """Search Airbnb listings for a location"""
+        started_at = time.perf_counter()
+        await asyncio.sleep(LATENCY)
+        listings = [
+            {
+                "id": f"{location.lower()}-{i}",
+                "name": f"{location} stay {i}",
+                "price_per_night": 40 + 15 * i,
+                "bedrooms": 1 + i % 3,
+                "guests": adults + children,
+            }
+            for i in range(5)
+        ]
+        record("airbnb_search", started_at)
+        return json.dumps({"searchUrl": f"https://www.airbnb.com/s/{location}", "searchResults": listings})
+
+    @mcp.tool()
+    async def airbnb_listing_details(id: str) -> str:
+        """Get the details of an Airbnb listing"""
+        started_at = time.perf_counter()
+        await asyncio.sleep(LATENCY)
+        record("airbnb_listing_details", started_at)
+        return json.dumps({"id": id, "amenities": ["Wifi", "Kitchen", "Air conditioning"]})
+
+    return mcp
+
+
+if __name__ == "__main__":
+    servers = {"weather": create_weather_server, "airbnb": create_airbnb_server}
+    parser = argparse.ArgumentParser(description="Fake MCP server for the offline benchmark")
+    parser.add_argument("server", choices=servers)
+    parser.add_argument("--latency", type=float, default=LATENCY, help="duration of every tool call (seconds)")
+    parser.add_argument("--log", help="append a JSON line per tool call to this file")
+    args = parser.parse_args()
+    LATENCY, LOG_PATH = args.latency, args.log
+    servers[args.server]().run("stdio")
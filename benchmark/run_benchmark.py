@@ -0,0 +1,350 @@
+"""Offline end-to-end load benchmark for the three A2A agents.
+
+Starts a scripted fake LLM (OpenAI compatible, reached through LiteLLM), the
+weather, Airbnb and orchestrator A2A servers wired to fake MCP servers, then
+drives a request mix through the orchestrator at the given concurrency and
+prints p50/p95/p99 latencies, throughput and per-hop (LLM, MCP) timings as
+JSON. No API key or network access is needed.
+
+    python benchmark/run_benchmark.py --requests 100 --concurrency 10 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+import httpx
+import uvicorn
+from a2a.client import A2AClient
+from a2a.types import (
+    JSONRPCErrorResponse,
+    MessageSendParams,
+    SendMessageRequest,
+    SendStreamingMessageRequest,
+    TaskArtifactUpdateEvent,
+)
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+from fake_llm import ScriptedLLM
+
+
+ROOT = Path(__file__).resolve().parent.parent
+AGENTS = [
+    # name, source directory, port; sub-agents first so the orchestrator discovers them at startup
+    ("WeatherAgent", ROOT / "weather_agent" / "src", 7001),
+    ("AirbnbAgent", ROOT / "airbnb_agent" / "src", 7002),
+    ("AdvancedOrchestratorAgent", ROOT / "orchestrator_agent" / "src", 7000),
+]
+ORCHESTRATOR_URL = "http://localhost:7000/"
+
+CITIES = ["Chennai", "Mumbai", "Goa", "Delhi", "Bangalore", "Jaipur", "Kochi", "Pune"]
+QUERY_TEMPLATES = {
+    # Routed straight to WeatherAgent and answered by its fast path
+    "weather": "What's the weather on Sep {day}?",
+    # Routed to WeatherAgent, which needs its LLM for the free-form phrasing
+    "weather_llm": "Is it going to be rainy in {city} around the middle of September?",
+    # Routed straight to AirbnbAgent
+    "airbnb": "Find accommodation in {city} for {guests} people from Sep {day} to Sep {end_day}",
+    # Planned by the orchestrator LLM, which fans out to both agents
+    "trip": "Plan a trip to {city} from Sep {day} to Sep {end_day} with the weather and hotel options",
+    # Answered from the orchestrator's agent registry
+    "list": "What agents are available?",
+}
+DEFAULT_MIX = "weather=3,weather_llm=1,airbnb=3,trip=2,list=1"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        kind, _, weight = item.partition("=")
+        kind = kind.strip()
+        if kind not in QUERY_TEMPLATES:
+            raise argparse.ArgumentTypeError(f"unknown request kind '{kind}' (choose from {', '.join(QUERY_TEMPLATES)})")
+        weights[kind] = float(weight or 1)
+    return weights
+
+
+def build_requests(count: int, mix: Dict[str, float], rng: random.Random) -> List[tuple]:
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    requests = []
+    for kind in kinds:
+        day = rng.randint(1, 25)
+        query = QUERY_TEMPLATES[kind].format(
+            city=rng.choice(CITIES), day=day, end_day=day + rng.randint(1, 5), guests=rng.randint(1, 4)
+        )
+        requests.append((kind, query))
+    return requests
+
+
+def percentiles(values: List[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))], 4)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 4),
+        "p50": pick(50),
+        "p95": pick(95),
+        "p99": pick(99),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class AgentProcesses:
+    """Runs the three A2A servers as subprocesses against the fake LLM and MCP servers"""
+
+    def __init__(self, workdir: Path, llm_url: str, mcp_latency: float, tracing: bool = False):
+        self.workdir = workdir
+        self.mcp_log = workdir / "mcp_calls.jsonl"
+        fake_mcp = Path(__file__).resolve().parent / "fake_mcp_servers.py"
+        self.env = {
+            **os.environ,
+            "LLM_MODEL": "litellm/openai/bench-model",
+            "OPENAI_API_BASE": llm_url,
+            "OPENAI_BASE_URL": llm_url,
+            "OPENAI_API_KEY": "bench",
+            # The agents SDK would otherwise export traces to the OpenAI API
+            "OPENAI_AGENTS_DISABLE_TRACING": "1",
+            "WEATHER_MCP_COMMAND": sys.executable,
+            "WEATHER_MCP_ARGS": f'"{fake_mcp}" weather --latency {mcp_latency} --log "{self.mcp_log}"',
+            "AIRBNB_MCP_COMMAND": sys.executable,
+            "AIRBNB_MCP_ARGS": f'"{fake_mcp}" airbnb --latency {mcp_latency} --log "{self.mcp_log}"',
+            "PYTHONUNBUFFERED": "1",
+            "AGENT_TRACING": "1" if tracing else "0",
+        }
+        self.processes: List[subprocess.Popen] = []
+
+    async def start(self, timeout: float):
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            for name, source, port in AGENTS:
+                # Each agent gets its own working directory for its task database and registry file
+                cwd = self.workdir / name
+                cwd.mkdir()
+                log = open(cwd / "server.log", "w")
+                self.processes.append(subprocess.Popen(
+                    [sys.executable, str(source / "main.py")], cwd=cwd, env=self.env, stdout=log, stderr=subprocess.STDOUT
+                ))
+                await self._wait_for_card(client, name, port, timeout)
+
+    async def _wait_for_card(self, client: httpx.AsyncClient, name: str, port: int, timeout: float):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.processes[-1].poll() is not None:
+                raise RuntimeError(f"{name} exited during startup, see {self.workdir / name / 'server.log'}")
+            try:
+                response = await client.get(f"http://localhost:{port}{AGENT_CARD_WELL_KNOWN_PATH}")
+                if response.status_code == 200:
+                    print(f"{name} is up on port {port}", file=sys.stderr)
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+        raise RuntimeError(f"{name} did not start within {timeout:g} seconds")
+
+    def mcp_calls(self) -> Dict[str, List[float]]:
+        durations = defaultdict(list)
+        if self.mcp_log.exists():
+            for line in self.mcp_log.read_text().splitlines():
+                record = json.loads(line)
+                durations[record["tool"]].append(record["duration"])
+        return durations
+
+    def reset_mcp_calls(self):
+        if self.mcp_log.exists():
+            self.mcp_log.unlink()
+
+    def stop(self):
+        # SIGINT lets uvicorn run the lifespan shutdown, which closes the MCP server pools
+        for process in reversed(self.processes):
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+        for process in reversed(self.processes):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def send_request(client: A2AClient, query: str, streaming: bool) -> dict:
+    params = MessageSendParams(message={
+        "role": "user",
+        "parts": [{"type": "text", "text": query}],
+        "messageId": uuid4().hex,
+    })
+    started_at = time.perf_counter()
+    first_chunk_at: Optional[float] = None
+
+    if streaming:
+        request = SendStreamingMessageRequest(id=str(uuid4()), params=params)
+        async for response in client.send_message_streaming(request):
+            if isinstance(response.root, JSONRPCErrorResponse):
+                raise RuntimeError(response.root.error.message)
+            if first_chunk_at is None and isinstance(response.root.result, TaskArtifactUpdateEvent):
+                first_chunk_at = time.perf_counter()
+    else:
+        response = await client.send_message(SendMessageRequest(id=str(uuid4()), params=params))
+        if isinstance(response.root, JSONRPCErrorResponse):
+            raise RuntimeError(response.root.error.message)
+
+    finished_at = time.perf_counter()
+    return {
+        "latency": finished_at - started_at,
+        "time_to_first_chunk": first_chunk_at - started_at if first_chunk_at is not None else None,
+    }
+
+
+async def run_load(requests: List[tuple], concurrency: int, streaming: bool, timeout: float) -> tuple:
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+    results = []
+    errors = defaultdict(int)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=httpx.Limits(max_connections=concurrency * 2)) as http:
+        client = A2AClient(httpx_client=http, url=ORCHESTRATOR_URL)
+
+        async def worker():
+            while not queue.empty():
+                kind, query = queue.get_nowait()
+                try:
+                    result = await send_request(client, query, streaming)
+                    results.append({"kind": kind, **result})
+                except Exception as e:
+                    errors[kind] += 1
+                    print(f"{kind} request failed: {e!r}", file=sys.stderr)
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started_at
+
+    return results, dict(errors), elapsed
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(args, results, errors, elapsed, llm: ScriptedLLM, mcp_calls) -> dict:
+    by_kind = defaultdict(list)
+    for result in results:
+        by_kind[result["kind"]].append(result)
+
+    def summary(items: List[dict]) -> dict:
+        return {
+            "latency": percentiles([item["latency"] for item in items]),
+            "time_to_first_chunk": percentiles(
+                [item["time_to_first_chunk"] for item in items if item["time_to_first_chunk"] is not None]
+            ),
+        }
+
+    return {
+        "commit": git_commit(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "mix": parse_mix(args.mix),
+            "streaming": not args.no_streaming,
+            "llm_latency": args.llm_latency,
+            "llm_token_delay": args.llm_token_delay,
+            "mcp_latency": args.mcp_latency,
+            "seed": args.seed,
+        },
+        "elapsed": round(elapsed, 4),
+        "completed": len(results),
+        "errors": errors,
+        "throughput_rps": round(len(results) / elapsed, 4) if elapsed else 0.0,
+        "overall": summary(results),
+        "per_kind": {kind: summary(items) for kind, items in sorted(by_kind.items())},
+        "hops": {
+            "llm": {agent: percentiles(durations) for agent, durations in sorted(llm.durations.items())},
+            "mcp": {tool: percentiles(durations) for tool, durations in sorted(mcp_calls.items())},
+        },
+    }
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    llm = ScriptedLLM(latency=args.llm_latency, token_delay=args.llm_token_delay)
+    llm_server = uvicorn.Server(uvicorn.Config(llm.app(), host="127.0.0.1", port=args.llm_port, log_level="warning"))
+    llm_task = asyncio.create_task(llm_server.serve())
+
+    workdir = Path(tempfile.mkdtemp(prefix="a2a-bench-"))
+    agents = AgentProcesses(workdir, f"http://127.0.0.1:{args.llm_port}/v1", args.mcp_latency, tracing=args.trace)
+    try:
+        while not llm_server.started:
+            await asyncio.sleep(0.05)
+        await agents.start(args.startup_timeout)
+
+        if args.warmup:
+            await run_load(build_requests(args.warmup, mix, rng), min(args.concurrency, args.warmup),
+                           not args.no_streaming, args.request_timeout)
+            llm.durations.clear()
+            agents.reset_mcp_calls()
+
+        requests = build_requests(args.requests, mix, rng)
+        results, errors, elapsed = await run_load(requests, args.concurrency, not args.no_streaming, args.request_timeout)
+        report = build_report(args, results, errors, elapsed, llm, agents.mcp_calls())
+    finally:
+        agents.stop()
+        llm_server.should_exit = True
+        await llm_task
+        if args.keep_logs or args.trace:
+            print(f"Server logs kept in {workdir}", file=sys.stderr)
+            if args.trace:
+                print(f"View the spans with: python benchmark/view_traces.py {workdir}/*/*_spans.jsonl", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=50, help="number of measured requests")
+    parser.add_argument("--concurrency", type=int, default=5, help="number of concurrent clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"request kinds and weights, e.g. '{DEFAULT_MIX}' (kinds: {', '.join(QUERY_TEMPLATES)})")
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured requests sent before the run")
+    parser.add_argument("--no-streaming", action="store_true", help="use message/send instead of message/stream")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="fake LLM time to first token (seconds)")
+    parser.add_argument("--llm-token-delay", type=float, default=0.01, help="fake LLM delay between tokens (seconds)")
+    parser.add_argument("--mcp-latency", type=float, default=0.05, help="fake MCP tool call duration (seconds)")
+    parser.add_argument("--llm-port", type=int, default=8790, help="port of the fake LLM endpoint")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the request mix")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--keep-logs", action="store_true", help="keep the agent server logs")
+    parser.add_argument("--trace", action="store_true", help="enable span tracing in the agents and keep the span files")
+    args = parser.parse_args(argv)
+    try:
+        parse_mix(args.mix)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
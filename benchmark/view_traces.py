@@ -0,0 +1,115 @@
+"""Offline viewer for the span files written by the agents (AGENT_TRACING=1).
+
+Merges the span files of all agents, stitches spans into traces by trace and
+parent id, and prints each trace as an indented tree with durations:
+
+    python benchmark/view_traces.py orchestrator_spans.jsonl weather_spans.jsonl airbnb_spans.jsonl
+
+`--chrome trace.json` also writes the spans in Chrome trace-event format,
+which chrome://tracing and https://ui.perfetto.dev open without a server.
+"""
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+
+def load_spans(paths: List[str]) -> List[dict]:
+    spans = []
+    for path in paths:
+        for line in Path(path).read_text().splitlines():
+            if line.strip():
+                spans.append(json.loads(line))
+    return spans
+
+
+def group_traces(spans: List[dict]) -> Dict[str, List[dict]]:
+    traces = defaultdict(list)
+    for span in spans:
+        traces[span["trace_id"]].append(span)
+    return traces
+
+
+def print_trace(trace_id: str, spans: List[dict], min_ms: float = 0.0):
+    by_id = {span["span_id"]: span for span in spans}
+    children = defaultdict(list)
+    roots = []
+    for span in spans:
+        if span["parent_id"] in by_id:
+            children[span["parent_id"]].append(span)
+        else:
+            roots.append(span)
+
+    trace_start = min(span["start_ns"] for span in spans)
+    trace_end = max(span["end_ns"] or span["start_ns"] for span in spans)
+    print(f"trace {trace_id}  {(trace_end - trace_start) / 1e6:.1f} ms  {len(spans)} spans")
+
+    def show(span: dict, depth: int):
+        duration = span["duration_ms"] or 0.0
+        if duration < min_ms and depth > 0:
+            return
+        offset = (span["start_ns"] - trace_start) / 1e6
+        attributes = " ".join(
+            f"{key}={value}" for key, value in span["attributes"].items() if key not in ("query", "message")
+        )
+        error = f"  ERROR: {span['error']}" if span["error"] else ""
+        print(f"  {'  ' * depth}{span['name']} [{span['service']}] +{offset:.1f} ms {duration:.1f} ms {attributes}{error}")
+        for child in sorted(children[span["span_id"]], key=lambda child: child["start_ns"]):
+            show(child, depth + 1)
+
+    for root in sorted(roots, key=lambda span: span["start_ns"]):
+        show(root, 0)
+    print()
+
+
+def chrome_trace(spans: List[dict]) -> dict:
+    """Chrome trace-event format: one process per service, one row per trace"""
+    services = sorted({span["service"] for span in spans})
+    traces = sorted({span["trace_id"] for span in spans})
+    events = [
+        {"ph": "M", "name": "process_name", "pid": pid, "args": {"name": service}}
+        for pid, service in enumerate(services)
+    ]
+    for span in spans:
+        events.append({
+            "ph": "X",
+            "name": span["name"],
+            "cat": span["service"],
+            "pid": services.index(span["service"]),
+            "tid": traces.index(span["trace_id"]),
+            "ts": span["start_ns"] / 1000,
+            "dur": (span["duration_ms"] or 0.0) * 1000,
+            "args": {**span["attributes"], "trace_id": span["trace_id"], "error": span["error"]},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="+", help="span files (JSON lines) written by the agents")
+    parser.add_argument("--trace", help="only show this trace id")
+    parser.add_argument("--last", type=int, default=0, help="only show the N most recent traces")
+    parser.add_argument("--min-ms", type=float, default=0.0, help="hide nested spans shorter than this")
+    parser.add_argument("--chrome", help="write a Chrome trace-event file for chrome://tracing or Perfetto")
+    args = parser.parse_args()
+
+    spans = load_spans(args.files)
+    traces = group_traces(spans)
+    trace_ids = sorted(traces, key=lambda trace_id: min(span["start_ns"] for span in traces[trace_id]))
+    if args.trace:
+        trace_ids = [trace_id for trace_id in trace_ids if trace_id == args.trace]
+    if args.last:
+        trace_ids = trace_ids[-args.last:]
+
+    for trace_id in trace_ids:
+        print_trace(trace_id, traces[trace_id], args.min_ms)
+
+    if args.chrome:
+        selected = [span for trace_id in trace_ids for span in traces[trace_id]]
+        Path(args.chrome).write_text(json.dumps(chrome_trace(selected)))
+        print(f"Wrote {len(selected)} spans to {args.chrome}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+"""Modules shared by every agent: deadlines, cancellation, admission control,
+task stores, metrics, tracing, the MCP server pool and LLM/MCP recording."""
@@ -0,0 +1,119 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional
+from common.deadline import DeadlineExceededError
+
+
+class OverloadedError(Exception):
+    """Raised when a request is not admitted; `retry_after` is a hint in whole seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Caps concurrent executions, with a bounded FIFO wait queue in front.
+
+    Up to `max_concurrent` executions run at once (None: no limit, the
+    controller only counts them). Further requests wait in line for at most
+    `max_wait` seconds; once `max_queue` requests are waiting, new ones are
+    rejected straight away. Rejections raise `OverloadedError` with a
+    retry-after hint estimated from the recent execution times and the
+    length of the line.
+    """
+
+    def __init__(self, max_concurrent: Optional[int], max_queue: int = 0, max_wait: float = 0.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._avg_duration: Optional[float] = None
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.expired = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "expired": self.expired,
+        }
+
+    def retry_after(self) -> int:
+        """Seconds until a new request would likely be admitted"""
+        duration = self._avg_duration or 1.0
+        return max(1, math.ceil(duration * (len(self._waiters) + 1) / self.max_concurrent))
+
+    @asynccontextmanager
+    async def admit(self, max_wait: Optional[float] = None):
+        """Hold an execution slot for the duration of the block.
+
+        `max_wait` is the time left until the request's deadline: expired
+        requests are dropped and the wait for a slot never outlasts it
+        (both raise DeadlineExceededError).
+        """
+        if max_wait is not None and max_wait <= 0:
+            raise DeadlineExceededError("deadline expired before the request was admitted")
+        await self._acquire(max_wait)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started_at
+            self._avg_duration = duration if self._avg_duration is None else 0.8 * self._avg_duration + 0.2 * duration
+            self._release()
+
+    async def _acquire(self, max_wait: Optional[float] = None):
+        if self.max_concurrent is None or (self._active < self.max_concurrent and not self._waiters):
+            self._active += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise OverloadedError("too many requests waiting", self.retry_after())
+
+        cut_by_deadline = max_wait is not None and max_wait < self.max_wait
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, max_wait if cut_by_deadline else self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self._release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError) and cut_by_deadline:
+                self.expired += 1
+                raise DeadlineExceededError("deadline expired while waiting for an execution slot") from None
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected_timeout += 1
+                raise OverloadedError(f"no capacity within {self.max_wait:g}s", self.retry_after()) from None
+            raise
+        self.admitted += 1
+
+    def _release(self):
+        # Hand the slot straight to the longest waiting request, if any
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
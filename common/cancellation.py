@@ -0,0 +1,52 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Dict
+from a2a.types import TaskState
+
+
+# Task states after which there is nothing left to cancel
+TERMINAL_STATES = {TaskState.completed, TaskState.canceled, TaskState.failed, TaskState.rejected}
+
+
+class ExecutionTracker:
+    """Asyncio tasks of the executions in progress, by A2A task id.
+
+    Lets `tasks/cancel` interrupt a running execution: cancelling its task
+    unwinds the agent run (the LLM call in flight), the MCP server checkout
+    and, in the orchestrator, the sub-agent calls it is waiting on. The
+    execution itself reports the cancellation on the task's event queue,
+    where the tasks/cancel handler waits for it.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.cancelled = 0
+
+    @contextmanager
+    def track(self, task_id: str):
+        """Register the current asyncio task as the execution of `task_id` for the block"""
+        task = asyncio.current_task()
+        self._tasks[task_id] = task
+        try:
+            yield
+        finally:
+            if self._tasks.get(task_id) is task:
+                del self._tasks[task_id]
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancel the execution of `task_id`; False when it is not running here.
+
+        Does not wait for the execution to unwind: before Python 3.13 the
+        task's event queue only closes once the tasks/cancel handler has
+        drained its copy, so waiting here would deadlock.
+        """
+        task = self._tasks.get(task_id)
+        if task is None or task.done():
+            return False
+        self.cancelled += 1
+        task.cancel()
+        return True
+
+    @property
+    def stats(self) -> dict:
+        return {"running": len(self._tasks), "cancelled": self.cancelled}
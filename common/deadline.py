@@ -0,0 +1,82 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+# A2A message metadata entry carrying the caller's remaining time budget in milliseconds.
+# A relative budget (like gRPC's grpc-timeout) does not depend on the hosts' clocks agreeing.
+TIMEOUT_METADATA_KEY = "timeout_ms"
+
+# Deadline of the request being served, as a time.monotonic() timestamp (None: no deadline)
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when the request's deadline runs out before or while doing some work"""
+
+
+def deadline_from_metadata(metadata: Optional[dict], default_timeout: Optional[float] = None) -> Optional[float]:
+    """Local deadline for an incoming A2A message (from its timeout_ms, else `default_timeout` seconds)"""
+    timeout_ms = (metadata or {}).get(TIMEOUT_METADATA_KEY)
+    if isinstance(timeout_ms, (int, float)) and not isinstance(timeout_ms, bool):
+        return time.monotonic() + timeout_ms / 1000
+    if default_timeout is not None:
+        return time.monotonic() + default_timeout
+    return None
+
+
+def remaining(deadline: Optional[float] = None) -> Optional[float]:
+    """Seconds left until `deadline` (or the current deadline); None when there is none"""
+    deadline = deadline if deadline is not None else current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def bounded_timeout(timeout: float) -> float:
+    """`timeout` shortened to the time left until the current deadline"""
+    left = remaining()
+    return timeout if left is None else max(0.0, min(timeout, left))
+
+
+def inject(metadata: Optional[dict] = None, margin: float = 0.0) -> dict:
+    """Add the remaining budget (less `margin` seconds for the way back) to outgoing A2A message metadata"""
+    metadata = dict(metadata or {})
+    left = remaining()
+    if left is not None:
+        metadata[TIMEOUT_METADATA_KEY] = max(0, int((left - margin) * 1000))
+    return metadata
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]):
+    """Make `deadline` the current deadline for the block"""
+    token = current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+
+@asynccontextmanager
+async def within_deadline(what: str):
+    """Cancel the block when the current deadline runs out, raising DeadlineExceededError"""
+    left = remaining()
+    if left is None:
+        yield
+        return
+    if left <= 0:
+        raise DeadlineExceededError(f"deadline exceeded before {what}")
+    timeout = asyncio.timeout(left)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError:
+        if timeout.expired():
+            raise DeadlineExceededError(f"deadline exceeded during {what}") from None
+        raise
+    if timeout.expired():
+        # The block swallowed the cancellation (as streamed agent runs do) and returned early
+        raise DeadlineExceededError(f"deadline exceeded during {what}")
@@ -0,0 +1,272 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+from agents.mcp import MCPServerStdio
+
+
+class PooledMCPServer:
+    """A long-lived MCP server process owned by its own asyncio task.
+
+    The MCP stdio client is built on anyio cancel scopes, which must be entered
+    and exited from the same task. Each pooled server therefore gets an owner
+    task that connects, waits until it is retired and then cleans up.
+    """
+
+    def __init__(self, server: MCPServerStdio):
+        self.server = server
+        self.calls = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self._stop = asyncio.Event()
+        self._owner: Optional[asyncio.Task] = None
+
+    async def start(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._owner = asyncio.create_task(self._own(ready))
+        try:
+            await ready
+        except BaseException:
+            # Cancelled while connecting: don't leave the owner task (and process) behind
+            self._owner.cancel()
+            await asyncio.wait([self._owner])
+            raise
+
+    async def _own(self, ready: asyncio.Future):
+        try:
+            await self.server.connect()
+        except asyncio.CancelledError:
+            await self.server.cleanup()
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            return
+        ready.set_result(None)
+        try:
+            await self._stop.wait()
+        finally:
+            await self.server.cleanup()
+
+    @property
+    def alive(self) -> bool:
+        return self._owner is not None and not self._owner.done() and self.server.session is not None
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.server.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def stop(self):
+        self._stop.set()
+        if self._owner is None:
+            return
+        await asyncio.wait([self._owner])
+        if not self._owner.cancelled() and self._owner.exception():
+            print(f"Error stopping MCP server {self.server.name}: {self._owner.exception()}")
+
+
+class MCPServerPool:
+    """Pool of warm MCP server processes shared by all requests of an agent.
+
+    Servers are spawned up to `min_size` on `start()` and on demand up to
+    `max_size`. A server is recycled after `max_calls` checkouts, when a request
+    fails while holding it, or when a health check ping fails.
+    """
+
+    def __init__(
+        self,
+        server_factory: Callable[[], MCPServerStdio],
+        min_size: int = 1,
+        max_size: int = 4,
+        max_calls: int = 50,
+        health_check_interval: float = 30.0,
+        health_check_timeout: float = 5.0,
+    ):
+        self.server_factory = server_factory
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.max_calls = max_calls
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+
+        self._idle: list[PooledMCPServer] = []
+        self._size = 0
+        self._cond = asyncio.Condition()
+        self._closed = False
+        self._health_task: Optional[asyncio.Task] = None
+        self._background: set[asyncio.Task] = set()
+
+        self.spawned = 0
+        self.recycled = 0
+        self.spawn_failures = 0
+
+    async def start(self):
+        """Spawn the minimum number of servers and start the health checker"""
+        self._closed = False
+        results = await asyncio.gather(
+            *[self._spawn() for _ in range(self.min_size)], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, PooledMCPServer):
+                self._idle.append(result)
+            else:
+                print(f"✗ Failed to start pooled MCP server: {result}")
+        print(f"MCP server pool started with {len(self._idle)} warm server(s)")
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        """Stop the health checker and shut down every pooled server"""
+        self._closed = True
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.gather(*list(self._background), return_exceptions=True)
+        async with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        await asyncio.gather(*[self._retire(pooled) for pooled in idle])
+        print("MCP server pool closed")
+
+    @asynccontextmanager
+    async def checkout(self):
+        """Check out a connected server for the duration of the block"""
+        pooled = await self._acquire()
+        healthy = True
+        try:
+            yield pooled.server
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            await self._release(pooled, healthy)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._size - len(self._idle),
+            "spawned": self.spawned,
+            "recycled": self.recycled,
+            "spawn_failures": self.spawn_failures,
+        }
+
+    async def _spawn(self) -> PooledMCPServer:
+        async with self._cond:
+            self._size += 1
+        pooled = PooledMCPServer(self.server_factory())
+        try:
+            await pooled.start()
+        except BaseException:
+            self.spawn_failures += 1
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self.spawned += 1
+        return pooled
+
+    async def _acquire(self) -> PooledMCPServer:
+        while True:
+            spawn = False
+            async with self._cond:
+                if self._closed:
+                    raise RuntimeError("MCP server pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                elif self._size < self.max_size:
+                    spawn = True
+                else:
+                    await self._cond.wait()
+                    continue
+
+            if spawn:
+                return await self._spawn()
+
+            idle_for = time.monotonic() - pooled.last_used
+            stale = idle_for > self.health_check_interval
+            if not pooled.alive or (stale and not await pooled.ping(self.health_check_timeout)):
+                print(f"Pooled MCP server {pooled.server.name} failed health check, recycling")
+                await self._discard(pooled)
+                continue
+            return pooled
+
+    async def _release(self, pooled: PooledMCPServer, healthy: bool):
+        pooled.calls += 1
+        pooled.last_used = time.monotonic()
+        if self._closed or not healthy or pooled.calls >= self.max_calls:
+            await self._discard(pooled)
+            return
+        # Agent runs swallow their own errors, so confirm the process survived
+        # the request before handing it out again. This runs off the request path.
+        self._run_in_background(self._verify_and_return(pooled))
+
+    async def _verify_and_return(self, pooled: PooledMCPServer):
+        if await pooled.ping(self.health_check_timeout):
+            await self._add_idle(pooled)
+        else:
+            print(f"Pooled MCP server {pooled.server.name} died during a request, recycling")
+            await self._discard(pooled)
+
+    async def _discard(self, pooled: PooledMCPServer):
+        async with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        self.recycled += 1
+        await self._retire(pooled)
+        if not self._closed and self._size < self.min_size:
+            self._run_in_background(self._replenish())
+
+    async def _retire(self, pooled: PooledMCPServer):
+        await pooled.stop()
+
+    async def _replenish(self):
+        try:
+            pooled = await self._spawn()
+        except Exception as e:
+            print(f"✗ Failed to replenish MCP server pool: {e}")
+            return
+        await self._add_idle(pooled)
+
+    async def _add_idle(self, pooled: PooledMCPServer):
+        if self._closed:
+            await self._discard(pooled)
+            return
+        async with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    async def _health_loop(self):
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval)
+            for pooled in list(self._idle):
+                if await pooled.ping(self.health_check_timeout):
+                    continue
+                async with self._cond:
+                    if pooled not in self._idle:
+                        # Checked out meanwhile; it is verified again on release.
+                        continue
+                    self._idle.remove(pooled)
+                print(f"Pooled MCP server {pooled.server.name} is unhealthy, recycling")
+                await self._discard(pooled)
+            while not self._closed and self._size < self.min_size:
+                try:
+                    pooled = await self._spawn()
+                except Exception as e:
+                    print(f"✗ Failed to replenish MCP server pool: {e}")
+                    break
+                await self._add_idle(pooled)
+
+    def _run_in_background(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
@@ -0,0 +1,349 @@
+import asyncio
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, FrozenSet, Iterable, List, Tuple
+from a2a.server.agent_execution import AgentExecutor
+from a2a.server.agent_execution.context import RequestContext
+from a2a.server.events import InMemoryQueueManager
+from a2a.server.events.event_queue import EventQueue
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+# JSON-RPC methods of the A2A protocol; anything else is counted as "unknown" to bound the label values
+A2A_METHODS = {
+    "message/send",
+    "message/stream",
+    "tasks/get",
+    "tasks/cancel",
+    "tasks/resubscribe",
+    "tasks/pushNotificationConfig/set",
+    "tasks/pushNotificationConfig/get",
+    "tasks/pushNotificationConfig/list",
+    "tasks/pushNotificationConfig/delete",
+    "agent/getAuthenticatedExtendedCard",
+}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        values = self._values if self._values or self.label_names else {(): 0}
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self._counts.setdefault(key, [0] * len(self.buckets))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block in seconds (also when it raises)"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(self._sums[key])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text exposition format.
+
+    Instruments are created once at import time by the modules that update
+    them. Components that already keep counters in a `stats` dict (pools,
+    caches, task stores) are registered with `register_stats` and read at
+    scrape time; the keys passed as `counters` are exported as counters,
+    everything else as gauges. With several uvicorn workers every worker reports its own
+    numbers.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._stats: Dict[str, Tuple[Callable[[], dict], str, FrozenSet[str]]] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def register_stats(self, prefix: str, stats: Callable[[], dict], help: str, counters: Iterable[str] = ()):
+        """Export the numeric entries of a `stats` dict as `<prefix>_<key>` gauges.
+
+        Keys listed in `counters` only ever grow and are exported as
+        `<prefix>_<key>_total` counters instead.
+        """
+        self._stats[prefix] = (stats, help, frozenset(counters))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for prefix, (stats, help, counters) in self._stats.items():
+            try:
+                values = stats()
+            except Exception as e:
+                print(f"Failed to collect {prefix} stats: {e}")
+                continue
+            for key, value in values.items():
+                if not isinstance(value, (int, float)):
+                    continue
+                if key in counters:
+                    name, kind = f"{prefix}_{key}_total", "counter"
+                else:
+                    name, kind = f"{prefix}_{key}", "gauge"
+                lines += [f"# HELP {name} {help} ({key})", f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+HTTP_REQUESTS = metrics.counter(
+    "a2a_requests_total", "A2A HTTP requests by JSON-RPC method and status", ("method", "status"))
+HTTP_DURATION = metrics.histogram(
+    "a2a_request_duration_seconds", "A2A request latency until the response (or stream) is complete", ("method",))
+HTTP_IN_FLIGHT = metrics.gauge("a2a_requests_in_flight", "A2A requests being served", ("method",))
+
+EXECUTIONS_IN_FLIGHT = metrics.gauge("agent_executions_in_flight", "Agent executions currently running")
+EXECUTION_DURATION = metrics.histogram(
+    "agent_execution_duration_seconds", "Agent execution time by outcome", ("outcome",))
+
+LLM_DURATION = metrics.histogram("llm_request_duration_seconds", "LLM call latency", ("model", "streamed"))
+LLM_FIRST_EVENT = metrics.histogram(
+    "llm_time_to_first_event_seconds", "Time until a streamed LLM call produced its first event", ("model",))
+LLM_TOKENS = metrics.counter("llm_tokens_total", "LLM tokens used", ("model", "type"))
+LLM_ERRORS = metrics.counter("llm_errors_total", "Failed LLM calls", ("model",))
+
+MCP_CONNECT_DURATION = metrics.histogram(
+    "mcp_connect_duration_seconds", "Time to spawn and initialize an MCP server", ("server",))
+MCP_CALL_DURATION = metrics.histogram("mcp_call_duration_seconds", "MCP tool call latency", ("server", "tool"))
+MCP_CALL_ERRORS = metrics.counter("mcp_call_errors_total", "MCP tool calls that failed or returned an error", ("server", "tool"))
+
+
+def record_llm_usage(model: str, usage):
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.input_tokens or 0, model=model, type="input")
+    LLM_TOKENS.inc(usage.output_tokens or 0, model=model, type="output")
+
+
+class MeteredAgentExecutor(AgentExecutor):
+    """Wraps an agent executor to count in-flight executions and their durations"""
+
+    def __init__(self, executor: AgentExecutor):
+        self.executor = executor
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue):
+        EXECUTIONS_IN_FLIGHT.inc()
+        outcome = "completed"
+        started_at = time.perf_counter()
+        try:
+            await self.executor.execute(context, event_queue)
+            task = asyncio.current_task()
+            if task is not None and task.cancelling():
+                # The executor reported the cancellation and returned
+                outcome = "cancelled"
+        except BaseException as e:
+            outcome = "cancelled" if isinstance(e, asyncio.CancelledError) else "failed"
+            raise
+        finally:
+            EXECUTIONS_IN_FLIGHT.dec()
+            EXECUTION_DURATION.observe(time.perf_counter() - started_at, outcome=outcome)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue):
+        await self.executor.cancel(context, event_queue)
+
+
+class MeteredQueueManager(InMemoryQueueManager):
+    """In-memory queue manager that reports how many events are waiting in the task event queues"""
+
+    @property
+    def stats(self) -> dict:
+        depths = []
+        pending = deque(self._task_queue.values())
+        while pending:
+            queue = pending.popleft()
+            depths.append(queue.queue.qsize())
+            pending.extend(getattr(queue, "_children", ()))
+        return {
+            "queues": len(self._task_queue),
+            "depth": sum(depths),
+            "max_depth": max(depths, default=0),
+        }
+
+
+def _request_method(body: bytes) -> str:
+    try:
+        method = json.loads(body).get("method")
+    except (ValueError, AttributeError):
+        return "invalid"
+    return method if isinstance(method, str) and method in A2A_METHODS else "unknown"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latency and concurrency per A2A JSON-RPC method.
+
+    POST bodies are read once to find the JSON-RPC method and replayed to the
+    app; streamed (SSE) responses are timed until their last chunk.
+    """
+
+    def __init__(self, app, skip_paths: Tuple[str, ...] = ()):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "POST":
+            buffered = []
+            body = b""
+            while True:
+                message = await receive()
+                buffered.append(message)
+                if message["type"] != "http.request":
+                    break
+                body += message.get("body", b"")
+                if not message.get("more_body", False):
+                    break
+            method = _request_method(body)
+            replay = deque(buffered)
+
+            async def receive_replayed():
+                if replay:
+                    return replay.popleft()
+                return await receive()
+
+            app_receive = receive_replayed
+        else:
+            method = "agent_card" if scope["path"] == AGENT_CARD_WELL_KNOWN_PATH else "other"
+            app_receive = receive
+
+        status = "500"
+
+        async def send_recorded(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method)
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, app_receive, send_recorded)
+        finally:
+            HTTP_IN_FLIGHT.dec(method=method)
+            HTTP_DURATION.observe(time.perf_counter() - started_at, method=method)
+            HTTP_REQUESTS.inc(method=method, status=status)
+
+
+def instrument_app(app: Starlette, path: str = "/metrics") -> Starlette:
+    """Mount the metrics endpoint on an A2A Starlette app and record its requests"""
+
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    app.add_route(path, metrics_endpoint, methods=["GET"])
+    app.add_middleware(MetricsMiddleware, skip_paths=(path,))
+    return app
@@ -0,0 +1,276 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+from agents.mcp import MCPServer, MCPServerStdio
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from mcp.types import CallToolResult, GetPromptResult, ListPromptsResult, Tool as MCPTool
+from openai.types.responses import ResponseOutputItem, ResponseStreamEvent
+from pydantic import TypeAdapter
+
+
+OUTPUT_ITEM = TypeAdapter(ResponseOutputItem)
+STREAM_EVENT = TypeAdapter(ResponseStreamEvent)
+
+
+class ReplayMissError(RuntimeError):
+    """Raised when a replayed run makes a request that is not in the trace"""
+
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode + "t") if path.endswith(".gz") else open(path, mode)
+
+
+def _key(*parts: Any) -> str:
+    encoded = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()[:32]
+
+
+def model_request_key(system_instructions: Optional[str], input: Any, tools: list) -> str:
+    return _key("model", system_instructions, input, sorted(tool.name for tool in tools))
+
+
+def tool_call_key(server_name: str, tool_name: str, arguments: Optional[dict]) -> str:
+    return _key("mcp", server_name, tool_name, arguments or {})
+
+
+class TraceRecorder:
+    """Appends model and MCP interactions to a JSON-lines trace file (gzipped for .gz paths)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0
+
+    def write(self, record: dict):
+        with _open(self.path, "a") as f:
+            f.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        self.records += 1
+
+
+class TraceReplayer:
+    """Serves recorded interactions by request key.
+
+    Identical requests are answered in the order they were recorded; once
+    those run out the last recording is repeated. With `latency="recorded"`
+    the original timings are reproduced, with `latency="zero"` answers are
+    returned immediately.
+    """
+
+    def __init__(self, path: str, latency: str = "recorded"):
+        self.path = path
+        self.latency = latency
+        self._records: Dict[str, Deque[dict]] = defaultdict(deque)
+        self._last: Dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        with _open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records[record["key"]].append(record)
+
+    def take(self, key: str, description: str) -> dict:
+        queue = self._records.get(key)
+        if queue:
+            self._last[key] = queue.popleft()
+        record = self._last.get(key)
+        if record is None:
+            self.misses += 1
+            raise ReplayMissError(f"No recorded {description} in {self.path} (key {key})")
+        self.hits += 1
+        return record
+
+    async def wait(self, seconds: float):
+        if self.latency == "recorded" and seconds > 0:
+            await asyncio.sleep(seconds)
+
+
+def _usage_record(usage: Usage) -> dict:
+    return {
+        "requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+class RecordingModel(Model):
+    """Wraps a model and records every request/response (or stream of events) with timings"""
+
+    def __init__(self, model: Model, recorder: TraceRecorder):
+        self.model = model
+        self.recorder = recorder
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, prompt=None) -> ModelResponse:
+        started_at = time.perf_counter()
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        )
+        self.recorder.write({
+            "type": "model",
+            "key": model_request_key(system_instructions, input, tools),
+            "duration": round(time.perf_counter() - started_at, 4),
+            "output": [item.model_dump(mode="json", exclude_unset=True) for item in response.output],
+            "usage": _usage_record(response.usage),
+            "response_id": response.response_id,
+        })
+        return response
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, prompt=None) -> AsyncIterator:
+        started_at = time.perf_counter()
+        events = []
+        async for event in self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        ):
+            events.append([round(time.perf_counter() - started_at, 4), event.model_dump(mode="json", exclude_unset=True)])
+            yield event
+        self.recorder.write({
+            "type": "model_stream",
+            "key": model_request_key(system_instructions, input, tools),
+            "duration": round(time.perf_counter() - started_at, 4),
+            "events": events,
+        })
+
+
+class ReplayModel(Model):
+    """Answers model requests from a trace instead of calling the LLM"""
+
+    def __init__(self, replayer: TraceReplayer):
+        self.replayer = replayer
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, prompt=None) -> ModelResponse:
+        key = model_request_key(system_instructions, input, tools)
+        record = self.replayer.take(key, "model response")
+        if record["type"] == "model_stream":
+            # Recorded while streaming: the final response.completed event carries the full response
+            await self.replayer.wait(record["duration"])
+            completed = next(
+                STREAM_EVENT.validate_python(event) for _, event in reversed(record["events"])
+                if event.get("type") == "response.completed"
+            )
+            usage = completed.response.usage
+            return ModelResponse(
+                output=list(completed.response.output),
+                usage=Usage(
+                    requests=1,
+                    input_tokens=usage.input_tokens if usage else 0,
+                    output_tokens=usage.output_tokens if usage else 0,
+                    total_tokens=usage.total_tokens if usage else 0,
+                ),
+                response_id=None,
+            )
+
+        await self.replayer.wait(record["duration"])
+        return ModelResponse(
+            output=[OUTPUT_ITEM.validate_python(item) for item in record["output"]],
+            usage=Usage(**record["usage"]),
+            response_id=record.get("response_id"),
+        )
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, prompt=None) -> AsyncIterator:
+        key = model_request_key(system_instructions, input, tools)
+        record = self.replayer.take(key, "model stream")
+        if record["type"] != "model_stream":
+            raise ReplayMissError(f"Trace {self.replayer.path} has no streamed response for key {key}")
+
+        elapsed = 0.0
+        for offset, event in record["events"]:
+            await self.replayer.wait(offset - elapsed)
+            elapsed = offset
+            yield STREAM_EVENT.validate_python(event)
+
+
+class RecordingMCPServerStdio(MCPServerStdio):
+    """MCPServerStdio that records tool listings and tool calls with their timings"""
+
+    def __init__(self, recorder: TraceRecorder, **kwargs):
+        super().__init__(**kwargs)
+        self.recorder = recorder
+
+    async def list_tools(self, run_context=None, agent=None) -> List[MCPTool]:
+        started_at = time.perf_counter()
+        tools = await super().list_tools(run_context, agent)
+        self.recorder.write({
+            "type": "mcp_list_tools",
+            "key": _key("mcp_list_tools", self.name),
+            "duration": round(time.perf_counter() - started_at, 4),
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        })
+        return tools
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict]) -> CallToolResult:
+        started_at = time.perf_counter()
+        result = await super().call_tool(tool_name, arguments)
+        self.recorder.write({
+            "type": "mcp_call",
+            "key": tool_call_key(self.name, tool_name, arguments),
+            "tool": tool_name,
+            "duration": round(time.perf_counter() - started_at, 4),
+            "result": result.model_dump(mode="json", exclude_none=True),
+        })
+        return result
+
+
+class ReplayMCPServer(MCPServer):
+    """MCP server answering tool listings and calls from a trace, without spawning a process.
+
+    `session` mimics the connected client session so the MCP server pool can
+    health-check replayed servers like real ones.
+    """
+
+    def __init__(self, replayer: TraceReplayer, name: str):
+        super().__init__()
+        self.replayer = replayer
+        self._name = name
+        self._connected = False
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def session(self):
+        return self if self._connected else None
+
+    async def send_ping(self):
+        return None
+
+    async def connect(self):
+        self._connected = True
+
+    async def cleanup(self):
+        self._connected = False
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.cleanup()
+
+    async def list_tools(self, run_context=None, agent=None) -> List[MCPTool]:
+        record = self.replayer.take(_key("mcp_list_tools", self.name), "MCP tool listing")
+        await self.replayer.wait(record["duration"])
+        return [MCPTool.model_validate(tool) for tool in record["tools"]]
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict]) -> CallToolResult:
+        record = self.replayer.take(tool_call_key(self.name, tool_name, arguments), f"call of MCP tool {tool_name}")
+        await self.replayer.wait(record["duration"])
+        return CallToolResult.model_validate(record["result"])
+
+    async def list_prompts(self) -> ListPromptsResult:
+        return ListPromptsResult(prompts=[])
+
+    async def get_prompt(self, name: str, arguments: Optional[dict] = None) -> GetPromptResult:
+        raise ReplayMissError(f"Prompt {name} is not available while replaying {self.replayer.path}")
@@ -0,0 +1,201 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from a2a.server.tasks import TaskStore
+from a2a.types import Task
+from common.task_store import TERMINAL_STATES
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    context_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    finished INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_context_id ON tasks (context_id);
+CREATE INDEX IF NOT EXISTS tasks_finished_updated_at ON tasks (finished, updated_at);
+"""
+
+UPSERT = """
+INSERT INTO tasks (id, context_id, state, finished, updated_at, data) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    context_id = excluded.context_id,
+    state = excluded.state,
+    finished = excluded.finished,
+    updated_at = excluded.updated_at,
+    data = excluded.data
+"""
+
+# Finished tasks past the newest `max_tasks` or beyond `max_bytes` of task data, newest kept first
+TRIM = """
+DELETE FROM tasks WHERE id IN (
+    SELECT id FROM (
+        SELECT id,
+               ROW_NUMBER() OVER (ORDER BY updated_at DESC) AS position,
+               SUM(LENGTH(data)) OVER (ORDER BY updated_at DESC ROWS UNBOUNDED PRECEDING) AS total
+        FROM tasks WHERE finished = 1
+    ) WHERE position > ? OR total > ?
+)
+"""
+
+CLEANUP_INTERVAL = 60.0
+
+
+class SQLiteTaskStore(TaskStore):
+    """Task store backed by a SQLite database in WAL mode.
+
+    Several uvicorn workers can share one database file, so a task lookup or
+    follow-up request that lands on another worker still finds the task.
+    Intermediate updates (status changes, streamed artifact chunks) are
+    buffered and written in batches every `batch_interval` seconds, keeping
+    only the latest version of each task; a task reaching a terminal state is
+    written immediately so other workers see the final result. Finished tasks
+    older than `ttl` seconds, and the oldest ones beyond `max_tasks` tasks or
+    `max_bytes` of task data, are deleted periodically; running tasks are
+    never deleted.
+    """
+
+    def __init__(self, path: str, batch_interval: float = 0.05, batch_size: int = 100,
+                 ttl: Optional[float] = None, max_tasks: int = 1000, max_bytes: int = 50_000_000,
+                 busy_timeout: float = 5.0):
+        self.path = path
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self.ttl = ttl
+        self.max_tasks = max_tasks
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        # One thread owns the connection, so database calls never overlap
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-task-store")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, Task] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._last_cleanup = time.monotonic()
+        self.saves = 0
+        self.writes = 0
+        self.flushes = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "saves": self.saves,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "pending": len(self._pending),
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+    async def save(self, task: Task) -> None:
+        self.saves += 1
+        self._pending[task.id] = task
+        if task.status.state in TERMINAL_STATES or len(self._pending) >= self.batch_size:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def get(self, task_id: str) -> Optional[Task]:
+        task = self._pending.get(task_id)
+        if task is not None:
+            return task
+        row = await self._run(self._select, "SELECT data FROM tasks WHERE id = ?", (task_id,))
+        return Task.model_validate_json(row[0][0]) if row else None
+
+    async def get_by_context(self, context_id: str) -> List[Task]:
+        """All tasks of a conversation, oldest first"""
+        await self.flush()
+        rows = await self._run(
+            self._select, "SELECT data FROM tasks WHERE context_id = ? ORDER BY updated_at", (context_id,)
+        )
+        return [Task.model_validate_json(data) for (data,) in rows]
+
+    async def delete(self, task_id: str) -> None:
+        self._pending.pop(task_id, None)
+        await self._run(self._execute, "DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    async def flush(self):
+        """Write all buffered task updates in one transaction"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            now = time.time()
+            rows = [
+                (
+                    task.id,
+                    task.context_id,
+                    task.status.state.value,
+                    int(task.status.state in TERMINAL_STATES),
+                    now,
+                    task.model_dump_json(),
+                )
+                for task in batch.values()
+            ]
+            try:
+                await self._run(self._write, rows)
+            except Exception:
+                # Keep the batch (unless newer updates arrived) so the next flush retries it
+                self._pending = {**batch, **self._pending}
+                raise
+            self.writes += len(rows)
+            self.flushes += 1
+
+        if time.monotonic() - self._last_cleanup >= CLEANUP_INTERVAL:
+            self._last_cleanup = time.monotonic()
+            if self.ttl is not None:
+                self.expired += await self._run(
+                    self._execute, "DELETE FROM tasks WHERE finished = 1 AND updated_at < ?", (time.time() - self.ttl,)
+                )
+            self.evicted += await self._run(self._execute, TRIM, (self.max_tasks, self.max_bytes))
+
+    async def close(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.batch_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Failed to write tasks to {self.path}: {e}")
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _select(self, sql: str, params: tuple) -> list:
+        return self._connection().execute(sql, params).fetchall()
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        conn = self._connection()
+        with conn:
+            return conn.execute(sql, params).rowcount
+
+    def _write(self, rows: list):
+        conn = self._connection()
+        with conn:
+            conn.executemany(UPSERT, rows)
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from a2a.server.tasks import TaskStore
+from a2a.types import Task, TaskState
+
+
+TERMINAL_STATES = {TaskState.completed, TaskState.canceled, TaskState.failed, TaskState.rejected}
+
+
+class BoundedTaskStore(TaskStore):
+    """In-memory task store with a task count limit, a byte budget and TTL eviction.
+
+    Tasks that reached a terminal state are dropped `ttl` seconds after they
+    finished, and the oldest finished tasks are evicted early whenever the
+    store holds more than `max_tasks` tasks or `max_bytes` of serialized task
+    data. Tasks that are still running are never evicted, since the request
+    handler keeps updating them.
+
+    A task is only serialized to measure its size when its state changes:
+    streamed answers are saved after every chunk, and measuring each save
+    would cost time quadratic in the answer's length. The sizes of running
+    tasks lag behind until they finish.
+    """
+
+    def __init__(self, max_tasks: int = 1000, max_bytes: int = 50_000_000, ttl: float = 600.0):
+        self.max_tasks = max_tasks
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._tasks: Dict[str, Task] = {}
+        self._sizes: Dict[str, int] = {}
+        self._states: Dict[str, TaskState] = {}
+        # Finished task ids in the order they finished
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._bytes = 0
+        self._lock = asyncio.Lock()
+        self.expired = 0
+        self.evicted = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "resident": len(self._tasks),
+            "resident_bytes": self._bytes,
+            "finished": len(self._finished),
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+    async def save(self, task: Task) -> None:
+        async with self._lock:
+            size = self._sizes.get(task.id)
+            if size is None or self._states.get(task.id) != task.status.state:
+                size = len(task.model_dump_json())
+            self._remove(task.id)
+            self._tasks[task.id] = task
+            self._sizes[task.id] = size
+            self._states[task.id] = task.status.state
+            self._bytes += size
+            if task.status.state in TERMINAL_STATES:
+                self._finished[task.id] = time.monotonic()
+            self._evict()
+
+    async def get(self, task_id: str) -> Optional[Task]:
+        async with self._lock:
+            self._evict()
+            return self._tasks.get(task_id)
+
+    async def delete(self, task_id: str) -> None:
+        async with self._lock:
+            self._remove(task_id)
+
+    async def close(self):
+        """Nothing to release; tasks only live in this process"""
+
+    def _remove(self, task_id: str):
+        if task_id in self._tasks:
+            del self._tasks[task_id]
+            self._bytes -= self._sizes.pop(task_id)
+            del self._states[task_id]
+        self._finished.pop(task_id, None)
+
+    def _evict(self):
+        expires_before = time.monotonic() - self.ttl
+        while self._finished:
+            task_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > expires_before:
+                break
+            self._remove(task_id)
+            self.expired += 1
+
+        while self._finished and (len(self._tasks) > self.max_tasks or self._bytes > self.max_bytes):
+            task_id = next(iter(self._finished))
+            self._remove(task_id)
+            self.evicted += 1
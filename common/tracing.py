@@ -0,0 +1,346 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+import httpx
+from agents.mcp import MCPServer
+from agents.models.interface import Model
+from agents.models.multi_provider import MultiProvider
+from common.deadline import within_deadline
+from common.metrics import (
+    LLM_DURATION,
+    LLM_ERRORS,
+    LLM_FIRST_EVENT,
+    MCP_CALL_DURATION,
+    MCP_CALL_ERRORS,
+    MCP_CONNECT_DURATION,
+    record_llm_usage,
+)
+
+
+# W3C trace context header, carried in A2A message metadata between agents
+TRACEPARENT = "traceparent"
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @classmethod
+    def from_traceparent(cls, value: Any) -> Optional["SpanContext"]:
+        parts = value.split("-") if isinstance(value, str) else []
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        return cls(trace_id=parts[1], span_id=parts[2])
+
+
+@dataclass
+class Span:
+    name: str
+    service: str
+    context: SpanContext
+    parent_id: Optional[str]
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": self.service,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class SpanExporter:
+    """Writes finished spans as JSON lines to a file and/or posts them in OTLP/HTTP JSON batches to a collector"""
+
+    def __init__(self, path: Optional[str] = None, collector_url: Optional[str] = None, flush_interval: float = 2.0):
+        self.path = path
+        self.collector_url = collector_url
+        self.flush_interval = flush_interval
+        self._pending: List[Span] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self.exported = 0
+        self.failed = 0
+
+    def export(self, span: Span):
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+            self.exported += 1
+        if self.collector_url:
+            self._pending.append(span)
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def flush(self):
+        if not self._pending or not self.collector_url:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                response = await client.post(self.collector_url, json=self._otlp(batch))
+                response.raise_for_status()
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Failed to export {len(batch)} spans to {self.collector_url}: {e}")
+
+    async def close(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    @staticmethod
+    def _otlp(spans: List[Span]) -> dict:
+        by_service: Dict[str, List[dict]] = {}
+        for span in spans:
+            otlp_span = {
+                "traceId": span.context.trace_id,
+                "spanId": span.context.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            by_service.setdefault(span.service, []).append(otlp_span)
+        return {"resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+                "scopeSpans": [{"scope": {"name": "a2a-agents"}, "spans": service_spans}],
+            }
+            for service, service_spans in by_service.items()
+        ]}
+
+
+class Tracer:
+    """Span-based tracer shared by the orchestrator and the sub-agents.
+
+    Spans nest through a context variable within a process and across
+    processes through a `traceparent` entry in the A2A message metadata.
+    The tracer does nothing until `configure()` enables it.
+    """
+
+    def __init__(self):
+        self.service_name = "agent"
+        self.enabled = False
+        self.exporter: Optional[SpanExporter] = None
+
+    def configure(self, service_name: str, enabled: bool, path: Optional[str] = None,
+                  collector_url: Optional[str] = None):
+        self.service_name = service_name
+        self.enabled = enabled and bool(path or collector_url)
+        self.exporter = SpanExporter(path, collector_url) if self.enabled else None
+        if self.enabled:
+            print(f"Tracing {service_name} to {', '.join(target for target in (path, collector_url) if target)}")
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[SpanContext] = None, **attributes):
+        """Run the block in a new span (a child of `parent` or of the current span); yields None when disabled"""
+        if not self.enabled:
+            yield None
+            return
+
+        if parent is None:
+            current = current_span.get()
+            parent = current.context if current is not None else None
+        context = SpanContext(
+            trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+        )
+        span = Span(name, self.service_name, context, parent.span_id if parent is not None else None,
+                    attributes=dict(attributes))
+        token = current_span.set(span)
+        try:
+            yield span
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            try:
+                current_span.reset(token)
+            except ValueError:
+                # An async generator finalized outside the context it was started in
+                pass
+            span.end_ns = time.time_ns()
+            self.exporter.export(span)
+
+    def inject(self, metadata: Optional[dict] = None) -> dict:
+        """Add the current span's traceparent to outgoing A2A message metadata"""
+        metadata = dict(metadata or {})
+        span = current_span.get()
+        if self.enabled and span is not None:
+            metadata[TRACEPARENT] = span.context.traceparent
+        return metadata
+
+    @staticmethod
+    def extract(metadata: Optional[dict]) -> Optional[SpanContext]:
+        """Trace context of an incoming A2A message, if the caller sent one"""
+        return SpanContext.from_traceparent((metadata or {}).get(TRACEPARENT))
+
+    async def close(self):
+        if self.exporter is not None:
+            await self.exporter.close()
+
+
+tracer = Tracer()
+
+
+class TracedModel(Model):
+    """Wraps a model so that every LLM turn is recorded as a span and in the LLM metrics"""
+
+    def __init__(self, model: Model, model_name: str):
+        self.model = model
+        self.model_name = model_name
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, prompt=None):
+        with tracer.span("llm.turn", model=self.model_name, streamed=False, tools=len(tools)) as span, \
+                LLM_DURATION.time(model=self.model_name, streamed="false"):
+            try:
+                response = await self.model.get_response(
+                    system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                    previous_response_id=previous_response_id, prompt=prompt,
+                )
+            except Exception:
+                LLM_ERRORS.inc(model=self.model_name)
+                raise
+            record_llm_usage(self.model_name, response.usage)
+            if span is not None:
+                span.set_attribute("output_tokens", response.usage.output_tokens)
+            return response
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, prompt=None) -> AsyncIterator:
+        with tracer.span("llm.turn", model=self.model_name, streamed=True, tools=len(tools)) as span, \
+                LLM_DURATION.time(model=self.model_name, streamed="true"):
+            started_at = time.perf_counter()
+            first_event = True
+            try:
+                async for event in self.model.stream_response(
+                    system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                    previous_response_id=previous_response_id, prompt=prompt,
+                ):
+                    if first_event:
+                        elapsed = time.perf_counter() - started_at
+                        LLM_FIRST_EVENT.observe(elapsed, model=self.model_name)
+                        if span is not None:
+                            span.set_attribute("time_to_first_event_ms", round(elapsed * 1000, 3))
+                    first_event = False
+                    if getattr(event, "type", None) == "response.completed":
+                        record_llm_usage(self.model_name, event.response.usage)
+                    yield event
+            except Exception:
+                LLM_ERRORS.inc(model=self.model_name)
+                raise
+
+
+def traced_model(model: Union[str, Model]) -> Model:
+    """The model wrapped in a TracedModel (model names are resolved first)"""
+    if isinstance(model, str):
+        return TracedModel(MultiProvider().get_model(model), model)
+    return TracedModel(model, type(model).__name__)
+
+
+class TracedMCPServer(MCPServer):
+    """Wraps an MCP server so that process spawn, tool listings and tool calls are recorded as spans and metrics"""
+
+    def __init__(self, server: MCPServer):
+        super().__init__(use_structured_content=server.use_structured_content)
+        self.server = server
+
+    @property
+    def name(self) -> str:
+        return self.server.name
+
+    @property
+    def session(self):
+        return getattr(self.server, "session", None)
+
+    async def connect(self):
+        with tracer.span("mcp.connect", server=self.name), MCP_CONNECT_DURATION.time(server=self.name):
+            await self.server.connect()
+
+    async def cleanup(self):
+        await self.server.cleanup()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.cleanup()
+
+    async def list_tools(self, run_context=None, agent=None):
+        with tracer.span("mcp.list_tools", server=self.name):
+            return await self.server.list_tools(run_context, agent)
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict]):
+        with tracer.span("mcp.call_tool", server=self.name, tool=tool_name) as span, \
+                MCP_CALL_DURATION.time(server=self.name, tool=tool_name):
+            try:
+                async with within_deadline(f"the {tool_name} tool call"):
+                    result = await self.server.call_tool(tool_name, arguments)
+            except Exception:
+                MCP_CALL_ERRORS.inc(server=self.name, tool=tool_name)
+                raise
+            if result.isError:
+                MCP_CALL_ERRORS.inc(server=self.name, tool=tool_name)
+                if span is not None:
+                    span.error = "tool returned an error"
+            return result
+
+    async def list_prompts(self):
+        return await self.server.list_prompts()
+
+    async def get_prompt(self, name: str, arguments: Optional[dict] = None):
+        return await self.server.get_prompt(name, arguments)
+
+
+def traced_mcp_server(server: MCPServer) -> MCPServer:
+    """The server wrapped in a TracedMCPServer"""
+    return TracedMCPServer(server)
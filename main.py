@@ -1,8 +1,18 @@
 import httpx
 from a2a.client import A2AClient
-from a2a.types import SendMessageRequest, MessageSendParams
+from a2a.types import (
+    JSONRPCErrorResponse,
+    Message,
+    MessageSendParams,
+    SendMessageRequest,
+    SendStreamingMessageRequest,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+)
+from a2a.utils import get_message_text, get_text_parts
 from uuid import uuid4
 import json
+import time
 from datetime import datetime
 from typing import Optional
 import asyncio
@@ -13,15 +23,18 @@ import uuid
 class InteractiveA2ATestClient:
     """Interactive test client for A2A orchestrator"""
     
-    def __init__(self, orchestrator_url: str = "http://localhost:7000"):
+    def __init__(self, orchestrator_url: str = "http://localhost:7000", streaming: bool = True, timeout: float = 120.0):
         self.orchestrator_url = orchestrator_url
+        self.streaming = streaming
+        # End-to-end deadline of each message, passed on to the orchestrator and its sub-agents
+        self.timeout = timeout
         self.session_id = uuid4().hex
         self.conversation_history = []
         self.client = None
         self.httpx_client = None
     
     async def __aenter__(self):
-        self.httpx_client = httpx.AsyncClient(timeout=120.0)
+        self.httpx_client = httpx.AsyncClient(timeout=self.timeout)
         try:
             self.client = A2AClient( 
                     url=self.orchestrator_url,
@@ -48,20 +61,33 @@ class InteractiveA2ATestClient:
                     'role': 'user',
                     'parts': [{'type': 'text', 'text': message}],
                     'messageId': uuid4().hex,
+                    'metadata': {'timeout_ms': int(self.timeout * 1000)},
+                    # The orchestrator keeps the conversation of each context id (our session)
+                    'contextId': self.session_id,
                 },
-                'sessionId': self.session_id
             }
+            params = MessageSendParams(**send_message_payload)
+            started_at = time.perf_counter()
             
-            request = SendMessageRequest(id=str(uuid.uuid4()),params=MessageSendParams(**send_message_payload))
-            response = await self.client.send_message(request)
+            async with asyncio.timeout(self.timeout):
+                if self.streaming:
+                    response_text, response_data, time_to_first_token = await self._send_streaming(params, started_at)
+                else:
+                    request = SendMessageRequest(id=str(uuid.uuid4()),params=params)
+                    response = await self.client.send_message(request)
+                    
+                    response_data = response.model_dump(mode='json', exclude_none=True)
+                    response_text = self._extract_response_text(response_data)
+                    time_to_first_token = None
             
-            response_data = response.model_dump(mode='json', exclude_none=True)
-            response_text = self._extract_response_text(response_data)
+            total_time = time.perf_counter() - started_at
             
             self.conversation_history.append({
                 'timestamp': datetime.now().isoformat(),
                 'user_message': message,
                 'orchestrator_response': response_text,
+                'time_to_first_token': time_to_first_token,
+                'total_time': total_time,
                 'raw_response': response_data
             })
             
@@ -72,6 +98,50 @@ class InteractiveA2ATestClient:
             print(f"❌ {error_msg}")
             return error_msg
     
+    async def _send_streaming(self, params: MessageSendParams, started_at: float):
+        """Stream the orchestrator's answer, rendering chunks as they arrive"""
+        request = SendStreamingMessageRequest(id=str(uuid.uuid4()), params=params)
+        time_to_first_token = None
+        current_artifact = None
+        response_chunks = []
+        final_text = None
+        events = []
+        
+        async for response in self.client.send_message_streaming(request):
+            events.append(response.model_dump(mode='json', exclude_none=True))
+            if isinstance(response.root, JSONRPCErrorResponse):
+                raise RuntimeError(response.root.error.message)
+            
+            event = response.root.result
+            if isinstance(event, TaskArtifactUpdateEvent):
+                text = "".join(get_text_parts(event.artifact.parts))
+                if not text:
+                    continue
+                if time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - started_at
+                # Sub-agent output is relayed in artifacts named after the agent
+                if event.artifact.name != current_artifact:
+                    current_artifact = event.artifact.name
+                    label = "🤖 Orchestrator" if current_artifact == "response" else f"📡 {current_artifact}"
+                    print(f"\n{label}: ", end="", flush=True)
+                print(text, end="", flush=True)
+                if current_artifact == "response":
+                    response_chunks.append(text)
+            elif isinstance(event, TaskStatusUpdateEvent) and event.status.message:
+                final_text = get_message_text(event.status.message)
+            elif isinstance(event, Message):
+                final_text = get_message_text(event)
+        
+        if time_to_first_token is None and final_text:
+            print(f"\n🤖 Orchestrator: {final_text}", end="")
+        print()
+        total_time = time.perf_counter() - started_at
+        if time_to_first_token is not None:
+            print(f"⏱  First token after {time_to_first_token:.2f}s, complete after {total_time:.2f}s")
+        
+        response_text = final_text if final_text is not None else "".join(response_chunks)
+        return response_text, events, time_to_first_token
+    
     def _extract_response_text(self, response_data) -> str:
         """Extract text from A2A response"""
         try:
@@ -79,6 +149,10 @@ class InteractiveA2ATestClient:
             if 'result' in response_data and isinstance(response_data['result'], dict):
                 result = response_data['result']
 
+                status_message = result.get('status', {}).get('message')
+                if status_message and status_message.get('parts') and 'text' in status_message['parts'][0]:
+                    return status_message['parts'][0]['text']
+
                 if 'parts' in result and isinstance(result['parts'], list) and len(result['parts']) > 0:
  
                     first_part = result['parts'][0]
@@ -173,7 +247,8 @@ async def chat_loop(client):
                 continue
 
             response = await client.send_message(user_input)
-            print(f"\n🤖 Orchestrator: {response}")
+            if not getattr(client, 'streaming', False):
+                print(f"\n🤖 Orchestrator: {response}")
             
         except KeyboardInterrupt:
             print("\n\n👋 Goodbye!")
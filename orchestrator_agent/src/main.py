@@ -1,10 +1,20 @@
 import asyncio
 import uvicorn
+from contextlib import asynccontextmanager
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill 
+from properties.config import OrchestratorConfig
 from services.agent_executor import AdvancedOrchestratorAgentExecutor
+from services.agent_registry import agent_registry
+from services.circuit_breaker import agent_health
+from services.execute_agent import create_admission_controller, create_task_store, query_router, session_store
+from services.http_pool import agent_client_pool
+from common.metrics import MeteredAgentExecutor, MeteredQueueManager, instrument_app, metrics
+from services.card_renderer import card_renderer
+from services.orchestrator_agent import orchestrator_agent_cache
+from services.tools import agent_call_flight
+from common.tracing import tracer
 
 
 def create_advanced_orchestrator_agent_card():
@@ -59,7 +69,7 @@ def create_advanced_orchestrator_agent_card():
         logic and adaptive routing based on agent responses.""",
         url="http://localhost:7000/",  
         skills=[intelligent_routing_skill, dynamic_agent_discovery_skill, workflow_coordination_skill],
-        capabilities=AgentCapabilities(),
+        capabilities=AgentCapabilities(streaming=True),
         version="2.0.0",
         defaultInputModes=["text", "json"],
         defaultOutputModes=["text", "json"]
@@ -69,17 +79,26 @@ def create_advanced_orchestrator_agent_card():
     return agent_card
 
 
-def main():
-    """Main function to start the advanced A2A orchestrator agent server"""
-
+def create_app():
+    """Build the advanced orchestrator Starlette app (also used as the uvicorn worker factory)"""
+    
+    tracer.configure(
+        service_name=OrchestratorConfig.AGENT_NAME,
+        enabled=OrchestratorConfig.TRACING_ENABLED,
+        path=OrchestratorConfig.SPAN_EXPORT_FILE,
+        collector_url=OrchestratorConfig.SPAN_COLLECTOR_URL,
+    )
 
     agent_card = create_advanced_orchestrator_agent_card()
-
-
+    task_store = create_task_store()
+    admission = create_admission_controller()
+    orchestrator_executor = AdvancedOrchestratorAgentExecutor(admission=admission)
     
+    queue_manager = MeteredQueueManager()
     request_handler = DefaultRequestHandler(
-        agent_executor=AdvancedOrchestratorAgentExecutor(),
-        task_store=InMemoryTaskStore(),
+        agent_executor=MeteredAgentExecutor(orchestrator_executor),
+        task_store=task_store,
+        queue_manager=queue_manager,
     )
     
     app = A2AStarletteApplication(
@@ -87,6 +106,54 @@ def main():
         http_handler=request_handler,
     )
     
+    @asynccontextmanager
+    async def lifespan(app):
+        # Discover agents once at startup and keep the registry fresh in the background
+        await agent_registry.start()
+        # Probe the agents whose circuit is open so they are let back in once they recover
+        agent_health.start(agent_registry.probe)
+        try:
+            yield
+        finally:
+            await agent_health.stop()
+            await agent_registry.stop()
+            await agent_client_pool.close()
+            await task_store.close()
+            await tracer.close()
+    
+    starlette_app = app.build(lifespan=lifespan)
+    if OrchestratorConfig.METRICS_ENABLED:
+        metrics.register_stats("admission", lambda: admission.stats, "Admission control",
+                               counters=("admitted", "queued", "rejected_queue_full", "rejected_timeout", "expired"))
+        metrics.register_stats("executions", lambda: orchestrator_executor.executions.stats, "Running executions", counters=("cancelled",))
+        metrics.register_stats("a2a_event_queue", lambda: queue_manager.stats, "A2A task event queues")
+        metrics.register_stats("task_store", lambda: task_store.stats, "A2A task store",
+                               counters=("saves", "writes", "flushes", "expired", "evicted"))
+        metrics.register_stats("agent_registry", lambda: agent_registry.stats, "Agent registry",
+                               counters=("fresh_hits", "refreshes"))
+        metrics.register_stats("skill_index", lambda: agent_registry.index.stats, "Agent skill index",
+                               counters=("lookups",))
+        metrics.register_stats("orchestrator_agent_cache", lambda: orchestrator_agent_cache.stats, "Cached orchestrator Agent",
+                               counters=("lookups", "builds"))
+        metrics.register_stats("card_renderer", lambda: card_renderer.stats, "Agent cards rendered for the prompt",
+                               counters=("compiles", "lookups", "render_hits", "trimmed"))
+        metrics.register_stats("query_router", lambda: query_router.stats, "Pre-LLM query router",
+                               counters=("routed", "listed", "fallbacks"))
+        metrics.register_stats("sessions", lambda: session_store.stats, "Conversation sessions",
+                               counters=("compactions", "compaction_failures"))
+        metrics.register_stats("subagent_single_flight", lambda: agent_call_flight.stats, "Coalesced sub-agent calls",
+                               counters=("calls", "coalesced", "result_hits"))
+        instrument_app(starlette_app, OrchestratorConfig.METRICS_PATH)
+    return starlette_app
+
+
+def main():
+    """Main function to start the advanced A2A orchestrator agent server"""
+
+
+    agent_card = create_advanced_orchestrator_agent_card()
+
+
     # Configure and start the server
     print("Starting Advanced Orchestrator Agent A2A Server...")
     print(f"Agent Card: {agent_card.name}")
@@ -107,8 +174,13 @@ def main():
     print("="*70)
     
     # Start the server
+    if OrchestratorConfig.WORKERS > 1:
+        # Every worker builds its own app (and agent registry) from the factory
+        uvicorn.run("main:create_app", factory=True, workers=OrchestratorConfig.WORKERS, host="0.0.0.0", port=7000, log_level="info")
+        return
+    
     uvicorn.run(
-        app.build(), 
+        create_app(), 
         host="0.0.0.0",
         port=7000,  
         log_level="info",
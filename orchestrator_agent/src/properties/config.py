@@ -0,0 +1,128 @@
+import os
+
+
+class OrchestratorConfig:
+    """Configuration settings for the orchestrator agent"""
+    
+    # Server settings
+    HOST = "0.0.0.0"
+    PORT = 7000
+    
+    # Agent settings
+    AGENT_NAME = "AdvancedOrchestratorAgent"
+    AGENT_VERSION = "2.0.0"
+    
+    # Agent registry settings (seconds)
+    REGISTRY_TTL = 120.0
+    REGISTRY_REFRESH_INTERVAL = 30.0
+    REGISTRY_FILE = "discovered_agents.json"
+    # Discover agents by scanning SCAN_HOSTS over the SCAN_*_PORT range instead of probing the known agent URLs
+    REGISTRY_SCAN = False
+    
+    # Agent discovery scanner settings
+    SCAN_HOSTS = ["localhost"]
+    SCAN_START_PORT = 7000
+    SCAN_END_PORT = 8000
+    SCAN_MAX_CONCURRENCY = 200
+    SCAN_CONNECT_TIMEOUT = 0.5
+    SCAN_MAX_CARD_FETCHES = 20
+    
+    # Inter-agent HTTP connection pool settings
+    HTTP_MAX_CONNECTIONS = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+    HTTP_KEEPALIVE_EXPIRY = 30.0
+    HTTP_ENABLE_HTTP2 = False
+    HTTP_TIMEOUT = 60.0
+    DISCOVERY_TIMEOUT = 10.0
+    
+    # Per-call timeout for parallel fan-out tool calls (seconds)
+    FANOUT_CALL_TIMEOUT = 60.0
+    
+    # Budget of one upstream sub-agent request, whoever is waiting for it; running out of it counts
+    # against the agent's circuit breaker. Callers with a shorter timeout stop waiting on their own.
+    SUBAGENT_CALL_TIMEOUT = 60.0
+    
+    # Identical concurrent sub-agent calls share one request; successful answers are reused
+    # for this many seconds (0 = only coalesce in-flight calls)
+    SINGLE_FLIGHT_RESULT_TTL = 5.0
+    
+    # Sub-agent circuit breakers: a circuit opens when CIRCUIT_FAILURE_RATIO of the calls made in the last
+    # CIRCUIT_WINDOW seconds failed (at least CIRCUIT_MIN_CALLS calls), or after CIRCUIT_CONSECUTIVE_FAILURES
+    # failures in a row; calls slower than CIRCUIT_SLOW_CALL seconds count as failures. Open circuits fail
+    # fast, are probed every CIRCUIT_PROBE_INTERVAL seconds and let a trial call through after
+    # CIRCUIT_OPEN_SECONDS (or once a probe succeeds)
+    CIRCUIT_WINDOW = 60.0
+    CIRCUIT_MIN_CALLS = 5
+    CIRCUIT_FAILURE_RATIO = 0.5
+    CIRCUIT_CONSECUTIVE_FAILURES = 3
+    CIRCUIT_SLOW_CALL = 30.0
+    CIRCUIT_OPEN_SECONDS = 30.0
+    CIRCUIT_PROBE_INTERVAL = 5.0
+    
+    # Rule-based router that skips LLM planning for single-intent queries
+    ROUTER_ENABLED = True
+    ROUTER_MIN_SCORE = 3
+    
+    # Agent cards in the orchestrator prompt: about CARD_PROMPT_TOKENS tokens at most, keeping the agents and
+    # skills most relevant to the query when they do not all fit; skill descriptions are clipped to
+    # CARD_PROMPT_SKILL_TOKENS tokens and followed by up to CARD_PROMPT_EXAMPLES examples
+    CARD_PROMPT_TOKENS = 600
+    CARD_PROMPT_SKILL_TOKENS = 60
+    CARD_PROMPT_EXAMPLES = 2
+    
+    # Number of uvicorn worker processes. Each worker keeps its own sessions, admission limits, circuit
+    # breakers, agent registry and running executions: a follow-up message landing on another worker does not
+    # see the session history, the limits apply per worker, and a tasks/cancel only stops a task running in the
+    # worker that receives it. More than one worker needs the sqlite task store, so that task lookups reach
+    # tasks created by the other workers
+    WORKERS = 1
+    
+    # A2A task store: "memory" keeps tasks in-process, "sqlite" shares them between uvicorn workers through
+    # the TASK_STORE_PATH database. Both drop finished tasks after TASK_STORE_TTL seconds and the oldest ones
+    # beyond TASK_STORE_MAX_TASKS tasks or TASK_STORE_MAX_BYTES bytes
+    TASK_STORE_BACKEND = "sqlite" if WORKERS > 1 else "memory"
+    TASK_STORE_PATH = os.getenv("TASK_STORE_PATH", "orchestrator_tasks.db")
+    TASK_STORE_BATCH_INTERVAL = 0.05
+    TASK_STORE_BATCH_SIZE = 100
+    TASK_STORE_MAX_TASKS = 1000
+    TASK_STORE_MAX_BYTES = 50_000_000
+    TASK_STORE_TTL = 600.0
+    
+    # Admission control: at most ADMISSION_MAX_CONCURRENT executions at once (None = no limit) and up to
+    # ADMISSION_MAX_QUEUE requests waiting at most ADMISSION_MAX_WAIT seconds; others are rejected as overloaded
+    ADMISSION_MAX_CONCURRENT = 16
+    ADMISSION_MAX_QUEUE = 64
+    ADMISSION_MAX_WAIT = 20.0
+    
+    # Time budget (seconds) of requests whose caller did not send one in the "timeout_ms" message
+    # metadata; admission, the agent run and its tool calls all stop when it runs out
+    DEFAULT_DEADLINE = 120.0
+    # Seconds of the remaining budget kept back from each sub-agent call for the reply to make it home
+    DEADLINE_HOP_MARGIN = 0.5
+    
+    # Seconds given to each tasks/cancel sent to the sub-agents of a cancelled task
+    SUBAGENT_CANCEL_TIMEOUT = 2.0
+    
+    # Session memory, per client session (A2A context id): at most SESSION_MAX_SESSIONS sessions idle for less
+    # than SESSION_TTL seconds. The history given to the LLM stays within about SESSION_TOKEN_BUDGET tokens; older
+    # turns are folded into a summary of at most SESSION_SUMMARY_TOKENS. Up to SESSION_MAX_RESULTS sub-agent
+    # answers are reused within the session for SESSION_RESULT_TTL seconds
+    SESSION_MAX_SESSIONS = 1000
+    SESSION_TTL = 3600.0
+    SESSION_TOKEN_BUDGET = 2000
+    SESSION_SUMMARY_TOKENS = 400
+    SESSION_MAX_RESULTS = 32
+    SESSION_RESULT_TTL = 600.0
+    
+    # Span tracing (AGENT_TRACING=1): spans go to SPAN_EXPORT_FILE and, if set, to an
+    # OTLP/HTTP JSON collector such as http://localhost:4318/v1/traces
+    TRACING_ENABLED = os.getenv("AGENT_TRACING", "0") == "1"
+    SPAN_EXPORT_FILE = os.getenv("SPAN_EXPORT_FILE", "orchestrator_spans.jsonl")
+    SPAN_COLLECTOR_URL = os.getenv("SPAN_COLLECTOR_URL")
+    
+    # Prometheus-style metrics endpoint
+    METRICS_ENABLED = True
+    METRICS_PATH = "/metrics"
+    
+    # LLM settings (LLM_MODEL can be overridden from the environment, e.g. by the benchmark)
+    LLM_MODEL = os.getenv("LLM_MODEL", "litellm/gemini/gemini-2.0-flash")
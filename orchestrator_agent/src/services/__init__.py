@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Make the `common` package shared by all agents (at the repo root) importable
+_ROOT = str(Path(__file__).resolve().parents[3])
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
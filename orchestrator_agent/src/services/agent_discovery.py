@@ -1,16 +1,27 @@
 import httpx
 import asyncio
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 from a2a.client import A2AClient
 from a2a.types import AgentCard
 import json
-import pickle
+from properties.config import OrchestratorConfig
+from services.agent_scanner import AgentScanner
+from services.card_renderer import AgentCardRenderer
+from common.deadline import bounded_timeout
+from services.registry_store import AgentRegistryStore
+from common.metrics import metrics
+from common.tracing import tracer
+
+
+DISCOVERY_DURATION = metrics.histogram("agent_discovery_duration_seconds", "Duration of an agent discovery pass")
+DISCOVERED_AGENTS = metrics.gauge("agent_discovery_agents", "Agents found by the last discovery pass")
 
 
 class AgentDiscoveryService:
     """Service for discovering and managing A2A agents"""
     
-    def __init__(self):
+    def __init__(self, registry_store: Optional[AgentRegistryStore] = None):
         self.known_agent_urls = [
             "http://localhost:7001",  # Weather Agent
             "http://localhost:7002",  # Airbnb Agent
@@ -18,33 +29,46 @@ class AgentDiscoveryService:
         self.discovered_agents: Dict[str, AgentCard] = {}
         self.domain_name = "http://localhost:"
         self.host = "localhost"
-        self.START_PORT = 7000
-        self.END_PORT = 8000
-        self.CAHCE_FILE = "agents.pkl"
+        self.scan_hosts = OrchestratorConfig.SCAN_HOSTS
+        self.START_PORT = OrchestratorConfig.SCAN_START_PORT
+        self.END_PORT = OrchestratorConfig.SCAN_END_PORT
+        self.registry_store = registry_store
     
     async def discover_agents(self) -> Dict[str, AgentCard]:
         """Discover all available A2A agents"""
-        print("Discovering available agents...")
-        
         discovered = {}
-        
-        async with httpx.AsyncClient(timeout=10.0) as httpx_client:
-            for agent_url in self.known_agent_urls:
-                try:
-                    agent_card = await self._get_agent_card(httpx_client, agent_url)
-                    if agent_card:
-                        discovered[agent_card.name] = agent_card
-                        print(f"✓ Discovered: {agent_card.name} at {agent_url}")
-                    else:
-                        print(f"✗ Failed to get agent card from {agent_url}")
-                        
-                except Exception as e:
-                    print(f"✗ Error discovering agent at {agent_url}: {e}")
-        
+        async for _, agent_card in self.stream_agents():
+            discovered[agent_card.name] = agent_card
         self.discovered_agents = discovered
         return discovered
+
+    async def stream_agents(self) -> AsyncIterator[Tuple[str, AgentCard]]:
+        """Stream (url, card) pairs of the available agents as they answer.
+
+        Probes the hosts and ports of the known agent URLs, or the whole
+        SCAN_HOSTS / SCAN_*_PORT range when REGISTRY_SCAN is set, all at once.
+        """
+        print("Discovering available agents...")
+        if OrchestratorConfig.REGISTRY_SCAN:
+            scanner = self.create_scanner()
+        else:
+            targets = [urlsplit(url) for url in self.known_agent_urls]
+            scanner = self.create_scanner(
+                hosts=sorted({target.hostname for target in targets}),
+                ports=sorted({target.port for target in targets}),
+            )
+
+        discovered = 0
+        with tracer.span("discover_agents", targets=len(scanner.hosts) * len(scanner.ports)) as span, DISCOVERY_DURATION.time():
+            async for agent_url, agent_card in scanner.scan():
+                discovered += 1
+                print(f"✓ Discovered: {agent_card.name} at {agent_url}")
+                yield agent_url, agent_card
+            DISCOVERED_AGENTS.set(discovered)
+            if span is not None:
+                span.set_attribute("discovered", discovered)
     
-    async def _get_agent_card(self, httpx_client: httpx.AsyncClient, agent_url: str) -> Optional[AgentCard]:
+    async def get_agent_card(self, httpx_client: httpx.AsyncClient, agent_url: str) -> Optional[AgentCard]:
         """Get agent card from a specific URL"""
         try:
             client = A2AClient(httpx_client =httpx_client, url = agent_url)
@@ -52,7 +76,10 @@ class AgentDiscoveryService:
                 return client.agent_card
             
             # Fallback: try direct HTTP request to agent card endpoint
-            response = await httpx_client.get(f"{agent_url}/.well-known/agent-card.json")
+            response = await httpx_client.get(
+                f"{agent_url}/.well-known/agent-card.json",
+                timeout=bounded_timeout(OrchestratorConfig.DISCOVERY_TIMEOUT),
+            )
             if response.status_code == 200:
                 card_data = response.json()
                 return AgentCard(**card_data)
@@ -65,75 +92,58 @@ class AgentDiscoveryService:
         
         return None
     
-    def format_agent_cards_for_prompt(self) -> str:
-        """Format discovered agent cards for use in agent instructions"""
-        if not self.discovered_agents:
-            return "No agents currently available."
-        
-        formatted_cards = []
-        for name, card in self.discovered_agents.items():
-            skills_desc = "\n".join([f"    - {skill.name}: {skill.description}" for skill in card.skills])
-            
-            agent_info = {
-                            "Agent": {name},
-                            "URL": {card.url},
-                            "Description": {card.description},
-                            "Skills":{skills_desc},
-                            "Examples": {', '.join(card.skills[0].examples[:3]) if card.skills else 'None'}
-            }
-            formatted_cards.append(agent_info)
-        
-        return formatted_cards
-    
-
-
-    async def _check_port_open(self, port: int) -> bool:
-        try:
-            reader, writer = await asyncio.open_connection(self.host, port)
-            writer.close()
-            await writer.wait_closed()
-            return True
-        except:
-            return False
+    def format_agent_cards_for_prompt(self, query: str = "") -> str:
+        """Format discovered agent cards for use in agent instructions (compact, trimmed to what `query` needs)"""
+        return AgentCardRenderer().render(self.discovered_agents, query)
+
+    def create_scanner(self, hosts: Optional[List[str]] = None, ports: Optional[range] = None) -> AgentScanner:
+        """Create a bounded-concurrency scanner over host lists / CIDR ranges and ports"""
+        return AgentScanner(
+            fetch_card=self.get_agent_card,
+            hosts=hosts or self.scan_hosts,
+            ports=ports or range(self.START_PORT, self.END_PORT),
+            max_concurrency=OrchestratorConfig.SCAN_MAX_CONCURRENCY,
+            connect_timeout=OrchestratorConfig.SCAN_CONNECT_TIMEOUT,
+            max_card_fetches=OrchestratorConfig.SCAN_MAX_CARD_FETCHES,
+        )
 
     async def _find_open_ports(self) -> list[int]:
-        tasks = [self._check_port_open(port) for port in range(self.START_PORT, self.END_PORT)]
-        results = await asyncio.gather(*tasks)
-        return [port for port, is_open in zip(range(self.START_PORT, self.END_PORT), results) if is_open]
+        scanner = self.create_scanner(hosts=[self.host])
+        return sorted([port async for _, port in scanner.find_open_ports()])
 
+    async def scan_agents(self, hosts: Optional[List[str]] = None, ports: Optional[range] = None) -> AsyncIterator[Tuple[str, AgentCard]]:
+        """Stream (url, card) pairs as agents answer, recording each one as it arrives"""
+        async for agent_url, agent_card in self.create_scanner(hosts, ports).scan():
+            self.discovered_agents[agent_card.name] = agent_card
+            print(f"✓ Discovered: {agent_card.name} at {agent_url}")
+            yield agent_url, agent_card
 
     async def discover_agents_port_scanner(self):
         discovered = {}
-        open_ports = await self._find_open_ports()
-
-        async with httpx.AsyncClient(timeout=10.0) as httpx_client:
-            for port in open_ports:
-                try:
-                    agent_url = self.domain_name + str(port)
-                    agent_card = await self._get_agent_card(httpx_client, agent_url)
-                    if agent_card:
-                        discovered[agent_card.name] = agent_card
-                        print(f"✓ Discovered: {agent_card.name} at {agent_url}")
-                        
-                except Exception as e:
-                    print(f"✗ Error discovering agent at {agent_url}: {e}")
-
-            with open(self.CAHCE_FILE, 'wb') as f:
-                pickle.dump(discovered, f)
+        self.discovered_agents = {}
+        if self.registry_store is not None:
+            self.registry_store.load()
+
+        # Persist agents as they answer instead of dumping everything at the end
+        async for _, agent_card in self.scan_agents():
+            discovered[agent_card.name] = agent_card
+            if self.registry_store is not None:
+                self.registry_store.upsert(agent_card)
+        if self.registry_store is not None:
+            self.registry_store.flush()
 
         self.discovered_agents = discovered
         return discovered
 
 
-    def cached_agents(self):
-        with open(self.CAHCE_FILE, 'rb') as f:
-            agent_cards = pickle.load(f)
-
-        return agent_cards 
+    def cached_agents(self) -> Dict[str, AgentCard]:
+        if self.registry_store is None:
+            return {}
+        return {name: card for name, (card, _) in self.registry_store.load().items()}
         
 
 if __name__ == "__main__":
-    service = AgentDiscoveryService()
+    service = AgentDiscoveryService(registry_store=AgentRegistryStore(OrchestratorConfig.REGISTRY_FILE))
 
     asyncio.run(service.discover_agents_port_scanner())
 
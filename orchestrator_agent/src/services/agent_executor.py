@@ -1,40 +1,94 @@
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
 from a2a.server.events.event_queue import EventQueue
-from a2a.utils import new_agent_text_message
+from a2a.types import TaskNotCancelableError
+from a2a.utils.errors import ServerError
 from pydantic import BaseModel
-from services.execute_agent import orchestrator_run
+from typing import Optional
+from properties.config import OrchestratorConfig
+from common.admission import AdmissionController, OverloadedError
+from common.cancellation import TERMINAL_STATES, ExecutionTracker
+from common.deadline import DeadlineExceededError, deadline_from_metadata, deadline_scope, remaining
+from services.execute_agent import orchestrator_run, session_store
+from services.session_memory import Session, current_session
+from services.streaming import ResponseStream, TextSink, subagent_relay
+from common.tracing import tracer
 import asyncio
 
 
 class AdvancedOrchestratorAgent(BaseModel):
     query: str
     
-    async def invoke(self):
-        return await orchestrator_run(self.query)
+    async def invoke(self, on_delta: Optional[TextSink] = None, session: Optional[Session] = None):
+        return await orchestrator_run(self.query, on_delta, session)
 
 
 class AdvancedOrchestratorAgentExecutor(AgentExecutor):
+
+    def __init__(self, admission: Optional[AdmissionController] = None):
+        self.admission = admission or AdmissionController(max_concurrent=None)
+        self.executions = ExecutionTracker()
     
     async def execute(self, context: RequestContext, event_queue: EventQueue):
+        # The caller's remaining time budget (or the default one) bounds everything done for the request
+        deadline = deadline_from_metadata(context.message.metadata, OrchestratorConfig.DEFAULT_DEADLINE)
+        with deadline_scope(deadline), self.executions.track(context.task_id):
+            await self._execute(context, event_queue, deadline)
+
+    async def _execute(self, context: RequestContext, event_queue: EventQueue, deadline: Optional[float]):
+        stream = ResponseStream(context, event_queue)
         try:
 
             query = context.message.parts[0].root.text
             
             if not query:
                 error_msg = "No query provided in request"
-                await event_queue.enqueue_event(new_agent_text_message(error_msg))
+                await stream.finish(error_msg)
                 return
             
-            agent = AdvancedOrchestratorAgent(query=query)
-            result = await agent.invoke()
+            # Wait for an execution slot; over capacity the request is rejected with a retry-after hint
+            # Requests whose deadline already passed are dropped without running
+            async with self.admission.admit(max_wait=remaining(deadline)):
+                await stream.start()
+                # Messages sent with the same context id belong to one conversation
+                session = session_store.get(context.context_id)
+                # Sub-agent calls made during this run relay their stream chunks to the client
+                relay_token = subagent_relay.set(stream.relay)
+                session_token = current_session.set(session)
+                try:
+                    # Root span of the request (or a child of the client's trace, if it sent one)
+                    with tracer.span("orchestrator.execute", parent=tracer.extract(context.message.metadata), query=query[:200]):
+                        agent = AdvancedOrchestratorAgent(query=query)
+                        result = await agent.invoke(stream.send, session)
+                finally:
+                    current_session.reset(session_token)
+                    subagent_relay.reset(relay_token)
 
-            await event_queue.enqueue_event(new_agent_text_message(str(result)))
+                await stream.finish(str(result))
+                session_store.record_turn(session, query, str(result))
             
+        except OverloadedError as e:
+            print(f"Rejected orchestrator request: {e.reason} (retry after {e.retry_after}s)")
+            await stream.reject(f"{OrchestratorConfig.AGENT_NAME} is overloaded ({e.reason}), retry after {e.retry_after}s", e.retry_after)
+        except asyncio.CancelledError:
+            # Interrupted by tasks/cancel: the agent run and the sub-agent calls it was waiting on were stopped
+            print(f"Cancelled orchestrator task {context.task_id}")
+            await stream.cancel("Advanced orchestrator agent execution cancelled")
+        except DeadlineExceededError as e:
+            print(f"Dropped orchestrator request: {e}")
+            await stream.fail(f"{OrchestratorConfig.AGENT_NAME} gave up: {e}")
         except Exception as e:
             error_msg = f"Error executing advanced orchestrator agent: {str(e)}"
             print(f"AdvancedOrchestratorAgentExecutor error: {e}")
-            await event_queue.enqueue_event(new_agent_text_message(error_msg))
+            # The task fails, so callers do not take the error for an answer; the stream may be
+            # what failed, and the task cannot be ended twice
+            if not stream.ended:
+                await stream.fail(error_msg)
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue):
-        await event_queue.enqueue_event(new_agent_text_message("Advanced orchestrator agent execution cancelled"))
+        task = context.current_task
+        if task is not None and task.status.state in TERMINAL_STATES:
+            raise ServerError(error=TaskNotCancelableError())
+        # A running execution is interrupted and reports the cancellation itself
+        if not self.executions.cancel(context.task_id):
+            await ResponseStream(context, event_queue).cancel("Advanced orchestrator agent execution cancelled")
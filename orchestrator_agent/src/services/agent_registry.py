@@ -0,0 +1,203 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+from a2a.types import AgentCard
+from properties.config import OrchestratorConfig
+from services.agent_discovery import AgentDiscoveryService
+from services.http_pool import agent_client_pool
+from services.registry_store import AgentRegistryStore
+from services.skill_index import SkillIndex
+
+
+class AgentRegistry:
+    """Process-wide registry of discovered agent cards.
+
+    Cards are fetched through `AgentDiscoveryService` and kept in memory, so
+    lookups on the request path are plain dict reads. A background task
+    re-runs discovery every `refresh_interval` seconds; each agent is
+    published as soon as it answers, so requests can be routed to it before
+    the pass ends. A card that has not been seen for `ttl` seconds is
+    dropped. `version` is bumped whenever the set of cards or any card's
+    contents change. `index` is the skill index of the current cards, updated
+    agent by agent as cards appear, change or are dropped.
+
+    When a `store` is given the registry is persisted after every discovery
+    pass, and `start()` serves the persisted cards immediately while the first
+    discovery pass revalidates them in the background.
+    """
+
+    def __init__(
+        self,
+        discovery_service: Optional[AgentDiscoveryService] = None,
+        ttl: float = OrchestratorConfig.REGISTRY_TTL,
+        refresh_interval: float = OrchestratorConfig.REGISTRY_REFRESH_INTERVAL,
+        store: Optional[AgentRegistryStore] = None,
+    ):
+        self.discovery_service = discovery_service or AgentDiscoveryService(registry_store=store)
+        self.store = store
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.version = 0
+        self.last_refresh: Optional[float] = None
+        self.fresh_hits = 0
+        self.refreshes = 0
+
+        self._cards: Dict[str, AgentCard] = {}
+        self.index = SkillIndex()
+        self._fingerprints: Dict[str, str] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def agents(self) -> Dict[str, AgentCard]:
+        """Current agent cards keyed by agent name (do not mutate)"""
+        return self._cards
+
+    def get(self, agent_name: str) -> Optional[AgentCard]:
+        return self._cards.get(agent_name)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "agents": len(self._cards),
+            "version": self.version,
+            "fresh_hits": self.fresh_hits,
+            "refreshes": self.refreshes,
+            "age_seconds": time.monotonic() - self.last_refresh if self.last_refresh is not None else -1,
+        }
+
+    def is_stale(self) -> bool:
+        return self.last_refresh is None or time.monotonic() - self.last_refresh > self.ttl
+
+    async def probe(self, agent_name: str) -> bool:
+        """Health check for an agent: does it still serve its agent card?"""
+        card = self._cards.get(agent_name)
+        if card is None:
+            return False
+        http_client = agent_client_pool.http_client(card.url)
+        return await self.discovery_service.get_agent_card(http_client, card.url.rstrip("/")) is not None
+
+    async def start(self):
+        """Load the registry and start the background refresh task"""
+        warm = await self.load_persisted()
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop(revalidate_first=warm))
+        if not warm:
+            await self.ensure_fresh()
+
+    async def load_persisted(self) -> bool:
+        """Warm-start from the persisted registry; returns True if any cards were loaded"""
+        if self.store is None:
+            return False
+        try:
+            persisted = await asyncio.to_thread(self.store.load)
+        except Exception as e:
+            print(f"✗ Failed to load persisted agent registry: {e}")
+            return False
+        if not persisted:
+            return False
+
+        now = time.monotonic()
+        # Carry the persisted wall-clock last_seen over to the monotonic clock;
+        # agents already past their TTL are left for discovery to confirm
+        last_seen = {name: now - (time.time() - seen) for name, (_, seen) in persisted.items()}
+        persisted = {name: entry for name, entry in persisted.items() if now - last_seen[name] <= self.ttl}
+        if not persisted:
+            return False
+        async with self._lock:
+            self._cards = {name: card for name, (card, _) in persisted.items()}
+            self._fingerprints = {name: card.model_dump_json() for name, card in self._cards.items()}
+            for name, card in self._cards.items():
+                self.index.add(name, card)
+            self._last_seen = {name: last_seen[name] for name in self._cards}
+            self.version = max(self.version, self.store.registry_version)
+            self.last_refresh = now
+        print(f"Agent registry warm-started from {self.store.path} (version {self.version}): {list(self._cards.keys())}")
+        return True
+
+    async def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def ensure_fresh(self) -> Dict[str, AgentCard]:
+        """Refresh only if the registry was never loaded or has gone stale"""
+        if self.is_stale():
+            async with self._lock:
+                if self.is_stale():
+                    await self._refresh_locked()
+        else:
+            self.fresh_hits += 1
+        return self._cards
+
+    async def refresh(self) -> bool:
+        """Run discovery now; returns True if the registry changed"""
+        async with self._lock:
+            return await self._refresh_locked()
+
+    async def _refresh_locked(self) -> bool:
+        discovered: Dict[str, AgentCard] = {}
+        changed = False
+        async for _, card in self.discovery_service.stream_agents():
+            discovered[card.name] = card
+            self._last_seen[card.name] = time.monotonic()
+            changed |= self._publish({card.name: card}, [])
+        now = time.monotonic()
+        self.last_refresh = now
+        self.refreshes += 1
+
+        removed = [name for name in self._cards if now - self._last_seen.get(name, 0) > self.ttl]
+        for name in removed:
+            print(f"✗ Dropping agent {name}: not seen for {self.ttl:.0f}s")
+            self._last_seen.pop(name, None)
+        changed |= self._publish({}, removed)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.update, discovered, removed, self.version)
+            except Exception as e:
+                print(f"✗ Failed to persist agent registry: {e}")
+        return changed
+
+    def _publish(self, updated: Dict[str, AgentCard], removed: List[str]) -> bool:
+        """Apply new or changed cards and dropped agents; returns True if the registry changed"""
+        updated = {name: card for name, card in updated.items() if self._fingerprints.get(name) != card.model_dump_json()}
+        if not updated and not removed:
+            return False
+
+        cards = dict(self._cards)
+        fingerprints = dict(self._fingerprints)
+        for name, card in updated.items():
+            cards[name] = card
+            fingerprints[name] = card.model_dump_json()
+            self.index.add(name, card)
+        for name in removed:
+            del cards[name]
+            del fingerprints[name]
+            self.index.remove(name)
+        # Swap whole dicts so readers never observe a half-updated registry
+        self._cards = cards
+        self._fingerprints = fingerprints
+        self.version += 1
+        print(f"Agent registry updated to version {self.version}: {list(cards.keys())}")
+        return True
+
+    async def _refresh_loop(self, revalidate_first: bool = False):
+        if revalidate_first:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error revalidating agent registry: {e}")
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing agent registry: {e}")
+
+
+agent_registry = AgentRegistry(store=AgentRegistryStore(OrchestratorConfig.REGISTRY_FILE))
@@ -0,0 +1,142 @@
+import asyncio
+import ipaddress
+import httpx
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, Tuple
+from a2a.types import AgentCard
+
+
+CardFetcher = Callable[[httpx.AsyncClient, str], Awaitable[Optional[AgentCard]]]
+
+
+def expand_hosts(host_specs: Iterable[str]) -> Iterator[str]:
+    """Expand host names, IP addresses and CIDR ranges ("10.0.0.0/28") into hosts"""
+    for spec in host_specs:
+        spec = spec.strip()
+        if "/" in spec:
+            network = ipaddress.ip_network(spec, strict=False)
+            hosts = network.hosts() if network.num_addresses > 2 else iter(network)
+            for address in hosts:
+                yield str(address)
+        else:
+            yield spec
+
+
+def agent_url(host: str, port: int) -> str:
+    if ":" in host and not host.startswith("["):
+        host = f"[{host}]"
+    return f"http://{host}:{port}"
+
+
+class AgentScanner:
+    """Scans host/port ranges for A2A agents and streams their cards.
+
+    A fixed number of probe workers walk the (host, port) targets lazily, so at
+    most `max_concurrency` connection attempts (and file descriptors) are open
+    at any time no matter how large the range is. As soon as a port accepts a
+    connection its agent card is fetched concurrently, bounded by
+    `max_card_fetches`, and yielded to the caller.
+    """
+
+    def __init__(
+        self,
+        fetch_card: CardFetcher,
+        hosts: Iterable[str] = ("localhost",),
+        ports: Iterable[int] = range(7000, 8000),
+        max_concurrency: int = 200,
+        connect_timeout: float = 0.5,
+        max_card_fetches: int = 20,
+        card_timeout: float = 10.0,
+    ):
+        self.fetch_card = fetch_card
+        self.hosts = list(hosts)
+        self.ports = list(ports)
+        self.max_concurrency = max_concurrency
+        self.connect_timeout = connect_timeout
+        self.max_card_fetches = max_card_fetches
+        self.card_timeout = card_timeout
+
+    def targets(self) -> Iterator[Tuple[str, int]]:
+        for host in expand_hosts(self.hosts):
+            for port in self.ports:
+                yield host, port
+
+    async def check_port_open(self, host: str, port: int) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def find_open_ports(self) -> AsyncIterator[Tuple[str, int]]:
+        """Yield (host, port) pairs that accept TCP connections"""
+        async for host, port in self._probe(fetch_cards=False):
+            yield host, port
+
+    async def scan(self, httpx_client: Optional[httpx.AsyncClient] = None) -> AsyncIterator[Tuple[str, AgentCard]]:
+        """Yield (url, agent card) pairs as soon as each agent answers"""
+        if httpx_client is None:
+            async with httpx.AsyncClient(timeout=self.card_timeout) as client:
+                async for result in self._probe(fetch_cards=True, httpx_client=client):
+                    yield result
+        else:
+            async for result in self._probe(fetch_cards=True, httpx_client=httpx_client):
+                yield result
+
+    async def _probe(self, fetch_cards: bool, httpx_client: Optional[httpx.AsyncClient] = None):
+        results: asyncio.Queue = asyncio.Queue()
+        targets = self.targets()
+        fetch_semaphore = asyncio.Semaphore(self.max_card_fetches)
+        fetches: set[asyncio.Task] = set()
+        done = object()
+
+        async def fetch(host: str, port: int):
+            url = agent_url(host, port)
+            async with fetch_semaphore:
+                try:
+                    card = await asyncio.wait_for(self.fetch_card(httpx_client, url), self.card_timeout)
+                except Exception as e:
+                    print(f"✗ Error fetching agent card from {url}: {e}")
+                    return
+            if card:
+                await results.put((url, card))
+
+        async def worker():
+            # The shared generator is advanced without awaiting, so workers never race on it
+            for host, port in targets:
+                if not await self.check_port_open(host, port):
+                    continue
+                if fetch_cards:
+                    task = asyncio.create_task(fetch(host, port))
+                    fetches.add(task)
+                    task.add_done_callback(fetches.discard)
+                else:
+                    await results.put((host, port))
+
+        async def run():
+            try:
+                await asyncio.gather(*[worker() for _ in range(self.max_concurrency)])
+                while fetches:
+                    await asyncio.gather(*list(fetches))
+            finally:
+                await results.put(done)
+
+        runner = asyncio.create_task(run())
+        try:
+            while True:
+                item = await results.get()
+                if item is done:
+                    break
+                yield item
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+                for task in list(fetches):
+                    task.cancel()
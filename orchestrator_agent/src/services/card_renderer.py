@@ -0,0 +1,202 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from a2a.types import AgentCard
+from properties.config import OrchestratorConfig
+from services.circuit_breaker import CLOSED, agent_health
+from services.session_memory import clip, estimate_tokens
+from services.skill_index import SkillIndex, tokenize
+
+
+# Tokens kept back for the line counting the agents left out, and charged per agent line
+# for its "(+N more skills)" note and line break when the cards are trimmed
+OMITTED_NOTE_TOKENS = 15
+HIDDEN_NOTE_TOKENS = 6
+
+
+@dataclass
+class SkillEntry:
+    text: str
+    tokens: int
+
+
+@dataclass
+class AgentEntry:
+    name: str
+    header: str
+    tokens: int
+    skills: List[SkillEntry]
+
+
+def _one_line(text: Optional[str]) -> str:
+    return " ".join((text or "").split())
+
+
+def _first_sentence(text: Optional[str]) -> str:
+    return _one_line(text).split(". ")[0].rstrip(".")
+
+
+class AgentCardRenderer:
+    """Renders the agent cards for the orchestrator prompt as compact text.
+
+    Each agent becomes one line (name, status, first sentence of its
+    description) followed by one line per skill with a clipped description
+    and a few examples. The lines are compiled once per registry version.
+    When they do not all fit in `max_tokens`, the agents and skills that the
+    skill index (the one the query router uses) matches with the query come
+    first, then as many of the other agents' names as fit. The kept lines
+    are always rendered in card order, so queries that keep the same lines
+    get the same text.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = OrchestratorConfig.CARD_PROMPT_TOKENS,
+        max_examples: int = OrchestratorConfig.CARD_PROMPT_EXAMPLES,
+        skill_description_tokens: int = OrchestratorConfig.CARD_PROMPT_SKILL_TOKENS,
+        max_renders: int = 64,
+    ):
+        self.max_tokens = max_tokens
+        self.max_examples = max_examples
+        self.skill_description_tokens = skill_description_tokens
+        self.max_renders = max_renders
+
+        self._key: Optional[Tuple] = None
+        self._entries: List[AgentEntry] = []
+        self._positions: Dict[str, int] = {}
+        self._everything: Tuple[Tuple[int, Tuple[int, ...]], ...] = ()
+        self._total_tokens = 0
+        self._index: Optional[SkillIndex] = None
+        self._renders: "OrderedDict[Tuple, str]" = OrderedDict()
+
+        self.compiles = 0
+        self.lookups = 0
+        self.render_hits = 0
+        self.trimmed = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "compiles": self.compiles,
+            "lookups": self.lookups,
+            "render_hits": self.render_hits,
+            "trimmed": self.trimmed,
+            "renders_cached": len(self._renders),
+        }
+
+    def render(self, agent_cards: Dict[str, AgentCard], query: str = "", registry_version: Optional[int] = None,
+               index: Optional[SkillIndex] = None) -> str:
+        """Agent listing for the prompt, trimmed to the token budget around `query`.
+
+        `index` is the skill index of the cards (the registry's); without one
+        an index is built along with the lines.
+        """
+        if not agent_cards:
+            return "No agents currently available."
+
+        if registry_version is not None:
+            key = ("version", registry_version)
+        else:
+            key = ("cards", tuple(sorted((name, card.model_dump_json()) for name, card in agent_cards.items())))
+        if key != self._key:
+            self._compile_all(agent_cards, index)
+            self._key = key
+            self.compiles += 1
+
+        self.lookups += 1
+        selection = self._select(tokenize(query))
+        render_key = (selection, tuple(agent_health.state(self._entries[i].name) for i, _ in selection))
+        text = self._renders.get(render_key)
+        if text is not None:
+            self._renders.move_to_end(render_key)
+            self.render_hits += 1
+            return text
+
+        text = self._format(selection)
+        self._renders[render_key] = text
+        while len(self._renders) > self.max_renders:
+            self._renders.popitem(last=False)
+        return text
+
+    def _compile_all(self, agent_cards: Dict[str, AgentCard], index: Optional[SkillIndex]):
+        self._entries = [self._compile(name, card) for name, card in agent_cards.items()]
+        self._positions = {entry.name: i for i, entry in enumerate(self._entries)}
+        self._everything = tuple((i, tuple(range(len(entry.skills)))) for i, entry in enumerate(self._entries))
+        self._total_tokens = sum(entry.tokens + sum(skill.tokens for skill in entry.skills) for entry in self._entries)
+        self._index = index if index is not None else SkillIndex.from_cards(agent_cards)
+        self._renders.clear()
+
+    def _compile(self, name: str, card: AgentCard) -> AgentEntry:
+        header = f"- {name}: {_first_sentence(card.description)}"
+        skills = []
+        for skill in card.skills:
+            line = f"  - {skill.name}: {clip(_one_line(skill.description), self.skill_description_tokens)}"
+            examples = [f'"{_one_line(example)}"' for example in (skill.examples or [])[:self.max_examples]]
+            if examples:
+                line += f" e.g. {'; '.join(examples)}"
+            skills.append(SkillEntry(line, estimate_tokens(line)))
+        return AgentEntry(name, header, estimate_tokens(header), skills)
+
+    def _select(self, query_terms: List[str]) -> Tuple[Tuple[int, Tuple[int, ...]], ...]:
+        """(agent, kept skills) pairs within the budget, in card order"""
+        if self._total_tokens <= self.max_tokens:
+            return self._everything
+
+        # Only the agents the index matches are scored; the budget is filled before the rest are looked at
+        self.trimmed += 1
+        entries = self._entries
+        skill_scores: Dict[Tuple[int, int], int] = {}
+        agent_scores: Dict[int, int] = {}
+        for (name, j), score in self._index.score_skills(query_terms).items():
+            i = self._positions.get(name)
+            if i is not None:
+                skill_scores[(i, j)] = score
+                agent_scores[i] = agent_scores.get(i, 0) + score
+        matched = sorted(agent_scores, key=lambda i: (-agent_scores[i], i))
+
+        # Matching agents with their best skill, most relevant first
+        budget = self.max_tokens - OMITTED_NOTE_TOKENS
+        kept: Dict[int, List[int]] = {}
+        for i in matched:
+            best = max(range(len(entries[i].skills)), key=lambda j: skill_scores.get((i, j), 0))
+            cost = entries[i].tokens + HIDDEN_NOTE_TOKENS + entries[i].skills[best].tokens + 1
+            if cost > budget:
+                break
+            kept[i] = [best]
+            budget -= cost
+
+        # Then their other matching skills, then the names of the other agents in card order
+        for i in list(kept):
+            for j in sorted(range(len(entries[i].skills)), key=lambda j: -skill_scores.get((i, j), 0)):
+                if j not in kept[i] and skill_scores.get((i, j)) and entries[i].skills[j].tokens + 1 <= budget:
+                    kept[i].append(j)
+                    budget -= entries[i].skills[j].tokens + 1
+        for i, entry in enumerate(entries):
+            if i in kept:
+                continue
+            if entry.tokens + HIDDEN_NOTE_TOKENS > budget:
+                break
+            kept[i] = []
+            budget -= entry.tokens + HIDDEN_NOTE_TOKENS
+
+        return tuple((i, tuple(sorted(kept[i]))) for i in sorted(kept))
+
+    def _format(self, selection: Tuple[Tuple[int, Tuple[int, ...]], ...]) -> str:
+        lines = []
+        for i, skills in selection:
+            entry = self._entries[i]
+            header = entry.header
+            if agent_health.state(entry.name) != CLOSED:
+                header += f" [{agent_health.describe(entry.name)}]"
+            hidden = len(entry.skills) - len(skills)
+            if hidden:
+                header += f" (+{hidden} more skill{'s' if hidden > 1 else ''})"
+            lines.append(header)
+            lines += [entry.skills[j].text for j in skills]
+        omitted = len(self._entries) - len(selection)
+        if omitted:
+            lines.append(f"- ...and {omitted} more agent{'s' if omitted > 1 else ''} not relevant to this request")
+        return "\n".join(lines)
+
+
+card_renderer = AgentCardRenderer()
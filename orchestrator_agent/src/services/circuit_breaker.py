@@ -0,0 +1,258 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple
+from properties.config import OrchestratorConfig
+from common.metrics import metrics
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = metrics.gauge(
+    "subagent_circuit_state", "Sub-agent circuit state (0 closed, 1 half-open, 2 open)", ("agent",))
+CIRCUIT_TRANSITIONS = metrics.counter(
+    "subagent_circuit_transitions_total", "Sub-agent circuit state changes", ("agent", "state"))
+CIRCUIT_REJECTED = metrics.counter(
+    "subagent_circuit_rejected_total", "Sub-agent calls failed fast by an open circuit", ("agent",))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an agent whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Health state of one sub-agent.
+
+    Keeps the outcome and latency of the calls made in the last `window`
+    seconds. The circuit opens when at least `min_calls` calls were made and
+    `failure_ratio` of them failed, or after `consecutive_failures` failures
+    in a row; calls slower than `slow_call` seconds count as failures. An open
+    circuit fails calls fast. After `open_for` seconds, or as soon as a
+    background probe succeeds, it turns half-open and lets one trial call
+    through: success closes the circuit, failure opens it again. Calls
+    admitted before the circuit opened that finish while it is open or
+    half-open are kept in the window but do not change its state.
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        window: float = OrchestratorConfig.CIRCUIT_WINDOW,
+        min_calls: int = OrchestratorConfig.CIRCUIT_MIN_CALLS,
+        failure_ratio: float = OrchestratorConfig.CIRCUIT_FAILURE_RATIO,
+        consecutive_failures: int = OrchestratorConfig.CIRCUIT_CONSECUTIVE_FAILURES,
+        slow_call: float = OrchestratorConfig.CIRCUIT_SLOW_CALL,
+        open_for: float = OrchestratorConfig.CIRCUIT_OPEN_SECONDS,
+    ):
+        self.agent_name = agent_name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.consecutive_failures = consecutive_failures
+        self.slow_call = slow_call
+        self.open_for = open_for
+
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._calls: Deque[Tuple[float, bool, float]] = deque()
+        self._failures_in_row = 0
+        self._trial_running = False
+        CIRCUIT_STATE.set(0, agent=agent_name)
+
+    def _trim(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        print(f"Circuit for {self.agent_name}: {self.state} -> {state}")
+        self.state = state
+        self.opened_at = time.monotonic() if state == OPEN else self.opened_at
+        CIRCUIT_STATE.set(STATE_VALUES[state], agent=self.agent_name)
+        CIRCUIT_TRANSITIONS.inc(agent=self.agent_name, state=state)
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a trial call through"""
+        if self.state != OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.open_for - time.monotonic())
+
+    def before_call(self) -> bool:
+        """Reserve the call, or raise CircuitOpenError when it must fail fast; returns whether it is the trial call"""
+        if self.state == OPEN and self.retry_in() == 0.0:
+            self._set_state(HALF_OPEN)
+        if self.state == OPEN:
+            CIRCUIT_REJECTED.inc(agent=self.agent_name)
+            raise CircuitOpenError(
+                f"{self.agent_name} is unavailable: it failed repeatedly ({self.last_error}). "
+                f"Not calling it for another {math.ceil(self.retry_in())}s; do not retry it now."
+            )
+        if self.state == HALF_OPEN:
+            if self._trial_running:
+                CIRCUIT_REJECTED.inc(agent=self.agent_name)
+                raise CircuitOpenError(f"{self.agent_name} is recovering from failures; a trial call is in progress.")
+            self._trial_running = True
+            return True
+        return False
+
+    def record(self, ok: bool, latency: float, error: Optional[str] = None, trial: bool = False):
+        now = time.monotonic()
+        if ok and latency > self.slow_call:
+            ok, error = False, f"answered after {latency:.0f}s"
+        self._calls.append((now, ok, latency))
+        self._trim(now)
+        if not ok:
+            self.last_error = error
+
+        if trial:
+            self._trial_running = False
+            self._failures_in_row = 0 if ok else 1
+            if ok:
+                self._calls.clear()
+            self._set_state(CLOSED if ok else OPEN)
+            return
+        if self.state != CLOSED:
+            return
+
+        self._failures_in_row = 0 if ok else self._failures_in_row + 1
+        failures = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+        if self._failures_in_row >= self.consecutive_failures or (
+            len(self._calls) >= self.min_calls and failures / len(self._calls) >= self.failure_ratio
+        ):
+            self._set_state(OPEN)
+
+    def release(self, trial: bool = False):
+        """End a reserved call without recording an outcome (e.g. the agent asked us to back off)"""
+        if trial:
+            self._trial_running = False
+
+    def probe_succeeded(self):
+        if self.state == OPEN:
+            self._set_state(HALF_OPEN)
+
+    def probe_failed(self, error: str):
+        if self.state == OPEN:
+            # Keep the circuit open for another full period
+            self.last_error = error
+            self.opened_at = time.monotonic()
+
+    @property
+    def stats(self) -> dict:
+        self._trim(time.monotonic())
+        latencies = sorted(latency for _, _, latency in self._calls)
+        failures = sum(1 for _, ok, _ in self._calls if not ok)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+        return {
+            "state": self.state,
+            "calls": len(self._calls),
+            "error_rate": round(failures / len(self._calls), 3) if self._calls else 0.0,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "retry_in": round(self.retry_in(), 1),
+            "last_error": self.last_error,
+        }
+
+    def describe(self) -> str:
+        """Short health note for the planner prompt (depends on the state only, so prompts stay cacheable)"""
+        if self.state == OPEN:
+            return "UNAVAILABLE - failing repeatedly, do not call it; tell the user this part cannot be served right now"
+        if self.state == HALF_OPEN:
+            return "recovering from failures - call it only if needed"
+        return "available"
+
+
+class AgentHealth:
+    """Circuit breakers for all sub-agents, plus the background task that probes open circuits"""
+
+    def __init__(self, probe_interval: float = OrchestratorConfig.CIRCUIT_PROBE_INTERVAL):
+        self.probe_interval = probe_interval
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def breaker(self, agent_name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(agent_name)
+        if breaker is None:
+            breaker = self._breakers[agent_name] = CircuitBreaker(agent_name)
+        return breaker
+
+    def state(self, agent_name: str) -> str:
+        breaker = self._breakers.get(agent_name)
+        return breaker.state if breaker is not None else CLOSED
+
+    def states(self, agent_names: Iterable[str]) -> Tuple[Tuple[str, str], ...]:
+        return tuple((name, self.state(name)) for name in sorted(agent_names))
+
+    def describe(self, agent_name: str) -> str:
+        return self.breaker(agent_name).describe()
+
+    @asynccontextmanager
+    async def call(self, agent_name: str, neutral: Tuple[type, ...] = ()):
+        """Guard one call to an agent: fails fast on an open circuit and records the outcome.
+
+        Exceptions of the `neutral` types (and cancellation) pass through
+        without counting for or against the agent's health.
+        """
+        breaker = self.breaker(agent_name)
+        trial = breaker.before_call()
+        started_at = time.perf_counter()
+        try:
+            yield breaker
+        except (asyncio.CancelledError, *neutral):
+            breaker.release(trial)
+            raise
+        except Exception as e:
+            breaker.record(False, time.perf_counter() - started_at, f"{type(e).__name__}: {e}", trial)
+            raise
+        breaker.record(True, time.perf_counter() - started_at, trial=trial)
+
+    @property
+    def stats(self) -> Dict[str, dict]:
+        return {name: breaker.stats for name, breaker in self._breakers.items()}
+
+    def start(self, probe: Callable[[str], Awaitable[bool]]):
+        """Probe open circuits every `probe_interval` seconds with `probe(agent_name)`"""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop(probe))
+
+    async def stop(self):
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    async def _probe_loop(self, probe: Callable[[str], Awaitable[bool]]):
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            for name, breaker in list(self._breakers.items()):
+                if breaker.state != OPEN:
+                    continue
+                try:
+                    healthy = await probe(name)
+                except Exception as e:
+                    healthy, error = False, f"{type(e).__name__}: {e}"
+                else:
+                    error = "health check failed"
+                if healthy:
+                    print(f"Probe of {name} succeeded, letting a trial call through")
+                    breaker.probe_succeeded()
+                else:
+                    breaker.probe_failed(error)
+
+
+agent_health = AgentHealth()
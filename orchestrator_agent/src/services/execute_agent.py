@@ -1,24 +1,95 @@
 import asyncio
-from services.orchestrator_agent import run_main_agent
-from services.agent_discovery import AgentDiscoveryService
+from a2a.server.tasks import TaskStore
+from typing import Optional
+from properties.config import OrchestratorConfig
+from services.orchestrator_agent import run_main_agent, summarize_conversation
+from services.agent_registry import agent_registry
+from services.router import QueryRouter, RouteDecision, format_agent_list
+from services.streaming import TextSink, subagent_relay
+from common.admission import AdmissionController
+from services.session_memory import Session, SessionStore, refers_back
+from common.sqlite_task_store import SQLiteTaskStore
+from common.task_store import BoundedTaskStore
+from services.tools import ask_agent
+from common.tracing import current_span
 
 
-async def orchestrator_run(query: str):   
+query_router = QueryRouter(min_score=OrchestratorConfig.ROUTER_MIN_SCORE)
+
+session_store = SessionStore(summarizer=summarize_conversation)
+
+
+def create_admission_controller() -> AdmissionController:
+    """Create the admission controller that bounds concurrent executions"""
+    return AdmissionController(
+        max_concurrent=OrchestratorConfig.ADMISSION_MAX_CONCURRENT,
+        max_queue=OrchestratorConfig.ADMISSION_MAX_QUEUE,
+        max_wait=OrchestratorConfig.ADMISSION_MAX_WAIT,
+    )
+
+
+def create_task_store() -> TaskStore:
+    """Create the A2A task store selected by TASK_STORE_BACKEND"""
+    if OrchestratorConfig.TASK_STORE_BACKEND == "sqlite":
+        return SQLiteTaskStore(
+            OrchestratorConfig.TASK_STORE_PATH,
+            batch_interval=OrchestratorConfig.TASK_STORE_BATCH_INTERVAL,
+            batch_size=OrchestratorConfig.TASK_STORE_BATCH_SIZE,
+            ttl=OrchestratorConfig.TASK_STORE_TTL,
+            max_tasks=OrchestratorConfig.TASK_STORE_MAX_TASKS,
+            max_bytes=OrchestratorConfig.TASK_STORE_MAX_BYTES,
+        )
+    return BoundedTaskStore(
+        max_tasks=OrchestratorConfig.TASK_STORE_MAX_TASKS,
+        max_bytes=OrchestratorConfig.TASK_STORE_MAX_BYTES,
+        ttl=OrchestratorConfig.TASK_STORE_TTL,
+    )
+
+
+async def run_routed(query: str, decision: RouteDecision, on_delta: Optional[TextSink] = None):
+    """Send a routed query straight to its agent, streaming its answer as our own"""
+    print(f"Routing query directly to {decision.agent_name} (score {decision.score}, {query_router.stats})")
+    if on_delta is None:
+        return await ask_agent(decision.agent_name, query)
+
+    async def relay_as_response(artifact_id: str, agent_name: str, text: str, last_chunk: bool):
+        await on_delta(text)
+
+    relay_token = subagent_relay.set(relay_as_response)
+    try:
+        return await ask_agent(decision.agent_name, query)
+    finally:
+        subagent_relay.reset(relay_token)
+
+
+async def orchestrator_run(query: str, on_delta: Optional[TextSink] = None, session: Optional[Session] = None):   
     try:
         print(f"Starting advanced orchestrator for query: {query}")
         
-        discovery_service = AgentDiscoveryService()
-        agent_cards = await discovery_service.discover_agents()
+        agent_cards = await agent_registry.ensure_fresh()
         
         if not agent_cards:
             return "No agents are currently available. Please ensure the weather and accommodation agents are running."
 
-        response = await run_main_agent(query, agent_cards)
+        decision = query_router.route(query, agent_cards, agent_registry.index) if OrchestratorConfig.ROUTER_ENABLED else None
+        if decision is not None and decision.kind == "agent" and session is not None and session.has_history \
+                and refers_back(query):
+            # A follow-up ("and hotels there?") depends on earlier turns, which only the planner sees
+            decision = None
+        span = current_span.get()
+        if span is not None:
+            span.set_attribute("route", decision.kind if decision is not None else "llm")
+        if decision is not None and decision.kind == "list_agents":
+            return format_agent_list(agent_cards)
+        if decision is not None and decision.kind == "agent":
+            return await run_routed(query, decision, on_delta)
+
+        response = await run_main_agent(query, agent_cards, on_delta, agent_registry.version, session, agent_registry.index)
         return response
         
     except Exception as e:
         print(f"Error in orchestrator_run: {e}")
-        return f"Sorry, I encountered an error while processing your request: {str(e)}"
+        raise
 
 
 if __name__ == "__main__":
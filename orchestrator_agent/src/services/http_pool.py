@@ -0,0 +1,86 @@
+import httpx
+from typing import Dict
+from urllib.parse import urlsplit
+from a2a.client import A2AClient
+from properties.config import OrchestratorConfig
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AgentClientPool:
+    """Keep-alive HTTP connection pools and A2A clients shared by the orchestrator.
+
+    One `httpx.AsyncClient` is kept per destination origin, each with its own
+    connection limits, so inter-agent calls and discovery reuse warm
+    connections instead of paying TCP setup on every hop. `A2AClient`
+    instances are cached per agent URL on top of those clients.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = OrchestratorConfig.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = OrchestratorConfig.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = OrchestratorConfig.HTTP_KEEPALIVE_EXPIRY,
+        http2: bool = OrchestratorConfig.HTTP_ENABLE_HTTP2,
+        timeout: float = OrchestratorConfig.HTTP_TIMEOUT,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        if http2 and not _http2_available():
+            print("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.timeout = timeout
+
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._a2a_clients: Dict[str, A2AClient] = {}
+
+    def http_client(self, url: str) -> httpx.AsyncClient:
+        """Get the pooled httpx client for the origin of `url`"""
+        origin = _origin(url)
+        client = self._http_clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+            )
+            self._http_clients[origin] = client
+            # A2A clients bound to a previous (closed) client must be rebuilt
+            for agent_url in [u for u in self._a2a_clients if _origin(u) == origin]:
+                del self._a2a_clients[agent_url]
+        return client
+
+    def a2a_client(self, agent_url: str) -> A2AClient:
+        """Get the cached A2A client for an agent URL"""
+        http_client = self.http_client(agent_url)
+        client = self._a2a_clients.get(agent_url)
+        if client is None:
+            client = A2AClient(url=agent_url, httpx_client=http_client)
+            self._a2a_clients[agent_url] = client
+        return client
+
+    async def close(self):
+        """Close every pooled connection"""
+        clients = list(self._http_clients.values())
+        self._http_clients.clear()
+        self._a2a_clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+agent_client_pool = AgentClientPool()
@@ -1,22 +1,25 @@
-from agents import Agent, Runner 
+from collections import OrderedDict
+from agents import Agent, ModelSettings, Runner
 from dotenv import load_dotenv
-from services.tools import call_agent
-from services.agent_discovery import AgentDiscoveryService
+from properties.config import OrchestratorConfig
+from typing import Dict, List, Optional
+from a2a.types import AgentCard
+from services.tools import call_agent, call_agents_parallel
+from services.card_renderer import card_renderer
+from common.deadline import within_deadline
+from services.session_memory import Session, Turn
+from services.skill_index import SkillIndex
+from services.streaming import TextSink, forward_text_deltas
+from common.tracing import traced_model, tracer
 
 load_dotenv()
 
-llm = "litellm/gemini/gemini-2.0-flash"
+llm = OrchestratorConfig.LLM_MODEL
 
-async def run_main_agent(query: str, agent_cards):
-    try:
-        # Format agent cards for the prompt
-        discovery_service = AgentDiscoveryService()
-        discovery_service.discovered_agents = agent_cards
-        formatted_agent_info = discovery_service.format_agent_cards_for_prompt()
-        
-        agent = Agent(
-            name="TravelOrchestratorAgent",
-            instructions=f"""You are a helpful travel planning orchestrator agent. Your primary role is to analyze a user's request
+
+def build_instructions(formatted_agent_info) -> str:
+    """Render the orchestrator instructions for the given agent listing"""
+    return f"""You are a helpful travel planning orchestrator agent. Your primary role is to analyze a user's request
             and determine the most suitable agent(s) to handle it. The user's queries will primarily focus on weather and hotel availability.
 
             Your task is to route the user's request to the correct specialized agent(s) and coordinate their responses.
@@ -28,6 +31,13 @@ async def run_main_agent(query: str, agent_cards):
             - agent_name: The name of the agent to call (e.g., "WeatherAgent", "AirbnbAgent")
             - message: The specific message/query to send to that agent
 
+            When several sub-queries do not depend on each other's results, send them together with the
+            `call_agents_parallel` tool instead of calling `call_agent` repeatedly. It takes a list of calls,
+            each with an agent_name and a message, runs them at the same time and returns every response
+            (failed calls are reported as errors while the others still succeed).
+            - call_agents_parallel([{{"agent_name": "WeatherAgent", "message": "..."}}, {{"agent_name": "AirbnbAgent", "message": "..."}}])
+            Only use sequential `call_agent` calls when a later call depends on an earlier answer.
+
             IMPORTANT WORKFLOW EXAMPLE:
             For a query like "I want to go from Bangalore to Chennai and stay at Chennai from 15th Sep 2025 to 20th Sep 2025":
             
@@ -41,6 +51,9 @@ async def run_main_agent(query: str, agent_cards):
             Step 3: If weather is acceptable, search for accommodations
             - call_agent("AirbnbAgent", "Find accommodation in Chennai from September 15-20, 2025 for [number] people")
             
+            If the user has already decided to travel regardless of the weather, check weather and accommodation
+            together with `call_agents_parallel`.
+            
             You can call agents multiple times and in any sequence needed to provide comprehensive travel planning.
             
             Always:
@@ -48,21 +61,113 @@ async def run_main_agent(query: str, agent_cards):
             2. Provide clear reasoning for your recommendations
             3. Summarize information from multiple agents cohesively
             4. Ask clarifying questions if needed (number of travelers, budget, preferences)
+            5. Reuse what the earlier conversation (and its summary) already established instead of asking
+               again or calling an agent again for the same information
 
             Remember: You're orchestrating a complete travel planning experience!
 
             **if u face an error specify what the error is**
-            """,
-            tools=[call_agent],
-            model=llm,
+            """
+
+
+class OrchestratorAgentCache:
+    """Keeps the constructed orchestrator `Agent`s between requests.
+
+    The agent listing in the instructions comes from `card_renderer`, which
+    caches it per registry version and circuit states and only varies with
+    the query when the cards must be trimmed to their token budget. The
+    `max_agents` most recently used agents are kept by listing, so queries
+    alternating between a few trimmed listings do not rebuild the agent
+    each time.
+    """
+
+    def __init__(self, max_agents: int = 16):
+        self.max_agents = max_agents
+        self._agents: "OrderedDict[str, Agent]" = OrderedDict()
+        self.builds = 0
+        self.lookups = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "lookups": self.lookups,
+            "builds": self.builds,
+            "hit_rate": 1 - self.builds / self.lookups if self.lookups else 0.0,
+            "cached": len(self._agents),
+        }
+
+    def get(self, agent_cards: Dict[str, AgentCard], registry_version: Optional[int] = None, query: str = "",
+            index: Optional[SkillIndex] = None) -> Agent:
+        formatted_agent_info = card_renderer.render(agent_cards, query, registry_version, index)
+
+        self.lookups += 1
+        agent = self._agents.get(formatted_agent_info)
+        if agent is not None:
+            self._agents.move_to_end(formatted_agent_info)
+            return agent
+
+        agent = self._agents[formatted_agent_info] = self._build(formatted_agent_info)
+        self.builds += 1
+        print(f"Built orchestrator agent (registry version {registry_version}, build {self.builds})")
+        while len(self._agents) > self.max_agents:
+            self._agents.popitem(last=False)
+        return agent
+
+    def _build(self, formatted_agent_info: str) -> Agent:
+        return Agent(
+            name="TravelOrchestratorAgent",
+            instructions=build_instructions(formatted_agent_info),
+            tools=[call_agent, call_agents_parallel],
+            model=traced_model(llm),
+            # Ask for token usage in streamed responses too (reported in the LLM metrics)
+            model_settings=ModelSettings(include_usage=True),
         )
+
+
+orchestrator_agent_cache = OrchestratorAgentCache()
+
+
+SUMMARIZER_INSTRUCTIONS = """You keep the running summary of a conversation between a user and a travel planning assistant.
+Merge the earlier summary and the new turns into one short summary in plain sentences. Keep the user's goals,
+destinations, dates, number of travelers, budget and preferences, the decisions taken and the facts the assistant
+already found (weather, accommodation options with their prices). Drop greetings and repetition.
+Answer with the summary only."""
+
+
+async def summarize_conversation(summary: str, turns: List[Turn]) -> str:
+    """Fold conversation turns into the earlier summary of a session"""
+    agent = Agent(
+        name="ConversationSummarizer",
+        instructions=SUMMARIZER_INSTRUCTIONS,
+        model=traced_model(llm),
+        model_settings=ModelSettings(include_usage=True),
+    )
+    transcript = "\n\n".join(f"User: {turn.user}\nAssistant: {turn.assistant}" for turn in turns)
+    with tracer.span("session.summarize", turns=len(turns)):
+        result = await Runner.run(agent, f"Earlier summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}")
+    return str(result.final_output)
+
+
+async def run_main_agent(query: str, agent_cards, on_delta: Optional[TextSink] = None, registry_version: Optional[int] = None,
+                         session: Optional[Session] = None, index: Optional[SkillIndex] = None):
+    try:
+        agent = orchestrator_agent_cache.get(agent_cards, registry_version, query, index)
+        # Follow-ups see the session's summary and recent turns (within its token budget) before the query
+        run_input = session.context_items(query) if session is not None and session.has_history else query
         
         print(f"Running travel orchestrator with query: {query}")
         print(f"Available agents: {list(agent_cards.keys())}")
 
-        response = await Runner.run(agent, query)
-        return response.final_output
+        # The run (LLM turns and sub-agent calls) is cancelled when the caller's deadline runs out
+        with tracer.span("agent.run", agent="TravelOrchestratorAgent", streamed=on_delta is not None):
+            async with within_deadline("the orchestrator run"):
+                if on_delta is not None:
+                    response = Runner.run_streamed(agent, run_input)
+                    await forward_text_deltas(response, on_delta)
+                    return response.final_output
+
+                response = await Runner.run(agent, run_input)
+                return response.final_output
     except Exception as e:
         print(f"Error in run_main_agent: {e}")
-        return f"Error processing request: {str(e)}"
-
+        raise
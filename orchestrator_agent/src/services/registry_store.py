@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+from a2a.types import AgentCard
+from pydantic import ValidationError
+
+
+FORMAT_VERSION = 1
+
+
+class AgentRegistryStore:
+    """JSON file that persists discovered agent cards between restarts.
+
+    The file records a format version, the registry version and one entry per
+    agent (`url`, `last_seen` epoch seconds and the card itself). `upsert`
+    writes at most once every `min_save_interval` seconds and otherwise only
+    marks the store dirty until the next write or `flush()`, so recording
+    agents one by one does not rewrite the whole file per agent. Every write
+    goes to a temporary file that is fsynced and atomically renamed over the
+    old one, so a crash never leaves a truncated registry behind. Loading only parses JSON and validates cards,
+    so a tampered file cannot execute code the way a pickle could.
+    """
+
+    def __init__(self, path: str, min_save_interval: float = 1.0):
+        self.path = path
+        self.min_save_interval = min_save_interval
+        self.registry_version = 0
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        self._saved_at: Optional[float] = None
+
+    def load(self) -> Dict[str, Tuple[AgentCard, float]]:
+        """Load cards from disk; returns {name: (card, last_seen)}"""
+        self._entries = {}
+        self.registry_version = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"✗ Ignoring unreadable agent registry file {self.path}: {e}")
+            return {}
+
+        if not isinstance(data, dict) or data.get("format_version") != FORMAT_VERSION:
+            print(f"✗ Ignoring agent registry file {self.path}: unsupported format")
+            return {}
+
+        loaded = {}
+        for name, entry in (data.get("agents") or {}).items():
+            try:
+                card = AgentCard.model_validate(entry["card"])
+                last_seen = float(entry.get("last_seen", 0))
+            except (KeyError, TypeError, ValueError, ValidationError) as e:
+                print(f"✗ Skipping invalid registry entry for {name}: {e}")
+                continue
+            self._entries[name] = entry
+            loaded[name] = (card, last_seen)
+
+        self.registry_version = int(data.get("registry_version", 0))
+        return loaded
+
+    def upsert(self, card: AgentCard, last_seen: Optional[float] = None, registry_version: Optional[int] = None):
+        self._entries[card.name] = self._entry(card, last_seen if last_seen is not None else time.time())
+        self._set_version(registry_version)
+        if self._saved_at is None or time.monotonic() - self._saved_at >= self.min_save_interval:
+            self.save()
+        else:
+            self._dirty = True
+
+    def flush(self):
+        """Write any upserts still held back by `min_save_interval`"""
+        if self._dirty:
+            self.save()
+
+    def remove(self, name: str, registry_version: Optional[int] = None):
+        if self._entries.pop(name, None) is None:
+            return
+        self._set_version(registry_version)
+        self.save()
+
+    def update(self, seen: Dict[str, AgentCard], removed, registry_version: Optional[int] = None):
+        """Apply one discovery pass (seen cards, removed names) in a single write"""
+        now = time.time()
+        for card in seen.values():
+            self._entries[card.name] = self._entry(card, now)
+        for name in removed:
+            self._entries.pop(name, None)
+        self._set_version(registry_version)
+        self.save()
+
+    def save(self):
+        data = {
+            "format_version": FORMAT_VERSION,
+            "registry_version": self.registry_version,
+            "updated_at": time.time(),
+            "agents": self._entries,
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".agents-", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _entry(card: AgentCard, last_seen: float) -> dict:
+        return {
+            "url": card.url,
+            "last_seen": last_seen,
+            "card": card.model_dump(mode="json", exclude_none=True),
+        }
+
+    def _set_version(self, registry_version: Optional[int]):
+        if registry_version is not None:
+            self.registry_version = registry_version
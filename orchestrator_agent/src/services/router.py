@@ -0,0 +1,89 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+from a2a.types import AgentCard
+from services.circuit_breaker import HALF_OPEN, OPEN, agent_health
+from services.skill_index import SkillIndex, tokenize
+
+
+# Queries that need planning across agents or conditional logic stay with the LLM
+MULTI_STEP_PATTERN = re.compile(
+    r"\b(?:plan|planning|trip|itinerary|then|first|if|both|also|compare|suggest|alternative|alternatives)\b"
+)
+# Only explicit requests for the listing ("what agents are available", "list all agents"): questions that
+# merely mention an agent ("show me the weather agent's forecast") go to the agents
+LIST_AGENTS_PATTERN = re.compile(
+    r"^\s*(?:what|which|list|show)(?: me)?(?: are)?(?: the| all)?(?: available| registered| online)? agents\b"
+)
+
+# Shown next to agents whose circuit is not closed when listing agents
+STATE_NOTES = {OPEN: " (currently unavailable)", HALF_OPEN: " (recovering)"}
+
+
+@dataclass
+class RouteDecision:
+    kind: str  # "agent" or "list_agents"
+    agent_name: Optional[str] = None
+    score: int = 0
+
+
+class QueryRouter:
+    """Pre-LLM router for queries that clearly target a single agent.
+
+    The query's terms are looked up in the skill index (`index`, else one
+    built from the cards), which scores the agents on their skill ids, tags
+    and example terms. A query is dispatched directly only when exactly one
+    agent matches one of its tags, the score reaches `min_score` and the
+    query carries no multi-step markers; "what agents are available" style questions are
+    answered from the registry. Everything else returns None and goes to the
+    LLM planner.
+    """
+
+    def __init__(self, min_score: int = 3):
+        self.min_score = min_score
+        self.routed = 0
+        self.listed = 0
+        self.fallbacks = 0
+
+    @property
+    def stats(self) -> dict:
+        return {"routed": self.routed, "listed": self.listed, "fallbacks": self.fallbacks}
+
+    def route(self, query: str, agent_cards: Dict[str, AgentCard], index: Optional[SkillIndex] = None) -> Optional[RouteDecision]:
+        text = query.lower()
+        # Only the agents sharing a term with the query are looked at
+        index = index if index is not None else SkillIndex.from_cards(agent_cards)
+        matches = index.match_agents(tokenize(query))
+        tagged = [(tag_hits, score, name) for name, (tag_hits, score) in matches.items() if tag_hits > 0 and name in agent_cards]
+
+        # A query naming a capability ("which travel agents ...") is a question for the agents, not for the listing
+        if not tagged and LIST_AGENTS_PATTERN.search(text):
+            self.listed += 1
+            return RouteDecision(kind="list_agents")
+
+        if MULTI_STEP_PATTERN.search(text):
+            self.fallbacks += 1
+            return None
+
+        if len(tagged) != 1 or tagged[0][1] < self.min_score:
+            self.fallbacks += 1
+            return None
+
+        _, score, agent_name = tagged[0]
+        self.routed += 1
+        return RouteDecision(kind="agent", agent_name=agent_name, score=score)
+
+
+def format_agent_list(agent_cards: Dict[str, AgentCard]) -> str:
+    """Answer "what agents are available" directly from the registry"""
+    if not agent_cards:
+        return "No agents are currently available."
+
+    lines = ["These agents are currently available:"]
+    for name, card in agent_cards.items():
+        description = " ".join(card.description.split())
+        first_sentence = description.split(". ")[0].rstrip(".")
+        skills = ", ".join(skill.name for skill in card.skills)
+        note = STATE_NOTES.get(agent_health.state(name), "")
+        lines.append(f"- {name}{note}: {first_sentence}. Skills: {skills or 'none'}")
+    return "\n".join(lines)
@@ -0,0 +1,230 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Tuple
+from properties.config import OrchestratorConfig
+from common.deadline import deadline_scope
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token), good enough for budgeting prompts"""
+    return (len(text) + 3) // 4
+
+
+def clip(text: str, max_tokens: int) -> str:
+    """`text` cut to about `max_tokens` tokens"""
+    max_chars = max_tokens * 4
+    return text if len(text) <= max_chars else text[:max_chars - 3].rstrip() + "..."
+
+
+# Words and openings that point back at earlier turns ("hotels there", "the same dates", "what about Goa?")
+FOLLOW_UP_PATTERN = re.compile(
+    r"\b(?:there|then|those|these|them|same|again|also|instead|another|previous|earlier|above|cheaper)\b"
+    r"|^\s*(?:and|but|what about|how about)\b"
+)
+# Queries this short ("for 3 adults?", "make it 2 nights") only make sense with the conversation
+FOLLOW_UP_MAX_WORDS = 4
+
+
+def refers_back(query: str) -> bool:
+    """Whether a query probably needs the earlier turns of its conversation to be understood"""
+    text = query.lower()
+    return bool(FOLLOW_UP_PATTERN.search(text)) or len(re.findall(r"[a-z0-9]+", text)) <= FOLLOW_UP_MAX_WORDS
+
+
+@dataclass
+class Turn:
+    user: str
+    assistant: str
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.user) + estimate_tokens(self.assistant)
+
+
+# Folds the turns into the previous summary and returns the new summary
+Summarizer = Callable[[str, List[Turn]], Awaitable[str]]
+
+
+def extractive_summary(summary: str, turns: List[Turn]) -> str:
+    """Summary used when the summarizer fails: the previous one plus the start of each folded turn"""
+    lines = [summary] if summary else []
+    lines += [f"- User: {clip(turn.user, 40)} / Assistant: {clip(turn.assistant, 60)}" for turn in turns]
+    return "\n".join(lines)
+
+
+class Session:
+    """Conversation state of one client session (the A2A context id of its messages).
+
+    Keeps the recent turns plus a running summary of the older ones and the
+    sub-agent answers obtained during the session, so follow-ups neither
+    re-ask the user nor re-query the agents.
+    """
+
+    def __init__(self, session_id: str, token_budget: int, summary_tokens: int, max_results: int, result_ttl: float):
+        self.session_id = session_id
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.max_results = max_results
+        self.result_ttl = result_ttl
+
+        self.summary = ""
+        self.turns: List[Turn] = []
+        self.last_used = time.monotonic()
+        self._results: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._compaction: Optional[asyncio.Task] = None
+
+    @property
+    def has_history(self) -> bool:
+        return bool(self.turns or self.summary)
+
+    @property
+    def turn_budget(self) -> int:
+        """Tokens left for the verbatim turns next to a full summary"""
+        return max(self.token_budget - self.summary_tokens, 1)
+
+    def cached_result(self, agent_name: str, message_key: str) -> Optional[str]:
+        entry = self._results.get((agent_name, message_key))
+        if entry is None:
+            return None
+        stored_at, text = entry
+        if time.monotonic() - stored_at > self.result_ttl:
+            del self._results[(agent_name, message_key)]
+            return None
+        self._results.move_to_end((agent_name, message_key))
+        return text
+
+    def store_result(self, agent_name: str, message_key: str, text: str):
+        self._results[(agent_name, message_key)] = (time.monotonic(), text)
+        self._results.move_to_end((agent_name, message_key))
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+
+    def context_items(self, query: str) -> list:
+        """Model input for `query`: the summary and the most recent turns within the token budget"""
+        items = []
+        budget = self.token_budget
+        if self.summary:
+            items.append({"role": "system", "content": f"Summary of the earlier conversation with this user:\n{self.summary}"})
+            budget -= estimate_tokens(self.summary)
+
+        # Turns not yet folded into the summary are dropped (oldest first) rather than overflow the budget
+        recent = []
+        for turn in reversed(self.turns):
+            if turn.tokens > budget:
+                break
+            recent.append(turn)
+            budget -= turn.tokens
+        for turn in reversed(recent):
+            items.append({"role": "user", "content": turn.user})
+            items.append({"role": "assistant", "content": turn.assistant})
+
+        items.append({"role": "user", "content": query})
+        return items
+
+
+class SessionStore:
+    """In-memory sessions of the orchestrator, by session id.
+
+    At most `max_sessions` sessions are kept (least recently used go first)
+    and idle ones expire after `ttl` seconds. Once the verbatim turns of a
+    session outgrow their share of `token_budget`, the oldest are folded into
+    its summary by `summarizer` in the background (incremental
+    summarization), so the prompt size stays bounded however long the chat
+    runs. With several uvicorn workers each worker keeps its own sessions.
+    """
+
+    def __init__(
+        self,
+        summarizer: Optional[Summarizer] = None,
+        max_sessions: int = OrchestratorConfig.SESSION_MAX_SESSIONS,
+        ttl: float = OrchestratorConfig.SESSION_TTL,
+        token_budget: int = OrchestratorConfig.SESSION_TOKEN_BUDGET,
+        summary_tokens: int = OrchestratorConfig.SESSION_SUMMARY_TOKENS,
+        max_results: int = OrchestratorConfig.SESSION_MAX_RESULTS,
+        result_ttl: float = OrchestratorConfig.SESSION_RESULT_TTL,
+    ):
+        self.summarizer = summarizer
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.max_results = max_results
+        self.result_ttl = result_ttl
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+        self.compactions = 0
+        self.compaction_failures = 0
+
+    def get(self, session_id: str) -> Session:
+        """The session with this id, created when new (or expired)"""
+        now = time.monotonic()
+        self._expire(now)
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = Session(
+                session_id, self.token_budget, self.summary_tokens, self.max_results, self.result_ttl
+            )
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+        session.last_used = now
+        return session
+
+    def _expire(self, now: float):
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used <= self.ttl:
+                break
+            self._sessions.popitem(last=False)
+
+    def record_turn(self, session: Session, user: str, assistant: str):
+        """Add a finished turn and fold older turns into the summary if they outgrew the budget"""
+        # A single answer never takes more than half of the turns' share of the budget
+        session.turns.append(Turn(clip(user, session.turn_budget // 4), clip(assistant, session.turn_budget // 2)))
+        if sum(turn.tokens for turn in session.turns) <= session.turn_budget:
+            return
+        if session._compaction is None or session._compaction.done():
+            # Runs after the answer was sent and outlives the request, so it has no deadline
+            with deadline_scope(None):
+                session._compaction = asyncio.create_task(self._compact(session))
+
+    async def _compact(self, session: Session):
+        # Fold the oldest turns until the rest fill at most half of their budget, so this runs every few
+        # turns; the latest turn always stays verbatim
+        folded, kept_tokens = 0, sum(turn.tokens for turn in session.turns)
+        while folded < len(session.turns) - 1 and kept_tokens > session.turn_budget // 2:
+            kept_tokens -= session.turns[folded].tokens
+            folded += 1
+        if not folded:
+            return
+        turns = session.turns[:folded]
+        try:
+            if self.summarizer is None:
+                raise RuntimeError("no summarizer configured")
+            summary = await self.summarizer(session.summary, turns)
+            self.compactions += 1
+        except Exception as e:
+            print(f"Summarizing session {session.session_id} failed, keeping an extract instead: {e}")
+            summary = extractive_summary(session.summary, turns)
+            self.compaction_failures += 1
+        session.summary = clip(summary.strip(), session.summary_tokens)
+        # Turns recorded meanwhile were appended after the folded ones
+        session.turns = session.turns[folded:]
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "turns": sum(len(session.turns) for session in self._sessions.values()),
+            "summarized_sessions": sum(1 for session in self._sessions.values() if session.summary),
+            "compactions": self.compactions,
+            "compaction_failures": self.compaction_failures,
+        }
+
+
+# Session of the request being served, set by the executor (None outside a session)
+current_session: ContextVar[Optional[Session]] = ContextVar("current_session", default=None)
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from functools import partial
+from typing import Any, Callable, Coroutine, Dict, Hashable, Tuple
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one upstream call.
+
+    The first caller for a key invokes `call` right away and runs the coroutine
+    it returns in its own task; callers that arrive while it is in flight wait
+    for the same result instead of issuing their own. That task starts from a
+    copy of the first caller's context, so a call shared with other callers
+    must not depend on it. The upstream call is only cancelled once every
+    waiting caller has given up. Successful results can be kept for `result_ttl` seconds to
+    absorb bursts of identical requests; failures are never kept.
+    """
+
+    def __init__(self, result_ttl: float = 0.0):
+        self.result_ttl = result_ttl
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.result_hits = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "result_hits": self.result_hits,
+            "in_flight": len(self._flights),
+        }
+
+    async def do(self, key: Hashable, call: Callable[[], Coroutine[Any, Any, Any]]) -> Tuple[Any, bool]:
+        """Run `call` for `key` unless an identical call is running; returns (result, shared)"""
+        cached = self._results.get(key)
+        if cached is not None:
+            stored_at, result = cached
+            if time.monotonic() - stored_at < self.result_ttl:
+                self.result_hits += 1
+                return result, True
+            del self._results[key]
+
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            flight = _Flight(asyncio.create_task(call()))
+            self._flights[key] = flight
+            # A done callback also runs for a task cancelled before it ever started
+            flight.task.add_done_callback(partial(self._finish, key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finish(self, key: Hashable, flight: _Flight, task: asyncio.Task):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if self.result_ttl > 0 and not task.cancelled() and task.exception() is None:
+            self._results[key] = (time.monotonic(), task.result())
+            self._prune()
+
+    def _prune(self):
+        expires_before = time.monotonic() - self.result_ttl
+        for key in [key for key, (stored_at, _) in self._results.items() if stored_at <= expires_before]:
+            del self._results[key]
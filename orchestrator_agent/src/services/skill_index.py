@@ -0,0 +1,130 @@
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+from a2a.types import AgentCard
+
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "for", "to", "of", "in", "on", "at", "from", "with", "me", "my",
+    "i", "is", "it", "be", "can", "you", "your", "what", "whats", "how", "hows", "give", "get", "show",
+    "tell", "about", "like", "please", "find", "search", "need", "want", "some", "any", "this", "that",
+    "will", "would", "there", "are", "do", "does",
+}
+
+TAG_WEIGHT = 3
+EXAMPLE_WEIGHT = 1
+
+# (agent name, position of the skill in its card)
+SkillKey = Tuple[str, int]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords and numbers removed and plurals folded"""
+    tokens = []
+    for word in re.findall(r"[a-z]+", text.lower()):
+        if word in STOPWORDS or len(word) < 3:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def skill_terms(card: AgentCard) -> List[Tuple[Set[str], Set[str]]]:
+    """(tag terms, example terms) of each skill of a card; skill ids count as tags"""
+    terms = []
+    for skill in card.skills:
+        tag_terms = set(tokenize(skill.id)) | {term for tag in skill.tags for term in tokenize(tag)}
+        example_terms = {term for example in skill.examples or [] for term in tokenize(example)}
+        terms.append((tag_terms, example_terms - tag_terms))
+    return terms
+
+
+class SkillIndex:
+    """Inverted index from skill terms (ids, tags, examples) to agents and their skills.
+
+    Lookups only touch the postings of the query's terms, so they cost the
+    same with hundreds of agents as with two. A term matching one of an
+    agent's tags (or skill ids) scores TAG_WEIGHT, one only found in its
+    examples EXAMPLE_WEIGHT. Agents are added, replaced and removed one at a
+    time as the registry sees them come and go.
+    """
+
+    def __init__(self):
+        # term -> {agent: is a tag term of the agent}
+        self._agent_postings: Dict[str, Dict[str, bool]] = {}
+        # term -> {skill: is a tag term of the skill}
+        self._skill_postings: Dict[str, Dict[SkillKey, bool]] = {}
+        self._agent_terms: Dict[str, Set[str]] = {}
+        self._skill_counts: Dict[str, int] = {}
+        self._skills = 0
+        self.lookups = 0
+
+    @classmethod
+    def from_cards(cls, agent_cards: Dict[str, AgentCard]) -> "SkillIndex":
+        index = cls()
+        for name, card in agent_cards.items():
+            index.add(name, card)
+        return index
+
+    def __contains__(self, agent_name: str) -> bool:
+        return agent_name in self._agent_terms
+
+    def add(self, agent_name: str, card: AgentCard):
+        """Index an agent's skills, replacing what was indexed for it before"""
+        self.remove(agent_name)
+        skills = skill_terms(card)
+        agent_tags = set().union(*(tags for tags, _ in skills))
+        agent_terms = agent_tags.union(*(examples for _, examples in skills))
+        for term in agent_terms:
+            self._agent_postings.setdefault(term, {})[agent_name] = term in agent_tags
+        for position, (tags, examples) in enumerate(skills):
+            for term in tags | examples:
+                self._skill_postings.setdefault(term, {})[(agent_name, position)] = term in tags
+        self._agent_terms[agent_name] = agent_terms
+        self._skill_counts[agent_name] = len(skills)
+        self._skills += len(skills)
+
+    def remove(self, agent_name: str):
+        terms = self._agent_terms.pop(agent_name, None)
+        if terms is None:
+            return
+        skill_count = self._skill_counts.pop(agent_name)
+        self._skills -= skill_count
+        for term in terms:
+            postings = self._agent_postings[term]
+            del postings[agent_name]
+            if not postings:
+                del self._agent_postings[term]
+            skill_postings = self._skill_postings[term]
+            for position in range(skill_count):
+                skill_postings.pop((agent_name, position), None)
+            if not skill_postings:
+                del self._skill_postings[term]
+
+    def match_agents(self, query_terms: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """(tag hits, score) of every agent matching at least one of the terms"""
+        self.lookups += 1
+        matches: Dict[str, Tuple[int, int]] = {}
+        for term in set(query_terms):
+            for agent_name, is_tag in self._agent_postings.get(term, {}).items():
+                tag_hits, score = matches.get(agent_name, (0, 0))
+                matches[agent_name] = (tag_hits + is_tag, score + (TAG_WEIGHT if is_tag else EXAMPLE_WEIGHT))
+        return matches
+
+    def score_skills(self, query_terms: Iterable[str]) -> Dict[SkillKey, int]:
+        """Score of every skill matching at least one of the terms"""
+        self.lookups += 1
+        scores: Dict[SkillKey, int] = {}
+        for term in set(query_terms):
+            for key, is_tag in self._skill_postings.get(term, {}).items():
+                scores[key] = scores.get(key, 0) + (TAG_WEIGHT if is_tag else EXAMPLE_WEIGHT)
+        return scores
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "agents": len(self._agent_terms),
+            "skills": self._skills,
+            "terms": len(self._agent_postings),
+            "lookups": self.lookups,
+        }
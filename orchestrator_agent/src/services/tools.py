@@ -1,73 +1,388 @@
-import httpx  
-import asyncio  
-from a2a.client import A2AClient  
-from a2a.types import SendMessageRequest, MessageSendParams  
+import asyncio
+import time
+from a2a.client import A2AClient
+from a2a.types import (
+    AgentCard,
+    CancelTaskRequest,
+    JSONRPCErrorResponse,
+    Message,
+    MessageSendParams,
+    SendMessageRequest,
+    SendStreamingMessageRequest,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+)
+from a2a.utils import get_message_text, get_text_parts
 from uuid import uuid4
-from typing import Dict, Any
+from typing import Dict, Any, Awaitable, Callable, Hashable, List, Optional
+from weakref import WeakValueDictionary
 from agents import function_tool
+from pydantic import BaseModel
 import uuid
-from services.agent_discovery import AgentDiscoveryService
+from properties.config import OrchestratorConfig
+from services.agent_registry import agent_registry
+from services.circuit_breaker import CircuitOpenError, agent_health
+from common import deadline
+from common.deadline import DeadlineExceededError, within_deadline
+from services.http_pool import agent_client_pool
+from common.metrics import metrics
+from services.session_memory import current_session
+from services.single_flight import SingleFlight
+from services.streaming import RelaySink, SharedRelay, subagent_relay
+from common.tracing import current_span, tracer
+
+
+class AgentOverloadedError(RuntimeError):
+    """A sub-agent rejected the call because it is over capacity"""
+
+    def __init__(self, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _raise_if_unsuccessful(agent_name: str, status: TaskStatus):
+    """Raise for a task the agent rejected or failed, so its error text is never taken for an answer"""
+    message = status.message
+    if status.state == TaskState.rejected:
+        text = get_message_text(message) if message else f"{agent_name} rejected the request"
+        raise AgentOverloadedError(text, ((message.metadata or {}) if message else {}).get("retry_after"))
+    if status.state == TaskState.failed:
+        raise RuntimeError(get_message_text(message) if message else f"{agent_name} failed the request")
+
+
+class AgentCallError(RuntimeError):
+    """An agent could not be called or did not answer; the message is meant for the planner"""
+
+
+class AgentCall(BaseModel):
+    agent_name: str
+    message: str
+
+
+def _extract_response_text(response_data: Dict[str, Any]) -> str:
+    """Extract the first text part from an A2A send_message response"""
+    result = response_data.get('result')
+    containers = [result, response_data.get('message')]
+    if isinstance(result, dict) and isinstance(result.get('status'), dict):
+        # Streaming-capable agents answer with a Task whose final status carries the full text
+        containers.insert(0, result['status'].get('message'))
+
+    for container in containers:
+        if isinstance(container, dict) and container.get('parts'):
+            first_part = container['parts'][0]
+            if 'text' in first_part:
+                return first_part['text']
+
+    return str(response_data)
+
+
+async def _cancel_remote_task(client: A2AClient, agent_name: str, task_id: str):
+    """Ask an agent to stop a task nobody waits for any more (failures are only logged)"""
+    try:
+        request = CancelTaskRequest(id=str(uuid4()), params=TaskIdParams(id=task_id))
+        response = await asyncio.wait_for(client.cancel_task(request), OrchestratorConfig.SUBAGENT_CANCEL_TIMEOUT)
+        if isinstance(response.root, JSONRPCErrorResponse):
+            # Usually the task already ended (closing the stream stops it on the agent's side too)
+            print(f"{agent_name} did not cancel task {task_id}: {response.root.error.message}")
+            return
+        SUBAGENT_CANCELS.inc(agent=agent_name)
+        print(f"Cancelled task {task_id} on {agent_name}")
+    except Exception as e:
+        print(f"Failed to cancel task {task_id} on {agent_name}: {e}")
+
+
+async def _stream_from_agent(client: A2AClient, agent_name: str, params: MessageSendParams, relay: RelaySink) -> str:
+    """Call an agent over message/stream, relaying its chunks, and return the full answer.
+
+    When the call is cancelled (our own task was cancelled or ran out of
+    time), the agent's task is cancelled too instead of running on.
+    """
+    request = SendStreamingMessageRequest(id=str(uuid4()), params=params)
+    # Every call gets its own artifact, also when the same agent is called twice
+    artifact_id = uuid4().hex
+    chunks = []
+    final_text = None
+    task_id = None
+
+    try:
+        # The SDK streams without a timeout; bound the wait for each chunk like non-streaming calls
+        async for response in client.send_message_streaming(request, http_kwargs={"timeout": OrchestratorConfig.HTTP_TIMEOUT}):
+            if isinstance(response.root, JSONRPCErrorResponse):
+                raise RuntimeError(response.root.error.message)
+
+            event = response.root.result
+            if task_id is None:
+                task_id = event.id if isinstance(event, Task) else getattr(event, "task_id", None)
+            if isinstance(event, TaskArtifactUpdateEvent):
+                text = "".join(get_text_parts(event.artifact.parts))
+                chunks.append(text)
+                await relay(artifact_id, agent_name, text, False)
+            elif isinstance(event, TaskStatusUpdateEvent) and event.status.message:
+                _raise_if_unsuccessful(agent_name, event.status)
+                final_text = get_message_text(event.status.message)
+            elif isinstance(event, Message):
+                final_text = get_message_text(event)
+    except asyncio.CancelledError:
+        if task_id is not None:
+            await _cancel_remote_task(client, agent_name, task_id)
+        raise
+    finally:
+        if chunks and not asyncio.current_task().cancelling():
+            await relay(artifact_id, agent_name, "", True)
+
+    return final_text if final_text is not None else "".join(chunks)
+
+
+def normalize_message(message: str) -> str:
+    """Case- and whitespace-insensitive form of a message, used as the coalescing key"""
+    return " ".join(message.lower().split())
+
+
+agent_call_flight = SingleFlight(result_ttl=OrchestratorConfig.SINGLE_FLIGHT_RESULT_TTL)
+
+SUBAGENT_CALLS = metrics.counter("subagent_calls_total", "Calls to sub-agents by outcome", ("agent", "outcome"))
+SUBAGENT_CALL_DURATION = metrics.histogram("subagent_call_duration_seconds", "Sub-agent call latency", ("agent",))
+SUBAGENT_CANCELS = metrics.counter("subagent_cancels_total", "Sub-agent tasks cancelled because their caller went away", ("agent",))
+
+
+async def _request_agent(agent_name: str, agent_card: AgentCard, message: str) -> str:
+    """Send one A2A message to an agent; raises when the call fails"""
+    agent_url = agent_card.url
+
+    print(f"Calling {agent_name} at {agent_url} with message: {message[:100]}...")
+
+    relay = subagent_relay.get()
+    streaming = relay is not None and agent_card.capabilities.streaming
+
+    with tracer.span("a2a.request", agent_name=agent_name, url=agent_url, streaming=streaming):
+        send_message_payload = {
+            'message': {
+                'role': 'user',
+                'parts': [{'type': 'text', 'text': message}],
+                'messageId': uuid4().hex,
+                # Lets the sub-agent continue this trace, within what is left of our deadline
+                'metadata': deadline.inject(tracer.inject(), margin=OrchestratorConfig.DEADLINE_HOP_MARGIN),
+            },
+        }
+        client = agent_client_pool.a2a_client(agent_url)
+        params = MessageSendParams(**send_message_payload)
+
+        if streaming:
+            return await _stream_from_agent(client, agent_name, params, relay)
+
+        request = SendMessageRequest(
+            id=str(uuid4()),
+            params=params
+        )
+        response = await client.send_message(request)
+
+        if isinstance(response.root, JSONRPCErrorResponse):
+            raise RuntimeError(response.root.error.message)
+
+        if isinstance(response.root.result, Task):
+            _raise_if_unsuccessful(agent_name, response.root.result.status)
+
+        response_data = response.model_dump(mode='json', exclude_none=True)
+
+        return _extract_response_text(response_data)
+
+
+async def _guarded_request(agent_name: str, agent_card: AgentCard, message: str, timeout: Optional[float] = None) -> str:
+    """`_request_agent` behind the agent's circuit breaker (overload rejections do not count as failures)"""
+    async with agent_health.call(agent_name, neutral=(AgentOverloadedError,)):
+        try:
+            async with asyncio.timeout(timeout):
+                return await _request_agent(agent_name, agent_card, message)
+        except TimeoutError:
+            # Raised inside the breaker so a request that timed out is counted once, however many callers shared it
+            raise TimeoutError(f"no response within {timeout:g} seconds") from None
+
+
+# Relays of the shared requests in flight, by single-flight key (weak: a flight cancelled
+# before it started never runs its cleanup)
+_shared_relays: "WeakValueDictionary[Hashable, SharedRelay]" = WeakValueDictionary()
+
+
+def _start_shared_request(key: Hashable, relay: SharedRelay, agent_name: str, agent_card: AgentCard, message: str) -> Awaitable[str]:
+    """Start the request coalesced on `key`; callers joining it later find its relay by the key"""
+    _shared_relays[key] = relay
+    return _shared_request(key, relay, agent_name, agent_card, message)
+
+
+async def _shared_request(key: Hashable, relay: SharedRelay, agent_name: str, agent_card: AgentCard, message: str) -> str:
+    """`_guarded_request` as shared by every caller coalesced on `key`.
+
+    Runs in the flight's own task, without the deadline, session, relay and
+    trace span of whichever caller started it: the request gets its own
+    SUBAGENT_CALL_TIMEOUT budget and its chunks go to `relay`.
+    """
+    current_session.set(None)
+    subagent_relay.set(relay)
+    current_span.set(None)
+    try:
+        with deadline.deadline_scope(time.monotonic() + OrchestratorConfig.SUBAGENT_CALL_TIMEOUT):
+            return await _guarded_request(agent_name, agent_card, message, OrchestratorConfig.SUBAGENT_CALL_TIMEOUT)
+    finally:
+        relay.close()
+        if _shared_relays.get(key) is relay:
+            del _shared_relays[key]
+
+
+async def _wait_for_flight(key: Hashable, call: Callable[[], Awaitable[str]], shared_relay: SharedRelay,
+                           relay: Optional[RelaySink], timeout: Optional[float]):
+    """Wait for the shared request of `key` for at most `timeout` seconds, forwarding its chunks to `relay`"""
+    forwarding = asyncio.create_task(shared_relay.forward(relay)) if relay is not None else None
+    timer = asyncio.timeout(timeout)
+    try:
+        async with timer:
+            result = await agent_call_flight.do(key, call)
+    except BaseException as e:
+        if forwarding is not None:
+            forwarding.cancel()
+        if isinstance(e, TimeoutError) and timer.expired():
+            raise TimeoutError(f"no response within {timeout:g} seconds") from None
+        raise
+    if forwarding is not None:
+        # Answered from the result cache, the relay was never used: let the forwarding end
+        shared_relay.close()
+        await forwarding
+    return result
+
+
+async def ask_agent(agent_name: str, message: str, timeout: Optional[float] = None) -> str:
+    """Send a message to a registered A2A agent and return its text response.
+
+    Concurrent calls with the same agent and (normalized) message share one
+    upstream request and its result; that request runs on its own, with a
+    budget of SUBAGENT_CALL_TIMEOUT seconds and no client session, and every
+    caller waiting for it gets its streamed chunks. Agents whose circuit is
+    open are not called; the error explains that they are unavailable. A
+    caller stops waiting when its request's deadline runs out or after its
+    own `timeout` seconds. Within a client session, the answer to a message
+    already sent to the agent is reused.
+    Raises AgentCallError when the agent did not answer.
+    """
+    agent_card = agent_registry.get(agent_name)
+
+    if agent_card is None:
+        available_agents = list(agent_registry.agents.keys())
+        raise AgentCallError(f"Agent '{agent_name}' not found. Available agents: {', '.join(available_agents)}")
+
+    session = current_session.get()
+    message_key = normalize_message(message)
+    if session is not None:
+        text = session.cached_result(agent_name, message_key)
+        if text is not None:
+            SUBAGENT_CALLS.inc(agent=agent_name, outcome="session")
+            print(f"Reused the answer {agent_name} gave earlier in session {session.session_id}")
+            await _relay_answer(agent_card, text)
+            return text
+
+    relay = subagent_relay.get() if agent_card.capabilities.streaming else None
+    key = (agent_name, message_key)
+    shared_relay = _shared_relays.get(key)
+    if shared_relay is None or shared_relay.closed:
+        shared_relay = SharedRelay()
+    # The shared request is bounded by its own budget; only a shorter timeout needs its own timer
+    if timeout is not None and timeout >= OrchestratorConfig.SUBAGENT_CALL_TIMEOUT:
+        timeout = None
+
+    with tracer.span("call_agent", agent_name=agent_name, message=message[:200]) as span, \
+            SUBAGENT_CALL_DURATION.time(agent=agent_name):
+        try:
+            async with within_deadline(f"the call to {agent_name}"):
+                text, shared = await _wait_for_flight(
+                    key, lambda: _start_shared_request(key, shared_relay, agent_name, agent_card, message),
+                    shared_relay, relay, timeout)
+        except CircuitOpenError as e:
+            SUBAGENT_CALLS.inc(agent=agent_name, outcome="circuit_open")
+            if span is not None:
+                span.error = str(e)
+            raise AgentCallError(f"Error calling {agent_name}: {str(e)}") from e
+        except DeadlineExceededError as e:
+            SUBAGENT_CALLS.inc(agent=agent_name, outcome="deadline")
+            if span is not None:
+                span.error = str(e)
+            raise AgentCallError(f"Error calling {agent_name}: {str(e)}; there is no time left for further calls") from e
+        except Exception as e:
+            outcome = "overloaded" if isinstance(e, AgentOverloadedError) else "timeout" if isinstance(e, TimeoutError) else "error"
+            SUBAGENT_CALLS.inc(agent=agent_name, outcome=outcome)
+            if span is not None:
+                span.error = str(e)
+            raise AgentCallError(f"Error calling {agent_name}: {str(e)}") from e
+        SUBAGENT_CALLS.inc(agent=agent_name, outcome="coalesced" if shared else "ok")
+        if span is not None:
+            span.set_attribute("coalesced", shared)
+        if session is not None:
+            session.store_result(agent_name, message_key, text)
+
+    if shared:
+        print(f"Shared the answer of an identical call to {agent_name} ({agent_call_flight.stats})")
+    if relay is not None and not shared_relay.chunks:
+        # Not streamed (a cached result, or an agent that answered in one piece): relay the whole answer
+        await _relay_answer(agent_card, text)
+    return text
+
+
+async def _relay_answer(agent_card: AgentCard, text: str):
+    """Relay a whole answer that was not streamed to this caller as one closed artifact"""
+    relay = subagent_relay.get()
+    if relay is not None and agent_card.capabilities.streaming:
+        await relay(uuid4().hex, agent_card.name, text, True)
+
+
+async def send_to_agent(agent_name: str, message: str, timeout: Optional[float] = None) -> str:
+    """`ask_agent`, with errors returned as the response so the planner can react to them"""
+    try:
+        return await ask_agent(agent_name, message, timeout)
+    except AgentCallError as e:
+        return str(e)
+    except Exception as e:
+        print(f"Error in call_agent tool: {e}")
+        return f"Failed to call agent {agent_name}: {str(e)}"
+
 
 @function_tool
 async def call_agent(agent_name: str, message: str) -> str:
     """
     Tool to call a specific A2A agent with a message
-    
+
     Args:
         agent_name: Name of the agent to call (e.g., "WeatherAgent", "AirbnbAgent")
         message: Message to send to the agent
-    
+
     Returns:
         Response from the agent
     """
-    try:
+    return await send_to_agent(agent_name, message)
 
-        discovery = AgentDiscoveryService()
-        agent_cards = await discovery.discover_agents()
-
-        if agent_name not in agent_cards:
-            available_agents = list(agent_cards.keys())
-            return f"Agent '{agent_name}' not found. Available agents: {', '.join(available_agents)}"
-        
-        agent_card = agent_cards[agent_name]
-        agent_url = agent_card.url
-        
-        print(f"Calling {agent_name} at {agent_url} with message: {message[:100]}...")
-        
-        send_message_payload = {  
-            'message': {  
-                'role': 'user',  
-                'parts': [{'type': 'text', 'text': message}],  
-                'messageId': uuid4().hex,  
-            },
-            'sessionId': uuid4().hex 
-        }  
-        
-        async with httpx.AsyncClient(timeout=60.0) as httpx_client:  
-            try:
-
-                client = A2AClient(url=agent_url, httpx_client=httpx_client)
-                
-
-                request = SendMessageRequest(
-                    id=str(uuid4()),
-                    params=MessageSendParams(**send_message_payload)
-                )
-                response = await client.send_message(request)
-                
-                response_data = response.model_dump(mode='json', exclude_none=True)
-                
-                # Extract response text
-                if 'message' in response_data and 'parts' in response_data['message']:
-                    parts = response_data['message']['parts']
-                    if parts and len(parts) > 0 and 'text' in parts[0]:
-                        return parts[0]['text']
-
-                return str(response_data)
-                
-            except Exception as e:
-                return f"Error calling {agent_name}: {str(e)}"
-                
-    except Exception as e:
-        print(f"Error in call_agent tool: {e}")
-        return f"Failed to call agent {agent_name}: {str(e)}"
\ No newline at end of file
+
+@function_tool
+async def call_agents_parallel(calls: List[AgentCall]) -> str:
+    """
+    Tool to call several A2A agents at the same time with independent messages
+
+    Args:
+        calls: List of calls, each with the agent_name to call and the message to send to it
+
+    Returns:
+        The response of every agent, in the order of the calls. Calls that failed or
+        timed out are reported as such while the other responses are still returned.
+    """
+    timeout = OrchestratorConfig.FANOUT_CALL_TIMEOUT
+
+    print(f"Fanning out {len(calls)} agent calls: {[call.agent_name for call in calls]}")
+    results = await asyncio.gather(
+        *[send_to_agent(call.agent_name, call.message, timeout) for call in calls], return_exceptions=True
+    )
+
+    sections = []
+    for i, (call, result) in enumerate(zip(calls, results), 1):
+        if isinstance(result, BaseException):
+            result = f"Error calling {call.agent_name}: {str(result)}"
+        sections.append(f"[{i}] {call.agent_name} (message: {call.message})\n{result}")
+    return "\n\n".join(sections)
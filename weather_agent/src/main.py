@@ -1,10 +1,14 @@
 import asyncio
 import uvicorn
+from contextlib import asynccontextmanager
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill 
+from properties.config import Config
 from services.agent_executor import WeatherAgentExecutor
+from common.metrics import MeteredAgentExecutor, MeteredQueueManager, instrument_app, metrics
+from common.tracing import tracer
+from services.execute_agent import create_admission_controller, create_mcp_pool, create_task_store
 
 
 def create_weather_agent_card():
@@ -34,24 +38,36 @@ def create_weather_agent_card():
         defaultInputModes=["text"],
         defaultOutputModes=["text"],
         skills=[weather_skill],
-        capabilities=AgentCapabilities(),
+        capabilities=AgentCapabilities(streaming=True),
         version="1.0.0"
     )
     
     return agent_card
 
 
-def main():
-    """Main function to start the A2A weather agent server"""
+def create_app():
+    """Build the A2A weather agent Starlette app (also used as the uvicorn worker factory)"""
+    
+    tracer.configure(
+        service_name=Config.AGENT_NAME,
+        enabled=Config.TRACING_ENABLED,
+        path=Config.SPAN_EXPORT_FILE,
+        collector_url=Config.SPAN_COLLECTOR_URL,
+    )
     
-    weather_agent_executor = WeatherAgentExecutor()
+    mcp_pool = create_mcp_pool()
+    task_store = create_task_store()
+    admission = create_admission_controller()
+    weather_agent_executor = WeatherAgentExecutor(mcp_pool=mcp_pool, admission=admission)
     # Create the agent card
     agent_card = create_weather_agent_card()
     
     # Create the request handler with the weather agent executor
+    queue_manager = MeteredQueueManager()
     request_handler = DefaultRequestHandler(
-        agent_executor = weather_agent_executor,
-        task_store=InMemoryTaskStore(),
+        agent_executor = MeteredAgentExecutor(weather_agent_executor),
+        task_store=task_store,
+        queue_manager=queue_manager,
     )
     
     # Create the A2A application
@@ -60,6 +76,38 @@ def main():
         http_handler=request_handler,
     )
     
+    @asynccontextmanager
+    async def lifespan(app):
+        # Spawn the MCP server processes once, before the first request arrives
+        await mcp_pool.start()
+        try:
+            yield
+        finally:
+            await mcp_pool.close()
+            await task_store.close()
+            await tracer.close()
+    
+    starlette_app = app.build(lifespan=lifespan)
+    if Config.METRICS_ENABLED:
+        metrics.register_stats("admission", lambda: admission.stats, "Admission control",
+                               counters=("admitted", "queued", "rejected_queue_full", "rejected_timeout", "expired"))
+        metrics.register_stats("executions", lambda: weather_agent_executor.executions.stats, "Running executions", counters=("cancelled",))
+        metrics.register_stats("a2a_event_queue", lambda: queue_manager.stats, "A2A task event queues")
+        metrics.register_stats("task_store", lambda: task_store.stats, "A2A task store",
+                               counters=("saves", "writes", "flushes", "expired", "evicted"))
+        metrics.register_stats("mcp_pool", lambda: mcp_pool.stats, "Weather MCP server pool",
+                               counters=("spawned", "recycled", "spawn_failures"))
+        metrics.register_stats("weather_fast_path", lambda: weather_agent_executor.fast_path.stats, "LLM-free weather fast path",
+                               counters=("hits", "fallbacks"))
+        instrument_app(starlette_app, Config.METRICS_PATH)
+    return starlette_app
+
+
+def main():
+    """Main function to start the A2A weather agent server"""
+    
+    agent_card = create_weather_agent_card()
+    
     # Configure and start the server
     print("Starting Weather Agent A2A Server...")
     print(f"Agent Card: {agent_card.name}")
@@ -68,9 +116,13 @@ def main():
     for skill in agent_card.skills:
         print(f"  - {skill.name}: {skill.description}")
     
-    # Start the server
+    # Start the server; every worker builds its own app (and MCP pool) from the factory
+    if Config.WORKERS > 1:
+        uvicorn.run("main:create_app", factory=True, workers=Config.WORKERS, host="0.0.0.0", port=7001, log_level="info")
+        return
+    
     uvicorn.run(
-        app.build(),  # The Starlette app instance
+        create_app(),  # The Starlette app instance
         host="0.0.0.0",
         port=7001,
         log_level="info"
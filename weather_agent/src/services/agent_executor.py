@@ -1,42 +1,110 @@
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
 from a2a.server.events.event_queue import EventQueue
-from a2a.utils import new_agent_text_message
+from a2a.types import TaskNotCancelableError
+from a2a.utils.errors import ServerError
+from agents.mcp import MCPServer
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
-from services.execute_agent import agent_run
+from typing import Optional
+from common.admission import AdmissionController, OverloadedError
+from common.cancellation import TERMINAL_STATES, ExecutionTracker
+from common.deadline import DeadlineExceededError, deadline_from_metadata, deadline_scope, remaining
+from services.execute_agent import agent_run, create_mcp_server
+from properties.config import Config
+from services.fast_path import WeatherFastPath
+from common.mcp_pool import MCPServerPool
+from services.streaming import ResponseStream, TextSink, response_text
+from common.tracing import tracer
 import asyncio
 
 
 class WeatherAgent(BaseModel):
     query: str
     
-    async def invoke(self):
-        return await agent_run(self.query)
+    async def invoke(self, server: Optional[MCPServer] = None, on_delta: Optional[TextSink] = None):
+        return await agent_run(self.query, server, on_delta)
 
 
 class WeatherAgentExecutor(AgentExecutor):
+
+    def __init__(self, mcp_pool: Optional[MCPServerPool] = None, admission: Optional[AdmissionController] = None):
+        self.mcp_pool = mcp_pool
+        self.admission = admission or AdmissionController(max_concurrent=None)
+        self.executions = ExecutionTracker()
+        self.fast_path = WeatherFastPath(tool_name=Config.FAST_PATH_TOOL_NAME)
+
+    @asynccontextmanager
+    async def _mcp_server(self):
+        if self.mcp_pool is not None:
+            async with self.mcp_pool.checkout() as server:
+                yield server
+        else:
+            async with create_mcp_server() as server:
+                yield server
     
     async def execute(self, context: RequestContext, event_queue: EventQueue):
+        # The caller's remaining time budget (or the default one) bounds everything done for the request
+        deadline = deadline_from_metadata(context.message.metadata, Config.DEFAULT_DEADLINE)
+        with deadline_scope(deadline), self.executions.track(context.task_id):
+            await self._execute(context, event_queue, deadline)
+
+    async def _execute(self, context: RequestContext, event_queue: EventQueue, deadline: Optional[float]):
+        stream = ResponseStream(context, event_queue)
         try:
             # Extract query from the request context
             query = context.message.parts[0].root.text
             
             if not query:
                 error_msg = "No query provided in request"
-                await event_queue.enqueue_event(new_agent_text_message(error_msg))
+                await stream.finish(error_msg)
                 return
             
-            # Create and invoke the weather agent
-            agent = WeatherAgent(query=query)
-            result = await agent.invoke()
-            
-            # Send the result back through event queue
-            await event_queue.enqueue_event(new_agent_text_message(str(result)))
+            # Wait for an execution slot; over capacity the request is rejected with a retry-after hint
+            # Requests whose deadline already passed are dropped without running
+            async with self.admission.admit(max_wait=remaining(deadline)):
+                await stream.start()
+                # Continue the caller's trace when the orchestrator sent one
+                with tracer.span("weather.execute", parent=tracer.extract(context.message.metadata), query=query[:200]) as span:
+                    date_range = self.fast_path.parse(query)
+                    async with self._mcp_server() as server:
+                        # Well-formed date queries go straight to the MCP tool without an LLM round trip
+                        if date_range is not None:
+                            answer = await self.fast_path.answer(server, date_range)
+                            if answer is not None:
+                                if span is not None:
+                                    span.set_attribute("fast_path", True)
+                                await stream.finish(answer)
+                                return
+
+                        # Otherwise invoke the weather agent, streaming its answer as it is generated
+                        agent = WeatherAgent(query=query)
+                        result = await agent.invoke(server, stream.send)
+                
+                # Complete the task with the full answer
+                await stream.finish(response_text(result))
             
+        except OverloadedError as e:
+            print(f"Rejected weather request: {e.reason} (retry after {e.retry_after}s)")
+            await stream.reject(f"{Config.AGENT_NAME} is overloaded ({e.reason}), retry after {e.retry_after}s", e.retry_after)
+        except asyncio.CancelledError:
+            # Interrupted by tasks/cancel: the agent run was stopped and its MCP server retired
+            print(f"Cancelled weather task {context.task_id}")
+            await stream.cancel("Weather agent execution cancelled")
+        except DeadlineExceededError as e:
+            print(f"Dropped weather request: {e}")
+            await stream.fail(f"{Config.AGENT_NAME} gave up: {e}")
         except Exception as e:
             error_msg = f"Error executing weather agent: {str(e)}"
-            await event_queue.enqueue_event(new_agent_text_message(error_msg))
+            # The task fails, so callers do not take the error for an answer; the stream may be
+            # what failed, and the task cannot be ended twice
+            if not stream.ended:
+                await stream.fail(error_msg)
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue):
-        # For now, just acknowledge cancellation
-        await event_queue.enqueue_event(new_agent_text_message("Weather agent execution cancelled"))
+        task = context.current_task
+        if task is not None and task.status.state in TERMINAL_STATES:
+            raise ServerError(error=TaskNotCancelableError())
+        # A running execution is interrupted and reports the cancellation itself
+        if not self.executions.cancel(context.task_id):
+            await ResponseStream(context, event_queue).cancel("Weather agent execution cancelled")
@@ -1,30 +1,116 @@
-from agents.mcp import MCPServerStdio
+from a2a.server.tasks import TaskStore
+from agents.mcp import MCPServer, MCPServerStdio
+from agents.models.interface import Model
+from agents.models.multi_provider import MultiProvider
 import asyncio
+from typing import Optional
+from properties.config import Config
+from common.mcp_pool import MCPServerPool
+from common.recording import (
+    RecordingMCPServerStdio,
+    RecordingModel,
+    ReplayMCPServer,
+    ReplayModel,
+    TraceRecorder,
+    TraceReplayer,
+)
+from services.streaming import TextSink
+from common.admission import AdmissionController
+from common.sqlite_task_store import SQLiteTaskStore
+from common.task_store import BoundedTaskStore
+from common.tracing import traced_mcp_server
 from services.weather_agent import run_agent
 
 
-async def agent_run(query: str):   
-    try:
-        async with MCPServerStdio(
+trace_recorder = TraceRecorder(Config.TRACE_FILE) if Config.TRACE_MODE == "record" else None
+trace_replayer = TraceReplayer(Config.TRACE_FILE, latency=Config.REPLAY_LATENCY) if Config.TRACE_MODE == "replay" else None
+
+
+def create_model() -> Optional[Model]:
+    """Recording or replaying model for TRACE_MODE (None runs Config.LLM_MODEL directly)"""
+    if trace_replayer is not None:
+        print(f"Replaying LLM and MCP interactions from {Config.TRACE_FILE} ({Config.REPLAY_LATENCY} latency)")
+        return ReplayModel(trace_replayer)
+    if trace_recorder is not None:
+        print(f"Recording LLM and MCP interactions to {Config.TRACE_FILE}")
+        return RecordingModel(MultiProvider().get_model(Config.LLM_MODEL), trace_recorder)
+    return None
+
+
+trace_model = create_model()
+
+
+def create_mcp_server() -> MCPServer:
+    """Create a (not yet connected) weather MCP server"""
+    params = {
+        "command": Config.MCP_COMMAND,
+        "args": Config.get_mcp_args()
+    }
+    if trace_replayer is not None:
+        server = ReplayMCPServer(trace_replayer, name="Weather MCP Server")
+    elif trace_recorder is not None:
+        server = RecordingMCPServerStdio(trace_recorder, name="Weather MCP Server", params=params, cache_tools_list=True)
+    else:
+        server = MCPServerStdio(
             name="Weather MCP Server",
-            params={
-                "command": "uv",
-                "args": [
-                    "--directory",
-                    "c:/Users/hp/OneDrive/Desktop/assignments/A2A/weather_mcp/src/weather_mcp",
-                    "run", 
-                    "weather_tool.py"
-                ]
-            }, 
-        ) as server:
+            params=params,
+            cache_tools_list=True,
+        )
+    return traced_mcp_server(server)
+
+
+def create_mcp_pool() -> MCPServerPool:
+    """Create the shared weather MCP server pool"""
+    return MCPServerPool(
+        create_mcp_server,
+        min_size=Config.MCP_POOL_MIN_SIZE,
+        max_size=Config.MCP_POOL_MAX_SIZE,
+        max_calls=Config.MCP_POOL_MAX_CALLS,
+        health_check_interval=Config.MCP_POOL_HEALTH_CHECK_INTERVAL,
+    )
+
+
+def create_admission_controller() -> AdmissionController:
+    """Create the admission controller that bounds concurrent executions"""
+    return AdmissionController(
+        max_concurrent=Config.ADMISSION_MAX_CONCURRENT,
+        max_queue=Config.ADMISSION_MAX_QUEUE,
+        max_wait=Config.ADMISSION_MAX_WAIT,
+    )
+
+
+def create_task_store() -> TaskStore:
+    """Create the A2A task store selected by TASK_STORE_BACKEND"""
+    if Config.TASK_STORE_BACKEND == "sqlite":
+        return SQLiteTaskStore(
+            Config.TASK_STORE_PATH,
+            batch_interval=Config.TASK_STORE_BATCH_INTERVAL,
+            batch_size=Config.TASK_STORE_BATCH_SIZE,
+            ttl=Config.TASK_STORE_TTL,
+            max_tasks=Config.TASK_STORE_MAX_TASKS,
+            max_bytes=Config.TASK_STORE_MAX_BYTES,
+        )
+    return BoundedTaskStore(
+        max_tasks=Config.TASK_STORE_MAX_TASKS,
+        max_bytes=Config.TASK_STORE_MAX_BYTES,
+        ttl=Config.TASK_STORE_TTL,
+    )
+
+
+async def agent_run(query: str, server: Optional[MCPServer] = None, on_delta: Optional[TextSink] = None):   
+    try:
+        if server is not None:
+            print(f"Using pooled MCP Server for query: {query}")
+            return await run_agent(server, query, on_delta, trace_model)
+
+        async with create_mcp_server() as server:
             print(f"Starting MCP Server for query: {query}")
-            response = await run_agent(server, query)
+            response = await run_agent(server, query, on_delta, trace_model)
             return response
     except Exception as e:
         print(f"Error in agent_run: {e}")
-        return f"Sorry, I encountered an error while processing your weather request: {str(e)}"
+        raise
 
 
 if __name__ == "__main__":
     asyncio.run(agent_run('how is the weather on september 10th to sep 14th of 2025?'))
-
@@ -0,0 +1,166 @@
+import re
+from dataclasses import dataclass
+from typing import Optional
+from agents.mcp import MCPServer
+
+
+MONTH = r"(?:sep|sept|september)"
+OTHER_MONTHS = r"\b(?:jan|january|feb|february|mar|march|apr|april|may|jun|june|jul|july|aug|august|oct|october|nov|november|dec|december)\b"
+WEATHER_WORDS = r"\b(?:weather|forecast|temperature|temperatures|rain|rainfall|climate)\b"
+# Anything that hints at a second intent is left to the LLM
+OTHER_INTENTS = r"\b(?:hotel|hotels|room|rooms|stay|accommodation|airbnb|book|flight|flights|and also|compare)\b"
+RANGE_WORDS = r"(?:to|until|till|through|thru|-|–)"
+DAY = r"(\d{1,2})(?:st|nd|rd|th)?"
+# The only other words a query may contain. Anything else (a place, "week", "and", ...) may change
+# what is asked, since the weather tool takes nothing but the days
+FILLER_WORDS = {
+    "what", "whats", "s", "is", "it", "the", "how", "hows", "will", "be", "going", "like", "expected",
+    "on", "for", "of", "from", "between", "to", "until", "till", "through", "thru", "give", "me", "show",
+    "tell", "about", "get", "check", "please", "day", "date", "dates",
+}
+
+SUPPORTED_YEAR = "2025"
+DAYS_IN_SEPTEMBER = 30
+
+
+@dataclass
+class DateRange:
+    start_day: int
+    end_day: int
+
+    def label(self) -> str:
+        if self.start_day == self.end_day:
+            return f"September {self.start_day}, {SUPPORTED_YEAR}"
+        return f"September {self.start_day}-{self.end_day}, {SUPPORTED_YEAR}"
+
+
+def parse_weather_query(query: str) -> Optional[DateRange]:
+    """Parse simple September 2025 weather questions into a day range.
+
+    Handles the phrasings advertised in the agent card ("September 15",
+    "Sep 01 to Sep 05", "September 10th to the 15th", "Sep 20") as well as
+    ISO dates. Returns None whenever the query is ambiguous or asks for
+    anything else (a place, a week, a list of days, ...), so the caller can
+    fall back to the LLM.
+    """
+    text = query.lower().strip()
+    if not re.search(WEATHER_WORDS, text) or re.search(OTHER_INTENTS, text):
+        return None
+
+    # ISO dates become "sep DD"; any other year or month is out of scope
+    text = re.sub(rf"\b{SUPPORTED_YEAR}-09-(\d{{2}})\b", r"sep \1", text)
+    if re.search(OTHER_MONTHS, text) or not re.search(rf"\b{MONTH}\b", text):
+        return None
+    years = re.findall(r"\b\d{4}\b", text)
+    if any(year != SUPPORTED_YEAR for year in years):
+        return None
+    text = re.sub(rf"\b{SUPPORTED_YEAR}\b", " ", text)
+
+    days = [(int(match.group(1)), match) for match in re.finditer(rf"\b{DAY}\b", text)]
+    if re.search(r"\d", re.sub(rf"\b{DAY}\b", " ", text)):
+        # Leftover digits (times, counts, ...) mean this is not a plain date query
+        return None
+    words = re.findall(r"[a-z]+", re.sub(rf"\b{DAY}\b|{WEATHER_WORDS}|\b{MONTH}\b", " ", text))
+    if any(word not in FILLER_WORDS for word in words):
+        return None
+
+    if len(days) == 1:
+        start_day = end_day = days[0][0]
+    elif len(days) == 2:
+        between = text[days[0][1].end():days[1][1].start()]
+        if not re.fullmatch(rf"\s*{RANGE_WORDS}\s*(?:the\s+)?(?:{MONTH}\s+)?", between):
+            return None
+        start_day, end_day = days[0][0], days[1][0]
+    else:
+        return None
+
+    if not 1 <= start_day <= end_day <= DAYS_IN_SEPTEMBER:
+        return None
+    return DateRange(start_day, end_day)
+
+
+class WeatherFastPath:
+    """Answers well-formed date queries by calling the MCP weather tool directly.
+
+    Skips the LLM round trip for queries `parse_weather_query` understands and
+    formats the tool output from a template. Counts hits and fallbacks so the
+    coverage of the parser can be tracked.
+    """
+
+    def __init__(self, tool_name: Optional[str] = None):
+        self.tool_name = tool_name
+        self.hits = 0
+        self.fallbacks = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.fallbacks
+        return self.hits / total if total else 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "fallbacks": self.fallbacks, "hit_ratio": self.hit_ratio}
+
+    def parse(self, query: str) -> Optional[DateRange]:
+        date_range = parse_weather_query(query)
+        if date_range is None:
+            self.fallbacks += 1
+        return date_range
+
+    async def answer(self, server: MCPServer, date_range: DateRange) -> Optional[str]:
+        """Call the weather tool for the range; None means fall back to the LLM"""
+        try:
+            tool_name = await self._find_tool(server)
+            if tool_name is None:
+                self.fallbacks += 1
+                return None
+
+            result = await server.call_tool(tool_name, {
+                "start_day": f"{date_range.start_day:02d}",
+                "end_day": f"{date_range.end_day:02d}",
+            })
+        except Exception as e:
+            print(f"Weather fast path failed, falling back to LLM: {e}")
+            self.fallbacks += 1
+            return None
+
+        if result.isError:
+            self.fallbacks += 1
+            return None
+
+        data = "\n".join(item.text for item in result.content if getattr(item, "type", None) == "text")
+        self.hits += 1
+        print(f"Weather fast path hit for {date_range.label()} (hit ratio {self.hit_ratio:.0%})")
+        return f"Weather for {date_range.label()}:\n{data}"
+
+    async def _find_tool(self, server: MCPServer) -> Optional[str]:
+        if self.tool_name:
+            return self.tool_name
+        for tool in await server.list_tools():
+            properties = (tool.inputSchema or {}).get("properties", {})
+            if "start_day" in properties and "end_day" in properties:
+                self.tool_name = tool.name
+                return tool.name
+        return None
+
+
+if __name__ == "__main__":
+    # Phrasings the fast path must answer, and ones it must leave to the LLM
+    for query, expected in [
+        ("What is the weather like on September 15?", DateRange(15, 15)),
+        ("Give me the forecast for September 10th to the 15th.", DateRange(10, 15)),
+        ("Weather for Sep 01 to Sep 05", DateRange(1, 5)),
+        ("How's the weather from September 5th to 10th?", DateRange(5, 10)),
+        ("Tell me about the weather on Sep 20", DateRange(20, 20)),
+        ("weather on 2025-09-07", DateRange(7, 7)),
+        ("weather in the 1st week of september", None),
+        ("weather sep 5 and sep 9", None),
+        ("weather on sep 5, sep 9", None),
+        ("weather on sep 5 or 6", None),
+        ("weather on September 15 in Paris", None),
+        ("What's the weather in Chennai on Sep 15?", None),
+        ("weather on sep 15 2024", None),
+        ("weather and hotels on sep 15", None),
+    ]:
+        assert parse_weather_query(query) == expected, (query, parse_weather_query(query))
+    print("fast path parser ok")
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+from a2a.server.agent_execution.context import RequestContext
+from a2a.server.events.event_queue import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Part, TextPart
+from openai.types.responses import ResponseTextDeltaEvent
+from common.metrics import metrics
+
+
+TextSink = Callable[[str], Awaitable[None]]
+
+RESPONSE_ARTIFACT_NAME = "response"
+
+TIME_TO_FIRST_CHUNK = metrics.histogram(
+    "a2a_time_to_first_chunk_seconds", "Time from the start of an execution to its first streamed chunk")
+
+
+async def forward_text_deltas(result, on_delta: TextSink):
+    """Forward the LLM text deltas of a `Runner.run_streamed` result to `on_delta`.
+
+    The run is cancelled when forwarding stops early (deadline, cancellation,
+    failed sink) instead of being left running in the background.
+    """
+    try:
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                await on_delta(event.data.delta)
+    except BaseException:
+        result.cancel()
+        raise
+    task = asyncio.current_task()
+    if task is not None and task.cancelling():
+        # stream_events() ends quietly when cancelled; pass the cancellation on
+        result.cancel()
+        raise asyncio.CancelledError()
+
+
+def response_text(result: Any) -> str:
+    """Final answer of an agent run (or the error string returned in its place)"""
+    final_output = getattr(result, "final_output", None)
+    return str(final_output) if final_output is not None else str(result)
+
+
+class ResponseStream:
+    """Streams an agent's answer to the A2A caller while it is generated.
+
+    Text deltas are appended as chunks of a single "response" artifact, so
+    `message/stream` clients can render tokens as they arrive. `finish()`
+    closes the artifact (`last_chunk`) and completes the task with the full
+    answer as its status message, which is what `message/send` callers read.
+    """
+
+    def __init__(self, context: RequestContext, event_queue: EventQueue):
+        self.updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        self.artifact_id = uuid4().hex
+        self.chunks = 0
+        self.started_at = time.perf_counter()
+        self.time_to_first_chunk: Optional[float] = None
+        self.ended = False
+
+    async def start(self):
+        await self.updater.start_work()
+
+    async def send(self, text: str, last_chunk: bool = False):
+        if not text and not last_chunk:
+            return
+        await self.updater.add_artifact(
+            [Part(root=TextPart(text=text))],
+            artifact_id=self.artifact_id,
+            name=RESPONSE_ARTIFACT_NAME,
+            append=self.chunks > 0,
+            last_chunk=last_chunk,
+        )
+        if self.chunks == 0:
+            self.time_to_first_chunk = time.perf_counter() - self.started_at
+            TIME_TO_FIRST_CHUNK.observe(self.time_to_first_chunk)
+        self.chunks += 1
+
+    async def reject(self, text: str, retry_after: int):
+        """End the task as rejected (overloaded), with a retry-after hint in the message metadata"""
+        message = self.updater.new_agent_message(
+            [Part(root=TextPart(text=text))],
+            metadata={"error": "overloaded", "retry_after": retry_after},
+        )
+        self.ended = True
+        await self.updater.reject(message=message)
+
+    async def fail(self, text: str):
+        """End the task as failed (its deadline ran out or the agent run raised)"""
+        self.ended = True
+        await self.updater.failed(
+            message=self.updater.new_agent_message([Part(root=TextPart(text=text))])
+        )
+
+    async def cancel(self, text: str):
+        """End the task as canceled, unless it already ended"""
+        if self.ended:
+            return
+        self.ended = True
+        await self.updater.cancel(
+            message=self.updater.new_agent_message([Part(root=TextPart(text=text))])
+        )
+
+    async def finish(self, text: str):
+        # Set first: a finish that failed half-way must not be retried by the caller's error path
+        self.ended = True
+        # Close the response artifact; without streamed chunks it carries the whole answer
+        await self.send("" if self.chunks else text, last_chunk=True)
+        await self.updater.complete(
+            message=self.updater.new_agent_message([Part(root=TextPart(text=text))])
+        )
@@ -1,12 +1,18 @@
-from agents import Agent, Runner
-from agents.mcp import MCPServer    
+from agents import Agent, ModelSettings, Runner
+from agents.mcp import MCPServer
+from agents.models.interface import Model
 from dotenv import load_dotenv
+from properties.config import Config
+from typing import Optional
+from common.deadline import within_deadline
+from services.streaming import TextSink, forward_text_deltas
+from common.tracing import traced_model, tracer
 
 load_dotenv()
 
-llm = "litellm/gemini/gemini-2.0-flash"
+llm = Config.LLM_MODEL
 
-async def run_agent(mcp_server: MCPServer, query: str):
+async def run_agent(mcp_server: MCPServer, query: str, on_delta: Optional[TextSink] = None, model: Optional[Model] = None):
     try:
         agent = Agent(
             name="WeatherAgent",
@@ -20,13 +26,23 @@ async def run_agent(mcp_server: MCPServer, query: str):
             Always provide clear, concise weather information based on the available data.
             """,
             mcp_servers=[mcp_server],
-            model=llm,
+            model=traced_model(model or llm),
+            # Ask for token usage in streamed responses too (reported in the LLM metrics)
+            model_settings=ModelSettings(include_usage=True),
         )
         print(f"Running weather agent with query: {query}")
 
-        response = await Runner.run(agent, query)
-        return response
+        # The run (LLM turns and tool calls) is cancelled when the caller's deadline runs out
+        with tracer.span("agent.run", agent="WeatherAgent", streamed=on_delta is not None):
+            async with within_deadline("the weather agent run"):
+                if on_delta is not None:
+                    response = Runner.run_streamed(agent, query)
+                    await forward_text_deltas(response, on_delta)
+                    return response
+
+                response = await Runner.run(agent, query)
+                return response
     except Exception as e:
         print(f"Error in run_agent: {e}")
-        return f"Error processing weather request: {str(e)}"
+        raise
 